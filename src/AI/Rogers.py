@@ -8,6 +8,8 @@ from Ant import UNIT_STATS
 from Move import Move
 from GameState import *
 from AIPlayerUtils import *
+from AISearch import AlphaBetaSearch, sameMove
+from BatchUtility import *
 import unittest
 
 ##
@@ -189,10 +191,11 @@ class AIPlayer(Player):
     #Parameters:
     #   currentState - the current game state
     #   move - the move to get to the current game state
+    #   me - the player to score the state for (defaults to whose turn it is)
     #
     #Returns the utility of the given state
     #Notes: score is not optimistic to avoid negative scores which cause bad behavior
-    def utility(self, currentState, move):
+    def utility(self, currentState, move, me = None):
         penalty = 0.0
 
         #penalizes standing state
@@ -201,8 +204,9 @@ class AIPlayer(Player):
             return 1000
         
         #get necessary variables
-        me = currentState.whoseTurn
-        myInv = getCurrPlayerInventory(currentState)
+        if me is None:
+            me = currentState.whoseTurn
+        myInv = currentState.inventories[me]
 
         #evaluates food score and terminates if winning move is found
         foodScore = self.getFoodScore(myInv.foodCount)
@@ -254,9 +258,9 @@ class AIPlayer(Player):
                 move = None
                 while move == None:
                     #Choose any x location
-                    x = random.randint(0, 9)
+                    x = self.random.randint(0, 9)
                     #Choose any y location on your side of the board
-                    y = random.randint(0, 3)
+                    y = self.random.randint(0, 3)
                     #Set the move if this space is empty
                     if currentState.board[x][y].constr == None and (x, y) not in moves:
                         move = (x, y)
@@ -271,9 +275,9 @@ class AIPlayer(Player):
                 move = None
                 while move == None:
                     #Choose any x location
-                    x = random.randint(0, 9)
+                    x = self.random.randint(0, 9)
                     #Choose any y location on enemy side of the board
-                    y = random.randint(6, 9)
+                    y = self.random.randint(6, 9)
                     #Set the move if this space is empty
                     if currentState.board[x][y].constr == None and (x, y) not in moves:
                         move = (x, y)
@@ -317,7 +321,18 @@ class AIPlayer(Player):
 
     ##
     #getMove
-    #Description: Gets the next move from the Player.
+    #Description: Gets the next move from the Player.  Looks 3 moves ahead
+    #   (less if the time limit runs out first) for the lowest utility, treating
+    #   every move as its own like the original tree search did.
+    #
+    #   It doesn't always pick the move the original search did.  That search
+    #   skipped nodes (it removed them from the list it was walking), gave
+    #   deeper nodes a +1 per ply penalty, let a node keep its own utility if it
+    #   was lower than its children's, and scored states after an END for the
+    #   enemy.  This one takes the lowest utility, for this agent, of the states
+    #   3 moves on, or of a won or lost game.
+    #
+    #   With NumPy the last ply is scored a layer at a time by leafScores.
     #
     #Parameters:
     #   currentState - The state of the current game waiting for the player's move (GameState)
@@ -325,60 +340,132 @@ class AIPlayer(Player):
     #Return: The Move to be made
     ##
     def getMove(self, currentState):
-        #lists to store nodes
-        frontierNodes = []
-        expandedNodes = []
-
-        #creates a base node
-        rootNode = {
-            "move": None,
-            "state": currentState,
-            "depth": 0,
-            "evaluation": self.utility(currentState, None),
-            "parent": None,
-            "min": -100,
-            "max": 10000
-        }
-        frontierNodes.append(rootNode)
-
-        # expand all nodes down to depth 3
-        for nodeToExpand in frontierNodes:
-            if nodeToExpand["depth"] < 4:      
-                frontierNodes.remove(nodeToExpand)
-                expandedNodes.append(nodeToExpand)
-                if nodeToExpand["depth"] < 3:
-                    newFrontierNodes = self.expandNode(nodeToExpand)
-                    for newNode in newFrontierNodes:
-                        frontierNodes.append(newNode)
-    
+        self.myTurn = currentState.whoseTurn
+        #food never moves, so it is found once for every leaf
+        self.foodCoords = [food.coords for food in getConstrList(currentState, NEUTRAL, (FOOD,))]
+        search = AlphaBetaSearch(self.searchUtility, maxDepth = 3, timeLimit = self.moveTimeLimit,
+                                 remainingTime = self.remainingTime, lowerIsBetter = True, adversarial = False,
+                                 table = self.getTranspositionTable(),
+                                 leafFeatures = self.leafFeatures if HAVE_NUMPY else None,
+                                 leafScores = self.leafScores if HAVE_NUMPY else None)
+        return search.search(currentState)
 
-        # perform minimax
-        nodeDepth = 3
-        while (nodeDepth != 1):
-            for node in expandedNodes:
-                if node["depth"] == nodeDepth:
-                    if node["parent"]["state"].whoseTurn == currentState.whoseTurn:
-                        if node["evaluation"] < node["parent"]["evaluation"]:
-                            node["parent"]["evaluation"] = node["evaluation"]
-                    else:
-                        if node["evaluation"] < node["parent"]["evaluation"]:
-                            node["parent"]["evaluation"] = node["evaluation"]
-                    expandedNodes.remove(node)
-            nodeDepth -= 1
-
-        firstMoves = []
-        
-        # pick best move out of nodes at depth 1
-        if len(expandedNodes) == 1:
-            bestMove = frontierNodes[0]["move"]
-        else:
-            for node in expandedNodes:
-                if node["depth"] == 1:
-                    firstMoves.append(node)
-            bestMove = min(firstMoves, key = lambda node:node["evaluation"])["move"]
+
+    ##
+    #searchUtility
+    #Description: utility() scores a state for whoever's turn it is.  After an
+    #   END that would be the enemy, so score it for this agent instead.
+    #
+    #Parameters:
+    #   currentState - the state reached during the search
+    #   move - the move that reached it
+    #
+    #Returns the utility of the state for this agent
+    def searchUtility(self, currentState, move):
+        return self.utility(currentState, move, self.myTurn)
 
 
-        return bestMove
+    ##
+    #leafFeatures
+    #Description: Gathers what utility() looks at in a state reached during the
+    #   search, for leafScores to score a whole layer of them at once
+    #
+    #Parameters:
+    #   currentState - the state reached during the search
+    #   move - the move that reached it
+    #
+    #Returns a row of (standing still, food, number of workers, worker carrying,
+    #   worker x, y, have a queen, queen on a construction, queen x, y,
+    #   anthill x, y, tunnel x, y, number of drones, drone's distance to its
+    #   target, number of enemy ants)
+    def leafFeatures(self, currentState, move):
+        standing = move != None and move.moveType == MOVE_ANT and len(move.coordList) == 1 \
+            and getAntAt(currentState, move.coordList[-1]).type == WORKER
+        myInv = currentState.inventories[self.myTurn]
+        enemyAnts = currentState.inventories[1 - self.myTurn].ants
+
+        workers = []
+        drones = []
+        queen = None
+        for ant in myInv.ants:
+            if ant.type == WORKER:
+                workers.append(ant)
+            elif ant.type == DRONE:
+                drones.append(ant)
+            elif ant.type == QUEEN and queen is None:
+                queen = ant
+
+        worker = workers[0] if len(workers) == 1 else None
+        workerCoords = worker.coords if worker is not None else (0, 0)
+        queenOnConstr = False
+        queenCoords = (0, 0)
+        if queen is not None:
+            queenCoords = queen.coords
+            constr = getConstrAt(currentState, queen.coords)
+            queenOnConstr = constr != None and constr.type in (ANTHILL, TUNNEL, FOOD)
+        hillCoords = myInv.getAnthill().coords
+        tunnelCoords = myInv.getTunnels()[0].coords
+
+        #the drone heads for enemy workers, then drones, then the queen
+        droneDist = NO_DISTANCE
+        if len(drones) == 1:
+            for targetType in (WORKER, DRONE, QUEEN):
+                targets = [approxDist(enemy.coords, drones[0].coords) for enemy in enemyAnts
+                           if enemy.type == targetType]
+                if len(targets) != 0:
+                    droneDist = min(targets)
+                    break
+
+        return (standing, myInv.foodCount, len(workers), worker is not None and worker.carrying,
+                workerCoords[0], workerCoords[1], queen is not None, queenOnConstr,
+                queenCoords[0], queenCoords[1], hillCoords[0], hillCoords[1],
+                tunnelCoords[0], tunnelCoords[1], len(drones), droneDist, len(enemyAnts))
+
+
+    ##
+    #leafScores
+    #Description: utility() for this agent of every row from leafFeatures,
+    #   worked out with NumPy a column at a time.  It follows utility's
+    #   arithmetic step for step so the values come out the same.
+    #
+    #Parameters:
+    #   rows - rows from leafFeatures
+    #
+    #Returns a list of the utility of each row
+    def leafScores(self, rows):
+        (standing, food, numWorkers, carrying, workerX, workerY, haveQueen, queenOnConstr,
+            queenX, queenY, hillX, hillY, tunnelX, tunnelY, numDrones, droneDist, numEnemies) = columns(rows)
+
+        foodScore = numpy.where(food == 11, 1.0, 0.05 * food)
+
+        #see getWorkersScore, only one worker scores anything
+        foodDist = batchMinDist(workerX, workerY, self.foodCoords)
+        hillDist = batchDist(hillX, hillY, workerX, workerY)
+        tunnelDist = batchDist(tunnelX, tunnelY, workerX, workerY)
+        atHome = (hillDist == 0) | (tunnelDist == 0)
+        seeking = numpy.where(atHome, .06 - 0.005, .06)
+        seeking = numpy.where(foodDist == 0, seeking + 0.02, seeking + 0.02 * 1.0/(1.0 + foodDist))
+        carrying = carrying == 1
+        returning = numpy.where(foodDist == 0, .06 - 0.005, .06)
+        returning = numpy.where(atHome, returning + 0.05,
+            returning + (0.015 + 0.02 * 1.0/(1.0 + numpy.minimum(hillDist, tunnelDist))))
+        workersScore = numpy.where(numWorkers == 1, numpy.where(carrying, returning, seeking), 0.0)
+
+        #see getQueenScore, a queen off the constructions is never on the anthill
+        queenDist = batchDist(queenX, queenY, hillX, hillY)
+        queenScore = numpy.where(queenOnConstr == 1, 0.0, 0.05 * 1.0/numpy.maximum(queenDist, 1))
+
+        #see getDronesScore
+        droneScore = numpy.where(droneDist == NO_DISTANCE, 0.15 + 0.04, 0.15 + 0.04 * (1/(1 + droneDist)))
+        droneScore = numpy.where(numDrones == 1, droneScore, 0.0)
+
+        enemyScore = .85 - (0.025 * numEnemies)
+
+        scores = 400 * (1 - .54 * (foodScore + workersScore + queenScore + droneScore + 0.0 + enemyScore))
+        scores = numpy.where(haveQueen == 1, scores, 1.0)
+        scores = numpy.where(foodScore == 1.0, foodScore, scores)
+        scores = numpy.where(standing == 1, 1000, scores)
+        return scores.tolist()
     
 
     ##
@@ -475,5 +562,80 @@ class testRogers(unittest.TestCase):
         nodeArray = self.rogers.expandNode(node)
         self.assertEqual(len(nodeArray), 10, "Discovered nodes does not equal 10")
 
+    ## test searchUtility() scores for the searching player without touching the state
+    def testSearchUtility(self):
+        state = self.state.fastclone()
+        state.whoseTurn = PLAYER_TWO
+        self.rogers.myTurn = PLAYER_ONE
+        move = Move(END, None, None)
+        self.assertEqual(self.rogers.searchUtility(state, move), self.rogers.utility(self.state, move),
+            "searchUtility did not score the state for the searching player")
+        self.assertEqual(state.whoseTurn, PLAYER_TWO, "searchUtility changed whose turn it is")
+
+    ## test the search finds the lowest utility 2 moves on, like trying every move would
+    def testSearchMatchesExhaustive(self):
+        state = GameState.getBasicState()
+        state.inventories[PLAYER_ONE].ants.append(Ant((1, 1), WORKER, PLAYER_ONE))
+        state.inventories[PLAYER_TWO].ants.append(Ant((8, 8), WORKER, PLAYER_TWO))
+        for coords in ((2, 3), (7, 6)):
+            state.inventories[NEUTRAL].constrs.append(Construction(coords, FOOD))
+        state.phase = PLAY_PHASE
+        self.rogers.myTurn = state.whoseTurn
+
+        def lowest(state, move, depth):
+            if depth == 0:
+                return self.rogers.searchUtility(state, move)
+            return min(lowest(getNextStateAdversarial(state, nextMove), nextMove, depth - 1)
+                       for nextMove in listAllLegalMoves(state))
+
+        search = AlphaBetaSearch(self.rogers.searchUtility, maxDepth = 2, lowerIsBetter = True,
+                                 adversarial = False, table = self.rogers.getTranspositionTable())
+        move = search.search(state)
+        best = min(lowest(getNextStateAdversarial(state, rootMove), rootMove, 1)
+                   for rootMove in listAllLegalMoves(state))
+        self.assertEqual(lowest(getNextStateAdversarial(state, move), move, 1), best,
+            "search did not pick a move with the lowest utility")
+
+    ## test leafScores gives exactly what searchUtility does, and the search the same move
+    @unittest.skipUnless(HAVE_NUMPY, "needs NumPy")
+    def testLeafScores(self):
+        rng = random.Random(3)
+        state = GameState.getBasicState()
+        state.inventories[PLAYER_ONE].ants += [Ant((1, 1), WORKER, PLAYER_ONE), Ant((4, 4), DRONE, PLAYER_ONE)]
+        state.inventories[PLAYER_TWO].ants += [Ant((8, 8), WORKER, PLAYER_TWO), Ant((5, 5), DRONE, PLAYER_TWO)]
+        for coords in ((2, 1), (7, 2), (2, 8), (7, 7)):
+            state.inventories[NEUTRAL].constrs.append(Construction(coords, FOOD))
+        state.inventories[PLAYER_ONE].foodCount = 6
+        state.inventories[PLAYER_TWO].foodCount = 6
+        state.phase = PLAY_PHASE
+        start = state.fastclone()
+        self.rogers.foodCoords = [food.coords for food in getConstrList(state, NEUTRAL, (FOOD,))]
+
+        scored = 0
+        for ply in range(400):
+            if getWinner(state) is not None:
+                state = start.fastclone()
+            moves = listAllLegalMoves(state)
+            for me in (PLAYER_ONE, PLAYER_TWO):
+                self.rogers.myTurn = me
+                rows = []
+                expected = []
+                for move in moves:
+                    nextState = getNextStateAdversarial(state, move)
+                    rows.append(self.rogers.leafFeatures(nextState, move))
+                    expected.append(self.rogers.searchUtility(nextState, move))
+                self.assertEqual(self.rogers.leafScores(rows), expected)
+                scored += len(rows)
+            applyMove(state, moves[rng.randint(0, len(moves) - 1)])
+        self.assertGreater(scored, 10000)
+
+        self.rogers.myTurn = start.whoseTurn
+        searches = [AlphaBetaSearch(self.rogers.searchUtility, maxDepth = 2, lowerIsBetter = True, adversarial = False,
+                                    leafFeatures = leafFeatures, leafScores = leafScores)
+                    for leafFeatures, leafScores in ((None, None), (self.rogers.leafFeatures, self.rogers.leafScores))]
+        moves = [search.search(start) for search in searches]
+        self.assertTrue(sameMove(moves[0], moves[1]), "scoring leaves a layer at a time changed the move")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
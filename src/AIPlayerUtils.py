@@ -1,8 +1,13 @@
-import random
+import random, heapq, functools
 from Constants import *
 from Ant import *
 from Construction import *
 from Move import *
+from Transposition import objectKey, TURN_KEY
+from DistanceOracle import getDistanceOracle
+from PathFinder import findPath, findGreedyPath
+from BoardTables import LEGAL_COORDS, ADJACENT, ADJACENT_DELTAS, ATTACKABLE, QUEEN_FORBIDDEN_ROWS, \
+    computeAttackable
 
 #
 # AIPlayerUtils.py
@@ -26,6 +31,12 @@ from Move import *
 #
 # Return: true (legal) or false (illegal)
 def legalCoord(coord):
+    #the common case: a tuple on the board
+    try:
+        if coord in LEGAL_COORDS:
+            return True
+    except TypeError:
+        pass
 
     #make sure we have a tuple or list with two elements in it
     try:
@@ -114,6 +125,13 @@ def getConstrList(currentState,
 #
 # Return:  the construct at the coordinate or None if there is none
 def getConstrAt(state, coords):
+    #GameStates keep an index of what is where
+    if hasattr(state, "getOccupancyIndex"):
+        try:
+            return state.getOccupancyIndex().constrs.get(coords)
+        except TypeError:
+            pass  #unhashable coords, search the slow way
+
     #get a list of all constructs
     allConstrs = getConstrList(state)
 
@@ -136,7 +154,14 @@ def getConstrAt(state, coords):
 #
 # Return:  the ant at the coordinate or None if there is none
 def getAntAt(state, coords) -> Ant:
-    #get a list of all constructs
+    #GameStates keep an index of what is where
+    if hasattr(state, "getOccupancyIndex"):
+        try:
+            return state.getOccupancyIndex().ants.get(coords)
+        except TypeError:
+            pass  #unhashable coords, search the slow way
+
+    #get a list of all ants
     allAnts = getAntList(state)
 
     #search for one at the given coord
@@ -191,25 +216,22 @@ def getWinner(currentState):
 # Return: a list of all legal coords that are adjacent to the given space
 #
 def listAdjacent(coord):
+    #the neighbors of every cell are worked out in BoardTables
+    try:
+        return list(ADJACENT[tuple(coord)])
+    except (KeyError, TypeError):
+        pass
+
     #catch invalid inputs
     if not legalCoord(coord):
         return []
 
-    #this set of coord deltas represent movement in each cardinal direction
-    deltas = [ (-1, 0), (1, 0), (0, -1), (0, 1) ]
-    x = coord[0]
-    y = coord[1]
+    #legal but not a pair of ints, e.g. floats
     result = []
-
-    #calculate the cost after making each move
-    for delta in deltas:
-        newX = delta[0] + coord[0]
-        newY = delta[1] + coord[1]
-
-        #skip illegal moves
-        if legalCoord((newX, newY)):
-            result.append((newX, newY))
-
+    for delta in ADJACENT_DELTAS:
+        newCoord = (delta[0] + coord[0], delta[1] + coord[1])
+        if legalCoord(newCoord):
+            result.append(newCoord)
     return result
 
 ##
@@ -221,20 +243,12 @@ def listAdjacent(coord):
 # coord - the coordinate of the attacking ant
 # dist - the attack range of the attacking ant
 def listAttackable(coord, dist = 1):
-    res = []
-
-    # goes L-R across board, offset by 1 for range()
-    for i in range(-dist, dist + 1):
-        # get allowed y variance given x variance
-        # offset by 1 for range()
-        yLen = dist - abs(i)
-        for j in range(-yLen, yLen + 1):
-            newCord = (coord[0] + i, coord[1] + j)
-            if legalCoord(newCord) and newCord != coord:
-                res.append(newCord)
-
-    return res
-
+    #the usual ranges are worked out in BoardTables
+    coord = tuple(coord)
+    table = ATTACKABLE.get(dist)
+    if table is not None and coord in table:
+        return list(table[coord])
+    return list(computeAttackable(coord, dist))
 
 
 
@@ -267,22 +281,212 @@ def listReachableAdjacent(state, coords, movement, ignoresGrass = False):
     return candMoves
 
 ##
-# listAllMovementPaths              <!-- RECURSIVE -->
+# listAllMovementPaths
 #
 # calculates all the legal paths for a single ant to move from a given position.
 # The ant doesn't actually have to be there for this method to return a valid
 # answer.  This method does not take queen ant movement restrictions
 # into account.
 #
+# The paths only depend on the terrain and ants within reach, so they are
+# memoized on exactly that (see getMovementKey).
+#
 # Parameters:
 #    currentState - current game state
 #    coords       - where the ant is
 #    movement     - movement points ant has remaining
+#    ignoresGrass - whether the ant moves over grass at normal cost
+#    shortestOnly - return just one cheapest path to each reachable cell instead
+#                   of every path (much smaller branching factor for searches)
 #
 # Return: a list of lists of coords (tuples). Each sub-list of tuples is an
 # acceptable set of coords for a Move object
-# TODO: I think this method could be sped up to improve computation time
-def listAllMovementPaths(currentState, coords, movement, ignoresGrass = False):
+def listAllMovementPaths(currentState, coords, movement, ignoresGrass = False, shortestOnly = False):
+    if shortestOnly:
+        return listShortestMovementPaths(currentState, coords, movement, ignoresGrass)
+
+    key = getMovementKey(currentState, coords, movement, ignoresGrass)
+    if key is None:
+        return listAllMovementPathsRecursive(currentState, coords, movement, ignoresGrass)
+
+    #hand out fresh lists, callers are free to modify them
+    return [[coords] + list(path[1:]) for path in cachedMovementPaths(*key)]
+
+
+##
+# listShortestMovementPaths
+#
+# like listAllMovementPaths but with only one cheapest path to each cell the
+# ant can reach (and the zero-step move, last).  For the queen, paths through
+# the middle rows are never considered so each cell she can legally reach
+# still gets a path.
+#
+# Parameters:
+#    currentState - current game state
+#    coords       - where the ant is
+#    movement     - movement points ant has remaining
+#    ignoresGrass - whether the ant moves over grass at normal cost
+#    isQueen      - whether to keep out of the queen's forbidden rows
+#
+# Return: a list of lists of coords (tuples)
+def listShortestMovementPaths(currentState, coords, movement, ignoresGrass = False, isQueen = False):
+    key = getMovementKey(currentState, coords, movement, ignoresGrass)
+    if key is None:
+        #no index to build a key from, fall back to the exhaustive search
+        paths = listAllMovementPathsRecursive(currentState, coords, movement, ignoresGrass)
+        if isQueen:
+            paths = [path for path in paths if isPathOkForQueen(path)]
+        best = {}
+        for path in paths:
+            cost = pathCost(currentState, path, ignoresGrass)
+            dest = tuple(path[-1])
+            if len(path) > 1 and dest != tuple(coords) and (dest not in best or cost < best[dest][0]):
+                best[dest] = (cost, path)
+        return [entry[1] for entry in best.values()] + [path for path in paths if len(path) == 1]
+
+    return [[coords] + list(path[1:]) for path in cachedShortestPaths(*key, isQueen)]
+
+
+##
+# pathCost
+#
+# total movement points a path costs (entering each cell after the first)
+def pathCost(currentState, path, ignoresGrass = False):
+    cost = 0
+    for cell in path[1:]:
+        constr = getConstrAt(currentState, cell)
+        if constr is None or ignoresGrass:
+            cost += 1
+        else:
+            cost += CONSTR_STATS[constr.type][MOVE_COST]
+    return cost
+
+
+##
+# movementRegion
+#
+# the cells an ant with the given movement could possibly reach, in a fixed order
+#
+# Return: a tuple of coords
+@functools.lru_cache(maxsize=None)
+def movementRegion(coords, movement):
+    region = []
+    for x in range(coords[0] - movement, coords[0] + movement + 1):
+        for y in range(coords[1] - movement, coords[1] + movement + 1):
+            if abs(x - coords[0]) + abs(y - coords[1]) <= movement and legalCoord((x, y)):
+                region.append((x, y))
+    return tuple(region)
+
+
+##
+# getMovementKey
+#
+# describes everything that decides where an ant can move: its position, its
+# movement and the cost of entering each cell in reach (0 for cells that hold
+# an ant).  Uses the state's cached terrain costs.  Callers listing the moves
+# of several ants can pass the state's current OccupancyIndex as index.
+#
+# Return: a hashable key (coords, movement, region, costs) or None if the state
+#   has no occupancy index or the coords are unusual
+def getMovementKey(currentState, coords, movement, ignoresGrass = False, index = None):
+    if not hasattr(currentState, "getOccupancyIndex") or type(coords) is not tuple:
+        return None
+    if index is None:
+        index = currentState.getOccupancyIndex()
+    ants = index.ants
+    terrain = {} if ignoresGrass else index.getTerrainCosts()
+    region = movementRegion(coords, movement)
+    costs = tuple([0 if cell in ants else terrain.get(cell, 1) for cell in region])
+    return (coords, movement, region, costs)
+
+
+##
+# cachedMovementPaths
+#
+# every path listAllMovementPathsRecursive would find, computed from a
+# movement key instead of a state
+#
+# Return: a tuple of paths (tuples of coords)
+@functools.lru_cache(maxsize=8192)
+def cachedMovementPaths(coords, movement, region, costs):
+    cellCosts = dict(zip(region, costs))
+
+    def walk(cell, movement):
+        if (movement <= 0): return []
+        validMoves = []
+        oneStepMoves = []
+        for adj in listAdjacent(cell):
+            cost = cellCosts.get(adj, 0)
+            if cost and cost <= movement:
+                oneStepMoves.append((cell, adj))
+        validMoves += oneStepMoves
+        for move in oneStepMoves:
+            for ext in walk(move[-1], movement - cellCosts[move[-1]]):
+                validMoves.append(move + ext[1:])
+        validMoves.append((cell,))
+        return validMoves
+
+    return tuple(walk(coords, movement))
+
+
+##
+# cachedShortestPaths
+#
+# one cheapest path to each reachable cell (Dijkstra), computed from a movement
+# key.  Ties are broken by the order cells are discovered so results are stable.
+#
+# Return: a tuple of paths (tuples of coords), the zero-step move last
+@functools.lru_cache(maxsize=8192)
+def cachedShortestPaths(coords, movement, region, costs, isQueen = False):
+    if isQueen and not isPathOkForQueen([coords]):
+        return ()
+    cellCosts = dict(zip(region, costs))
+    best = {coords: 0}
+    parent = {}
+    order = []
+    count = 0
+    frontier = [(0, count, coords)]
+    while frontier:
+        spent, i, cell = heapq.heappop(frontier)
+        if spent > best[cell]:
+            continue
+        if cell != coords:
+            order.append(cell)
+        for adj in listAdjacent(cell):
+            cost = cellCosts.get(adj, 0)
+            if not cost or spent + cost > movement:
+                continue
+            if isQueen and not isPathOkForQueen([adj]):
+                continue
+            if adj not in best or spent + cost < best[adj]:
+                best[adj] = spent + cost
+                parent[adj] = cell
+                count += 1
+                heapq.heappush(frontier, (spent + cost, count, adj))
+
+    paths = []
+    for cell in order:
+        path = [cell]
+        while path[-1] != coords:
+            path.append(parent[path[-1]])
+        paths.append(tuple(reversed(path)))
+    paths.append((coords,))
+    return tuple(paths)
+
+
+##
+# listAllMovementPathsRecursive              <!-- RECURSIVE -->
+#
+# the original, uncached version of listAllMovementPaths.  Used for states that
+# don't have an occupancy index.
+#
+# Parameters:
+#    currentState - current game state
+#    coords       - where the ant is
+#    movement     - movement points ant has remaining
+#
+# Return: a list of lists of coords (tuples).
+def listAllMovementPathsRecursive(currentState, coords, movement, ignoresGrass = False):
     #base case: ant can't move any further
     if (movement <= 0): return []
 
@@ -305,7 +509,7 @@ def listAllMovementPaths(currentState, coords, movement, ignoresGrass = False):
             cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
 
         #get a list of all moves that will extend this one
-        extensions = listAllMovementPaths(currentState, moveCoords, movement - cost, ignoresGrass)
+        extensions = listAllMovementPathsRecursive(currentState, moveCoords, movement - cost, ignoresGrass)
 
         #create new moves by adding each extension to the base move
         for ext in extensions:
@@ -324,54 +528,29 @@ def listAllMovementPaths(currentState, coords, movement, ignoresGrass = False):
 # stepsToReach
 #
 # calculates the shortest distance between two cells taking
-# movement costs into account.
+# movement costs into account.  Other ants are ignored.  Distances come from
+# a DistanceOracle shared by all states with the same terrain, so after the
+# first call from a cell every call is a lookup.
 #
 #Parameters:
 #   currentState   - The state of the game (GameState)
 #   src            - starting position (an x,y coord)
 #   dst            - destination position (an x,y coord)
+#   ignoresGrass   - True for ants that cross grass at normal cost
 #
 # Return: the costs in steps (an integer) or -1 on invalid input
-def stepsToReach(currentState, src, dst):
+def stepsToReach(currentState, src, dst, ignoresGrass = False):
     #check for invalid input
     if (not legalCoord(src)): return -1
     if (not legalCoord(dst)): return -1
 
-    #a dictionary of already visted cells and the corresponding cost to reach
-    visited = { src : 0 }
-    #a list of to be processed cells
-    queue = [ src ]
-
-    #this loops processes cells in the queue until it is empty
-    while(len(queue) > 0):
-        cell = queue.pop(0)
-
-        #if this cell is our destination we are done
-        if (cell == dst):
-            return visited[cell]
-
-        #calc distance to all cells adj to this one assuming we reach them
-        #from this one
-        nextSteps = listAdjacent(cell)
-        for newCell in nextSteps:
-            constrAtDest = getConstrAt(currentState, newCell)
-            cost = 1  #default
-            if constrAtDest != None:
-                cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
-            dist = visited[cell] + cost
-
-            #if the new distance is best so far, update the visited dict
-            if (newCell in visited):
-                if (dist < visited[newCell]):
-                    visited[newCell] = dist
-            #if we've never seen this cell before also update dict and
-            #enqueue this new cell to be processed at a future loop iteration
-            else:
-                visited[newCell] = dist
-                queue.append(newCell)
-
-    #we should never reach this point
-    return -1
+    if hasattr(currentState, "getOccupancyIndex"):
+        terrainCosts = currentState.getOccupancyIndex().getTerrainCosts()
+    else:
+        terrainCosts = {}
+        for constr in reversed(getConstrList(currentState)):
+            terrainCosts[tuple(constr.coords)] = CONSTR_STATS[constr.type][MOVE_COST]
+    return getDistanceOracle(terrainCosts).distance(src, dst, ignoresGrass)
 
 
 ##
@@ -417,8 +596,7 @@ def createPathToward(currentState, sourceCoords, targetCoords, movement):
 # findPathRecursive
 #
 # finds the best path from a given source, target, and movement and returns it and the end distance to target
-# To save on computation time, this path is not necessarily optimal if there's not enough movement to reach the target.
-# In most cases it will still be optimal.
+# The path ends as close to the target as the movement allows; see PathFinder.findGreedyPath.
 #
 # state - the state to find the path in: GameState
 # source - the start location of the path: (x: int, y: int)
@@ -427,31 +605,7 @@ def createPathToward(currentState, sourceCoords, targetCoords, movement):
 # ignoresGrass - if the path should respect grass movement penalty: bool
 #
 def findPathRecursive(state, source, target, movement, ignoresGrass):
-    dist = approxDist(source, target)
-    if dist == 0:
-        return ([source], 0)
-    if movement == 0:
-        return ([source], dist)
-
-    bestPath = ([source], dist)
-    for coord in listReachableAdjacent(state, source, movement, ignoresGrass):
-        # find movement cost to go here
-        cost = 1
-        if not ignoresGrass:
-            const = getConstrAt(state, coord)
-            if const is not None:
-                cost = const.movementCost
-
-        # find best path
-        path = findPathRecursive(state, coord, target, movement - cost, ignoresGrass)
-
-        # if this path is better than we've found, use it
-        if path[1] < bestPath[1]:
-            bestPath = ([source] + path[0], path[1])
-            # computation time decrease
-            if bestPath[1] == 0 or bestPath[1] == dist - movement:
-                return bestPath
-    return bestPath
+    return findGreedyPath(state, source, target, movement, ignoresGrass)
 
 
 ##
@@ -493,8 +647,7 @@ def listAllBuildMoves(currentState):
 #
 def isPathOkForQueen(path):
     for coord in path:
-        if (coord[1] == BOARD_LENGTH / 2 - 1) \
-        or (coord[1] == BOARD_LENGTH / 2):
+        if coord[1] in QUEEN_FORBIDDEN_ROWS:
             return False
     return True
 
@@ -506,9 +659,10 @@ def isPathOkForQueen(path):
 #
 # Parameters:
 #   currentState - the current state
+#   shortestOnly - only one cheapest path per destination (see listAllMovementPaths)
 #
 # Returns:  a list of Move objects
-def listAllMovementMoves(currentState):
+def listAllMovementMoves(currentState, shortestOnly = False):
     result = []
 
     #first get all MOVE_ANT moves for each ant in the inventory
@@ -518,10 +672,17 @@ def listAllMovementMoves(currentState):
         if (ant.hasMoved): continue
 
         #create a Move object for each valid movement path
-        allPaths = listAllMovementPaths(currentState,
-                                        ant.coords,
-                                        UNIT_STATS[ant.type][MOVEMENT],
-                                        UNIT_STATS[ant.type][IGNORES_GRASS])
+        if shortestOnly:
+            allPaths = listShortestMovementPaths(currentState,
+                                                 ant.coords,
+                                                 UNIT_STATS[ant.type][MOVEMENT],
+                                                 UNIT_STATS[ant.type][IGNORES_GRASS],
+                                                 ant.type == QUEEN)
+        else:
+            allPaths = listAllMovementPaths(currentState,
+                                            ant.coords,
+                                            UNIT_STATS[ant.type][MOVEMENT],
+                                            UNIT_STATS[ant.type][IGNORES_GRASS])
 
         #remove moves that take the queen out of her territory
         if (ant.type == QUEEN):
@@ -546,11 +707,12 @@ def listAllMovementMoves(currentState):
 #
 # Parameters:
 #   currentState - the current state
+#   shortestOnly - only one cheapest path per destination (see listAllMovementPaths)
 #
 # Returns:  a list of Move objects
-def listAllLegalMoves(currentState):
+def listAllLegalMoves(currentState, shortestOnly = False):
     result = []
-    result.extend(listAllMovementMoves(currentState))
+    result.extend(listAllMovementMoves(currentState, shortestOnly))
     result.extend(listAllBuildMoves(currentState))
     result.append(Move(END, None, None))
     return result
@@ -627,6 +789,7 @@ def getEnemyInv(self, currentState):
 def getNextState(currentState, move):
     # variables I will need
     myGameState = currentState.fastclone()
+    index = myGameState.getOccupancyIndex()
     myInv = getCurrPlayerInventory(myGameState)
     me = myGameState.whoseTurn
     myAnts = myInv.ants
@@ -645,6 +808,7 @@ def getNextState(currentState, move):
         if move.buildType in antTypes:
             ant = Ant(myInv.getAnthill().coords, move.buildType, me)
             myInv.ants.append(ant)
+            index.addAnt(myGameState, ant)
             # Update food count depending on ant built
             myInv.foodCount -= UNIT_STATS[move.buildType][COST]
         # ants are no longer allowed to build tunnels, so this is an error
@@ -658,7 +822,7 @@ def getNextState(currentState, move):
         startingCoord = move.coordList[0]
         for ant in myAnts:
             if ant.coords == startingCoord:
-                ant.coords = newCoord
+                myGameState.setAntCoords(ant, newCoord)
                 # TODO: should this be set true? Design decision
                 ant.hasMoved = False
                 # If an ant is carrying food and ends on the anthill or tunnel drop the food
@@ -671,10 +835,9 @@ def getNextState(currentState, move):
                         ant.carrying = False
                 # If an ant doesn't have food and ends on the food grab food
                 if not ant.carrying and ant.type == WORKER:
-                    foods = getConstrList(myGameState, 2, [FOOD])
-                    for food in foods:
-                        if food.coords == ant.coords:
-                            ant.carrying = True
+                    food = getConstrAt(myGameState, ant.coords)
+                    if food is not None and food.type == FOOD:
+                        ant.carrying = True
                 # If my ant is close to an enemy ant attack it
                 attackable = listAttackable(ant.coords, UNIT_STATS[ant.type][RANGE])
                 for coord in attackable:
@@ -686,6 +849,7 @@ def getNextState(currentState, move):
                             # inventory
                             if foundAnt.health <= 0:
                                 myGameState.inventories[1 - me].ants.remove(foundAnt)
+                                index.removeAnt(myGameState, foundAnt)
                             # If attacked an ant already don't attack any more
                             break
     return myGameState
@@ -721,6 +885,176 @@ def getNextStateAdversarial(currentState, move):
     return nextState
 
 
+##
+# applyMove
+#
+# Description: Makes a move on the given state in place, exactly as
+# getNextStateAdversarial would (hasMoved is updated and END passes the turn),
+# and returns what undoMove needs to take it back.  Searches can then walk the
+# tree with one state instead of cloning a state per node:
+#
+#       token = applyMove(state, move)
+#       ...look at state...
+#       undoMove(state, token)
+#
+# Like getNextState only the inventories are kept up to date; the board is set
+# to None until the move is undone.  Moves must be undone in the reverse order
+# they were made.
+#
+# Parameters:
+#   state - The GameState to change (GameState)
+#   move - The move that the agent would take (Move)
+#
+# Return: an undo token for undoMove
+##
+def applyMove(state, move):
+    journal = []
+    # ants are no longer allowed to build tunnels, so this is an error
+    if move.moveType == BUILD and move.buildType == TUNNEL:
+        print("Attempted tunnel build in applyMove()")
+        return journal
+
+    me = state.whoseTurn
+    myInv = getCurrPlayerInventory(state)
+    myAntHill = myInv.getAnthill()
+    index = state.getOccupancyIndex()
+    hashKey = state.hashKey
+    journalSet(journal, state, "hashKey", None)
+    journalSet(journal, state, "board", None)
+
+    # If enemy ant is on my anthill update capture health
+    ant = getAntAt(state, myAntHill.coords)
+    if ant is not None and ant.player != me:
+        journalSet(journal, myAntHill, "captureHealth", myAntHill.captureHealth - 1)
+
+    if move.moveType == BUILD:
+        if move.buildType in (WORKER, DRONE, SOLDIER, R_SOLDIER):
+            ant = Ant(myAntHill.coords, move.buildType, me)
+            myInv.ants.append(ant)
+            index.addAnt(state, ant)
+            journal.append(("added", myInv.ants, ant))
+            journalSet(journal, myInv, "foodCount", myInv.foodCount - UNIT_STATS[move.buildType][COST])
+
+    elif move.moveType == MOVE_ANT:
+        newCoord = move.coordList[-1]
+        startingCoord = move.coordList[0]
+        for ant in myInv.ants:
+            if ant.coords != startingCoord:
+                continue
+            journal.append((ant, "coords", ant.coords))
+            state.setAntCoords(ant, newCoord)
+            # drop food on the anthill or a tunnel
+            if ant.carrying:
+                for constr in [myAntHill] + myInv.getTunnels():
+                    if ant.carrying and ant.coords == constr.coords:
+                        journalSet(journal, myInv, "foodCount", myInv.foodCount + 1)
+                        journalSet(journal, ant, "carrying", False)
+            # pick up food
+            if not ant.carrying and ant.type == WORKER:
+                food = getConstrAt(state, ant.coords)
+                if food is not None and food.type == FOOD:
+                    journalSet(journal, ant, "carrying", True)
+            # attack the first enemy in range
+            if not index.valid:
+                index = state.getOccupancyIndex()
+            antsAt = index.ants
+            for coord in listAttackable(ant.coords, UNIT_STATS[ant.type][RANGE]):
+                foundAnt = antsAt.get(coord)
+                if foundAnt is not None and foundAnt.player != me:
+                    journalSet(journal, foundAnt, "health", foundAnt.health - UNIT_STATS[ant.type][ATTACK])
+                    if foundAnt.health <= 0:
+                        enemyAnts = state.inventories[1 - me].ants
+                        journal.append(("removed", enemyAnts, enemyAnts.index(foundAnt), foundAnt))
+                        enemyAnts.remove(foundAnt)
+                        index.removeAnt(state, foundAnt)
+                    break
+        for ant in myInv.ants:
+            if ant.coords == newCoord:
+                journalSet(journal, ant, "hasMoved", True)
+
+    elif move.moveType == END:
+        for ant in myInv.ants:
+            if ant.hasMoved:
+                journalSet(journal, ant, "hasMoved", False)
+        journalSet(journal, state, "whoseTurn", 1 - me)
+
+    if hashKey is not None:
+        state.hashKey = updateHash(hashKey, state, journal)
+    return journal
+
+
+##
+# undoMove
+#
+# Description: Takes back a move made by applyMove
+#
+# Parameters:
+#   state - The GameState the move was made on (GameState)
+#   token - What applyMove returned
+##
+def undoMove(state, token):
+    for entry in reversed(token):
+        if entry[0] == "added":
+            ants, ant = entry[1], entry[2]
+            ants.pop()
+            if state.index is not None:
+                state.index.removeAnt(state, ant)
+        elif entry[0] == "removed":
+            ants, i, ant = entry[1], entry[2], entry[3]
+            ants.insert(i, ant)
+            if state.index is not None:
+                state.index.addAnt(state, ant)
+        elif entry[1] == "coords":
+            state.setAntCoords(entry[0], entry[2])
+        else:
+            setattr(entry[0], entry[1], entry[2])
+
+
+##
+# updateHash
+#
+# works out a state's new Zobrist hash (see Transposition.py) from its old one
+# and the journal of what applyMove changed
+#
+# Parameters:
+#   hashKey - the hash before the move
+#   state - the state after the move
+#   journal - the journal applyMove made
+#
+# Return: the hash after the move
+def updateHash(hashKey, state, journal):
+    oldValues = {}
+    touched = []
+    removed = []
+    for entry in journal:
+        if entry[0] == "added":
+            hashKey ^= objectKey(entry[2])
+        elif entry[0] == "removed":
+            removed.append(entry[3])
+        elif entry[0] is state:
+            if entry[1] == "whoseTurn":
+                hashKey ^= TURN_KEY
+        else:
+            if id(entry[0]) not in oldValues:
+                oldValues[id(entry[0])] = {}
+                touched.append(entry[0])
+            oldValues[id(entry[0])].setdefault(entry[1], entry[2])
+    for obj in touched:
+        hashKey ^= objectKey(obj, oldValues[id(obj)])
+        if not obj in removed:
+            hashKey ^= objectKey(obj)
+    return hashKey
+
+
+##
+# journalSet
+#
+# sets an attribute and records its old value for undoMove
+def journalSet(journal, obj, name, value):
+    journal.append((obj, name, getattr(obj, name)))
+    setattr(obj, name, value)
+
+
 ##
 # returns a character representation of a given ant
 # (helper for asciiPrintState)
@@ -814,33 +1148,12 @@ def asciiPrintState(state):
     print(" food: " + str(p1Food) + "/" + str(p2Food))
 
 
-class GraphNode:
-
-    def __init__(self, parent=None, coords=None, f=0.0, g=0.0, h=0.0):
-        self.parent = parent
-        self.coords = coords
-        self.f = f
-        self.g = g
-        self.h = h
-
-    def __hash__(self):
-        return hash(self.coords)
-
-    def __eq__(self, other):
-        if self.coords == other.coords:
-            return True
-        return False
-
-    def __str__(self):
-        return str(self.coords)
-
-
 ##
 # aStarSearchPath
 #
 # Create a path towards from start to goal
-# CAVEAT: A-STAR SEARCH IS SLOWER THAN createPathToward() BECAUSE THIS IS OPTIMAL
-#         AND createPathTowards() IS GREEDY FOR TIME EFFICIENCY
+# The path is a shortest one (every step counting as 1) cut down to the part the
+# ant can walk this turn; see PathFinder.findPath.
 #
 #   @param currentState - a gameState
 #   @param start - the Ant's Coordinates aka ant.coords
@@ -848,76 +1161,6 @@ class GraphNode:
 #
 ##
 def aStarSearchPath(currentState, start, goal):
-    start = GraphNode(coords=start)
-    goal = GraphNode(coords=goal)
-
-    ant = getAntAt(currentState, start.coords)
-
+    ant = getAntAt(currentState, start)
     antMovement = UNIT_STATS[ant.type][MOVEMENT]
-    antMovement = antMovement + 1
-    ign_grass = UNIT_STATS[ant.type][IGNORES_GRASS]
-
-    if start.coords == goal.coords:
-        return []
-
-    start.f = start.g + approxDist(start.coords, goal.coords)
-    open_list = [start, ]
-    closed_list = list()
-    current = start
-
-    while open_list:
-        if current == goal:
-            return construct_path(current, antMovement)
-
-        current = open_list.pop(open_list.index(min(open_list, key=lambda x: x.f)))
-
-        if current in closed_list:
-            continue
-
-        for neighbor in neighbors(currentState, current, goal, ign_grass, antMovement):
-            if neighbor == goal:
-                return construct_path(current, antMovement)
-            if neighbor in open_list:
-                other = next((x for x in open_list if x.coords == neighbor.coords), None)
-                if next((x for x in open_list if x.coords == neighbor.coords), None) is not None:
-                    if other.f < neighbor.f:
-                        continue
-            if neighbor in closed_list:
-                other = next((x for x in open_list if x.coords == neighbor.coords), None)
-                if next((x for x in open_list if x.coords == neighbor.coords), None) is not None:
-                    if other.f < neighbor.f:
-                        continue
-                    else:
-                        open_list.append(neighbor)
-                else:
-                    open_list.append(neighbor)
-            else:
-                open_list.append(neighbor)
-
-        closed_list.append(current)
-
-    return False
-
-
-def neighbors(currentState, node, goal, ign_grass, antMovement):
-    bors = [GraphNode(coords=y) for y in listReachableAdjacent(currentState, node.coords, antMovement, ign_grass)]
-    for bor in bors:
-        bor.g = node.g + 1
-        bor.f = bor.g + approxDist(bor.coords, goal.coords)
-        bor.parent = node
-    return bors
-
-
-def construct_path(node, antMovement):
-    path = [node, ]
-    normalPath = list()
-    while node.parent is not None:
-        node = node.parent
-        path.append(node)
-
-    for x in path:
-        normalPath.append(x.coords)
-
-    li = normalPath[::-1]
-
-    return li if len(li) <= antMovement else li[:antMovement]
+    return findPath(currentState, start, goal, antMovement + 1)
@@ -0,0 +1,362 @@
+import time
+from Constants import *
+from AIPlayerUtils import *
+from Transposition import zobristHash, EXACT, LOWER_BOUND, UPPER_BOUND
+
+##
+# AISearch.py
+#
+# A reusable game tree search for agents.  An agent only has to supply a
+# utility function with the same signature as Rogers.utility:
+#
+#       utility(state, move) -> number
+#
+# where state is the position reached by playing move.  AlphaBetaSearch then
+# looks ahead with depth-first alpha-beta, deepening one ply at a time until
+# it reaches maxDepth or runs out of time, and returns the best move of the
+# deepest search it finished:
+#
+#       search = AlphaBetaSearch(self.utility, maxDepth=3, timeLimit=self.moveTimeLimit,
+#                                remainingTime=self.remainingTime,
+#                                table=self.getTranspositionTable())
+#       return search.search(currentState)
+#
+# The search walks a single copy of the state with applyMove/undoMove, so it
+# uses memory in proportion to its depth, not the size of the tree.
+#
+# An agent can also have the last ply scored a layer at a time, e.g. with
+# NumPy (see BatchUtility.py), by passing leafFeatures(state, move) -> row
+# and leafScores(rows) -> list of utilities.  The values must be the ones
+# utility would give; they only save the per-leaf call overhead.
+#
+
+#Fraction of the time limit the search lets itself use (the rest is left for
+#returning the move and the game's own overhead)
+SAFETY_MARGIN = 0.85
+
+#Value of a won position.  Well beyond anything a utility should return;
+#quicker wins score a little higher.
+WIN_VALUE = 1e9
+
+#Check the clock every this many nodes
+CLOCK_INTERVAL = 32
+
+#Deepest iterative deepening goes when there is a time limit but no maxDepth
+MAX_SEARCH_DEPTH = 64
+
+
+##
+#SearchTimeout
+#Description: Raised inside the search when the time budget runs out
+##
+class SearchTimeout(Exception):
+    pass
+
+
+##
+# sameMove
+#
+# Return: True if two Move objects describe the same move
+def sameMove(move1, move2):
+    if move1 is None or move2 is None:
+        return False
+    return move1.moveType == move2.moveType and move1.buildType == move2.buildType \
+        and move1.coordList == move2.coordList
+
+
+##
+#AlphaBetaSearch
+#Description: Depth-first alpha-beta search with iterative deepening, move
+#   ordering and a wall-clock budget.
+#
+#   Moves are searched best-first: the best move from the transposition table
+#   (or from the previous, shallower iteration) goes first, which is what lets
+#   alpha-beta cut off most of the tree.
+#
+#Variables:
+#   utility - the agent's utility function (state, move) -> number
+#   maxDepth - how many moves to look ahead (None for as deep as time allows)
+#   timeLimit - seconds the player has to answer, None for no limit
+#   remainingTime - a function giving the seconds the player has left, None if
+#                   unlimited (Player.remainingTime).  If given, the search
+#                   keeps to the player's own clock, which is CPU time when
+#                   the game limits CPU time, instead of timing itself.
+#   lowerIsBetter - True if smaller utilities are better (e.g. Rogers)
+#   adversarial - False to treat the opponent's moves as the agent's own (every
+#                 node picks the best value for the agent), True for minimax
+#   table - a TranspositionTable to use or None
+#   shortestOnly - only consider one cheapest path per destination (see
+#                  AIPlayerUtils.listAllMovementPaths)
+#   leafFeatures - a function (state, move) -> a row of numbers describing a
+#                  leaf, None to call utility on every leaf
+#   leafScores - a function (list of rows) -> the utility of each row's leaf
+#   nodes - number of nodes visited by the last search
+#   depthReached - depth of the deepest finished iteration of the last search
+#   deadline - time.time() the running search must stop by (None if untimed)
+#   reserve - the running search stops when remainingTime() falls to this
+#             (None if it doesn't go by remainingTime)
+##
+class AlphaBetaSearch(object):
+
+    ##
+    #__init__
+    #Description: Creates a new AlphaBetaSearch
+    ##
+    def __init__(self, utility, maxDepth = 3, timeLimit = None, lowerIsBetter = False,
+                 adversarial = True, table = None, shortestOnly = False, remainingTime = None,
+                 leafFeatures = None, leafScores = None):
+        if maxDepth is None and timeLimit is None:
+            raise ValueError("AlphaBetaSearch needs a maxDepth or a timeLimit")
+        self.utility = utility
+        self.maxDepth = maxDepth
+        self.timeLimit = timeLimit
+        self.remainingTime = remainingTime
+        self.lowerIsBetter = lowerIsBetter
+        self.adversarial = adversarial
+        self.table = table
+        self.shortestOnly = shortestOnly
+        self.leafFeatures = leafFeatures
+        self.leafScores = leafScores
+        self.nodes = 0
+        self.depthReached = 0
+        self.deadline = None
+        self.reserve = None
+        self.rootPlayer = None
+
+    ##
+    #search
+    #Description: Finds the best move for the player whose turn it is
+    #
+    #Parameters:
+    #   currentState - the state to move from (GameState).  It is not changed.
+    #
+    #Return: a Move (END if there is nothing better to do)
+    ##
+    def search(self, currentState):
+        startTime = time.time()
+        self.deadline = None
+        self.reserve = None
+        budget = self.remainingTime() if self.remainingTime is not None else None
+        if budget is not None:
+            self.reserve = budget * (1 - SAFETY_MARGIN)
+        elif self.timeLimit is not None:
+            self.deadline = startTime + self.timeLimit * SAFETY_MARGIN
+        self.nodes = 0
+        self.depthReached = 0
+        self.rootPlayer = currentState.whoseTurn
+        if self.table is not None:
+            self.table.newSearch()
+
+        state = currentState.fastclone()
+        zobristHash(state)
+
+        bestMove = None
+        rootMoves = listAllLegalMoves(state, self.shortestOnly)
+        maxDepth = self.maxDepth if self.maxDepth is not None else MAX_SEARCH_DEPTH
+        for depth in range(1, maxDepth + 1):
+            if bestMove is not None and self.outOfTime():
+                break
+            try:
+                value, move = self.searchRoot(state, rootMoves, depth, bestMove)
+            except SearchTimeout:
+                break
+            bestMove = move
+            self.depthReached = depth
+            if abs(value) >= WIN_VALUE - MAX_SEARCH_DEPTH:
+                break  #the outcome is already decided
+
+        if bestMove is None:
+            #didn't even finish one ply, anything legal will do
+            bestMove = rootMoves[-1]
+        return bestMove
+
+    ##
+    #outOfTime
+    #
+    #Return: True if the running search has used up its time
+    ##
+    def outOfTime(self):
+        if self.reserve is not None:
+            return self.remainingTime() <= self.reserve
+        return self.deadline is not None and time.time() > self.deadline
+
+    ##
+    #searchRoot
+    #Description: One iteration of iterative deepening
+    #
+    #Return: (value, best move)
+    ##
+    def searchRoot(self, state, rootMoves, depth, previousBest):
+        alpha = -float("inf")
+        beta = float("inf")
+        bestValue = -float("inf")
+        bestMove = None
+        moves = self.orderMoves(rootMoves, previousBest)
+        leafValues = self.scoreLeaves(state, moves, 1) if depth == 1 and self.leafScores is not None else None
+        for i, move in enumerate(moves):
+            if leafValues is not None:
+                value = leafValues[i]
+            else:
+                token = applyMove(state, move)
+                try:
+                    value = self.alphaBeta(state, move, depth - 1, alpha, beta, 1)
+                finally:
+                    undoMove(state, token)
+            if value > bestValue:
+                bestValue = value
+                bestMove = move
+            alpha = max(alpha, value)
+        if self.table is not None:
+            self.table.store(state.hashKey, depth, bestValue, EXACT, bestMove)
+        return bestValue, bestMove
+
+    ##
+    #alphaBeta
+    #Description: Values a state from the point of view of the player the search
+    #   is for (higher is better, whatever the utility's convention)
+    #
+    #Parameters:
+    #   state - the state (changed and restored by applyMove/undoMove)
+    #   move - the move that reached the state
+    #   depth - how many more moves to look ahead
+    #   alpha, beta - the alpha-beta window
+    #   ply - how many moves from the root
+    #
+    #Return: the value of the state
+    ##
+    def alphaBeta(self, state, move, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and self.outOfTime():
+            raise SearchTimeout()
+
+        value = self.terminalValue(state, ply)
+        if value is not None:
+            return value
+
+        if depth <= 0:
+            value = self.utility(state, move)
+            return -value if self.lowerIsBetter else value
+
+        #utilities may look at the move that reached a state, so only the values
+        #of searched (depth > 0) nodes are kept in the table
+        tableMove = None
+        if self.table is not None:
+            entry = self.table.lookup(state.hashKey)
+            if entry is not None:
+                tableMove = entry.bestMove
+                if entry.depth >= depth:
+                    if entry.flag == EXACT:
+                        return entry.value
+                    elif entry.flag == LOWER_BOUND:
+                        alpha = max(alpha, entry.value)
+                    elif entry.flag == UPPER_BOUND:
+                        beta = min(beta, entry.value)
+                    if alpha >= beta:
+                        return entry.value
+
+        maximizing = not self.adversarial or state.whoseTurn == self.rootPlayer
+        alphaOrig = alpha
+        betaOrig = beta
+        bestValue = -float("inf") if maximizing else float("inf")
+        bestMove = None
+        moves = self.orderMoves(listAllLegalMoves(state, self.shortestOnly), tableMove)
+        #the whole last ply is scored before any of it is looked at, which
+        #changes how many leaves are visited but not the result
+        leafValues = self.scoreLeaves(state, moves, ply + 1) if depth == 1 and self.leafScores is not None else None
+        for i, nextMove in enumerate(moves):
+            if leafValues is not None:
+                value = leafValues[i]
+            else:
+                token = applyMove(state, nextMove)
+                try:
+                    value = self.alphaBeta(state, nextMove, depth - 1, alpha, beta, ply + 1)
+                finally:
+                    undoMove(state, token)
+
+            if maximizing:
+                if value > bestValue:
+                    bestValue = value
+                    bestMove = nextMove
+                alpha = max(alpha, value)
+            else:
+                if value < bestValue:
+                    bestValue = value
+                    bestMove = nextMove
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if self.table is not None:
+            if bestValue <= alphaOrig:
+                flag = UPPER_BOUND
+            elif bestValue >= betaOrig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.table.store(state.hashKey, depth, bestValue, flag, bestMove)
+        return bestValue
+
+    ##
+    #terminalValue
+    #
+    #Return: the value of a won or lost state ply moves from the root, None if
+    #   the game isn't over
+    ##
+    def terminalValue(self, state, ply):
+        winner = getWinner(state)
+        if winner is None:
+            return None
+        if (winner == 1) == (state.whoseTurn == self.rootPlayer):
+            return WIN_VALUE - ply
+        return -WIN_VALUE + ply
+
+    ##
+    #scoreLeaves
+    #Description: Values the states a list of moves reach, as alphaBeta would at
+    #   depth 0, with one leafScores call for all of them
+    #
+    #Parameters:
+    #   state - the state the moves are made from (changed and restored)
+    #   moves - the moves to score
+    #   ply - how many moves from the root the leaves are
+    #
+    #Return: the value of each move's state, in the order of moves
+    ##
+    def scoreLeaves(self, state, moves, ply):
+        values = []
+        rows = []
+        for move in moves:
+            self.nodes += 1
+            if self.nodes % CLOCK_INTERVAL == 0 and self.outOfTime():
+                raise SearchTimeout()
+            token = applyMove(state, move)
+            try:
+                value = self.terminalValue(state, ply)
+                if value is None:
+                    rows.append(self.leafFeatures(state, move))
+            finally:
+                undoMove(state, token)
+            values.append(value)
+
+        scores = iter(self.leafScores(rows) if rows else ())
+        sign = -1 if self.lowerIsBetter else 1
+        return [sign * next(scores) if value is None else value for value in values]
+
+    ##
+    #orderMoves
+    #Description: Puts the most promising move first, otherwise keeps the
+    #   generator's order
+    #
+    #Parameters:
+    #   moves - the legal moves
+    #   firstMove - the move to try first (or None)
+    #
+    #Return: the reordered list of moves
+    ##
+    def orderMoves(self, moves, firstMove):
+        if firstMove is None:
+            return moves
+        for i in range(len(moves)):
+            if sameMove(moves[i], firstMove):
+                return [moves[i]] + moves[:i] + moves[i + 1:]
+        return moves
@@ -0,0 +1,295 @@
+import os, sys, time, importlib, multiprocessing, traceback
+from Constants import *
+from MatchEngine import MoveTimeout, callWithTimeLimit, CPU_WALL_FACTOR
+from Move import Move
+from StateCodec import encodeState, decodeState, canEncodeMove, encodeMove, decodeMove
+
+##
+# AgentProcess.py
+#
+# Runs an AI in a process of its own so that a slow or hung agent can be
+# stopped.  A thread that misses its time limit can only be abandoned and keeps
+# a core busy for the rest of the run; a process that misses its deadline is
+# terminated, and a fresh one is started the next time the agent is needed.
+#
+# An AgentProcess stands in for the Player it hosts:
+#
+#       player = AgentProcess(module.AIPlayer(0), "AI")
+#       player.moveTimeLimit = 1.0
+#       move = player.getMove(state)        #MoveTimeout after 1 second
+#
+# With cpuTime set the limit is on the CPU time the agent uses.  That is
+# watched from inside the agent's process (see MatchEngine.callWithTimeLimit),
+# which reports a timeout for the process to be killed; the game still kills
+# an agent that takes CPU_WALL_FACTOR times the limit in wall-clock time.
+#
+# Calls and answers are pickled over a Pipe, except for the GameState the agent
+# is shown and the Move it answers with, which go as StateCodec bytes: a few
+# hundred instead of a few thousand, and quicker to pack and unpack.  The agent
+# gets an exact copy of the state, down to the Location coords of a flipped board.
+#
+
+#seconds an agent's process may take to start and load the agent
+START_TIMEOUT = 30
+
+#seconds to wait for calls the game makes between moves (seedRandom, registerWin)
+CONTROL_TIMEOUT = 5
+
+#what the agent's process answers with: (status, answer, CPU seconds used)
+ANSWER = 0      #answer is what the method returned
+ERROR = 1       #answer is the traceback of what it raised
+TIMEOUT = 2     #answer is the MoveTimeout message, the process must be killed
+
+
+##
+# AgentProcessError
+# Description: Raised when the agent raised an exception or its process died
+##
+class AgentProcessError(Exception):
+    pass
+
+
+#what a call into an AgentProcess may raise, a player that causes one loses
+AGENT_FAILURES = (MoveTimeout, AgentProcessError)
+
+
+##
+# agentMain
+#
+# Description: The loop run in the agent's process.  Loads the agent, then
+#   answers (method name, args, moveTimeLimit, cpuTime, isMove) messages until
+#   told to stop.  isMove is True for getPlacement, getMove and getAttack, which
+#   are held to a CPU time limit here if there is one.  Their first argument is
+#   an encoded GameState (see StateCodec).
+#
+# Parameters:
+#   conn - this end of the Pipe to the game
+#   aiDir - the folder the agent's module is in
+#   moduleName - the name of the agent's module
+#   playerId - the id to create the AIPlayer with
+#   author - the author the game knows the agent as
+def agentMain(conn, aiDir, moduleName, playerId, author):
+    try:
+        sys.path.insert(0, aiDir)
+        player = importlib.import_module(moduleName).AIPlayer(playerId)
+        player.author = author
+    except Exception:
+        conn.send((ERROR, traceback.format_exc(), None))
+        return
+    conn.send((ANSWER, None, None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        name, args, moveTimeLimit, cpuTime, isMove = message
+        player.moveTimeLimit = moveTimeLimit
+        player.cpuTime = cpuTime
+        if isMove:
+            args = (decodeState(args[0]),) + args[1:]
+
+        def answer():
+            player.startMoveClock()
+            startCpu = time.thread_time()
+            result = getattr(player, name)(*args)
+            return result, time.thread_time() - startCpu
+
+        try:
+            if name == "seedRandom" and player.transpositionTable is not None:
+                #a new game is starting, see MatchEngine.reset
+                player.transpositionTable.clear()
+            if isMove and cpuTime and moveTimeLimit is not None:
+                result, used = callWithTimeLimit(answer, (), moveTimeLimit, True, name)
+            else:
+                result, used = answer()
+            if canEncodeMove(result):
+                #anything else goes pickled, for GameRules to judge as it is
+                result = encodeMove(result)
+            conn.send((ANSWER, result, used))
+        except MoveTimeout as e:
+            conn.send((TIMEOUT, str(e), None))
+        except Exception:
+            conn.send((ERROR, traceback.format_exc(), None))
+
+
+##
+#AgentProcess
+#Description: A Player whose calls are answered by an agent in another process
+#
+#Variables:
+#   playerId - the id of the hosted player
+#   author - the author of the hosted player
+#   moduleName - the module the hosted player's AIPlayer comes from
+#   aiDir - the folder that module is in
+#   moveTimeLimit - seconds the agent has for each getPlacement, getMove and
+#       getAttack (None for no limit).  Also passed on to the agent.
+#   cpuTime - True if moveTimeLimit is in CPU seconds.  Also passed on.
+#   lastCpuTime - CPU seconds the agent used answering the last call
+#   transpositionTable - always None here, the agent's own is cleared by seedRandom
+#   process - the running process, None until the first call or after a kill
+#   conn - the game's end of the Pipe to the process
+#   restarts - how many times the process had to be killed
+##
+class AgentProcess(object):
+
+    #MatchEngine.askPlayer leaves the time limit to us
+    enforcesTimeLimit = True
+
+    ##
+    #__init__
+    #
+    #Parameters:
+    #   player - a Player created from an AIPlayer class in aiDir
+    #   aiDir - the folder the agent's module is in
+    ##
+    def __init__(self, player, aiDir):
+        self.playerId = player.playerId
+        self.author = player.author
+        self.moduleName = type(player).__module__
+        self.aiDir = os.path.abspath(aiDir)
+        self.moveTimeLimit = None
+        self.cpuTime = False
+        self.lastCpuTime = None
+        self.transpositionTable = None
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+
+    ##
+    #start
+    #Description: Starts the agent's process and waits for it to load the agent
+    #
+    #Raises: AgentProcessError if the agent could not be loaded
+    ##
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self.conn, childConn = context.Pipe()
+        self.process = context.Process(target=agentMain, daemon=True, name="agent " + self.author,
+                                       args=(childConn, self.aiDir, self.moduleName, self.playerId, self.author))
+        self.process.start()
+        childConn.close()
+        self.receive("start", START_TIMEOUT)
+
+    def startMoveClock(self):
+        #the agent's process starts the hosted player's clock
+        pass
+
+    def isRunning(self):
+        return self.process is not None and self.process.is_alive()
+
+    ##
+    #kill
+    #Description: Terminates the agent's process, whatever it is doing
+    ##
+    def kill(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    ##
+    #close
+    #Description: Asks the agent's process to finish
+    ##
+    def close(self):
+        if self.isRunning():
+            try:
+                self.conn.send(None)
+                self.process.join(CONTROL_TIMEOUT)
+            except OSError:
+                pass
+        self.kill()
+
+    ##
+    #receive
+    #Description: Waits for the answer to the last message, killing the process
+    #   if it doesn't come in time
+    #
+    #Parameters:
+    #   name - what was asked, for error messages
+    #   limit - seconds to wait (None to wait as long as it takes)
+    #
+    #Return: the agent's answer
+    ##
+    def receive(self, name, limit):
+        try:
+            if limit is not None and not self.conn.poll(limit):
+                self.kill()
+                self.restarts += 1
+                raise MoveTimeout('function [%s] timeout [%s seconds] exceeded!' % (name, limit))
+            status, answer, self.lastCpuTime = self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            self.restarts += 1
+            raise AgentProcessError("the process of %s died during %s" % (self.author, name))
+        if status == TIMEOUT:
+            self.kill()
+            self.restarts += 1
+            raise MoveTimeout(answer)
+        if status == ERROR:
+            raise AgentProcessError("%s raised in %s:\n%s" % (self.author, name, answer))
+        return answer
+
+    ##
+    #call
+    #Description: Calls a method of the hosted player, starting its process first
+    #   if there is none
+    #
+    #Parameters:
+    #   name - the method to call
+    #   args - its arguments (tuple)
+    #   isMove - True for the calls held to moveTimeLimit, whose first argument
+    #            is the GameState, False for the others (which get CONTROL_TIMEOUT)
+    ##
+    def call(self, name, args, isMove):
+        if not self.isRunning():
+            self.kill()
+            self.start()
+        limit = CONTROL_TIMEOUT
+        if isMove:
+            limit = self.moveTimeLimit
+            if self.cpuTime and limit is not None:
+                #the agent's process watches the CPU time, this is the backstop
+                limit *= CPU_WALL_FACTOR
+            args = (encodeState(args[0]),) + args[1:]
+        try:
+            self.conn.send((name, args, self.moveTimeLimit, self.cpuTime, isMove))
+        except OSError:
+            self.kill()
+            self.restarts += 1
+            raise AgentProcessError("the process of %s died before %s" % (self.author, name))
+        return self.receive(name, limit)
+
+    def getPlacement(self, currentState):
+        return self.call("getPlacement", (currentState,), True)
+
+    def getMove(self, currentState):
+        move = self.call("getMove", (currentState,), True)
+        return decodeMove(move) if type(move) is bytes else move
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.call("getAttack", (currentState, attackingAnt, enemyLocations), True)
+
+    def seedRandom(self, seed):
+        self.call("seedRandom", (seed,), False)
+
+    ##
+    #registerWin
+    #Description: Tells the agent how the game ended, unless its process was
+    #   killed during the game (a new process knows nothing of it)
+    ##
+    def registerWin(self, hasWon):
+        if self.isRunning():
+            try:
+                self.call("registerWin", (hasWon,), False)
+            except AGENT_FAILURES:
+                traceback.print_exc(limit=0)
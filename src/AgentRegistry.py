@@ -0,0 +1,174 @@
+import os, re, sys, json, importlib
+from Constants import *
+
+##
+# AgentRegistry.py
+#
+# Finds the agents in the AI folder without importing them.  The folder is
+# scanned once and the author of each module is remembered in a cache file
+# (AI/__pycache__/agents.json) along with the module's mtime, so only modules
+# that are new or have changed since the last run are imported to find their
+# author.  The others are imported the first time one of their players is
+# asked for.
+#
+#       registry = AgentRegistry("AI")
+#       entry = registry.find("Booger")     #nothing imported yet
+#       player = entry.getPlayer()          #imports Booger.py
+#
+
+#the file, in the AI folder, the authors are cached in
+CACHE_FILE = os.path.join("__pycache__", "agents.json")
+
+#bump when what is cached changes so old caches are ignored
+CACHE_VERSION = 1
+
+
+##
+# AgentEntry
+# Description: One agent module in the AI folder.  Stands in for its player
+#   (author and playerId) until the player itself is needed.
+#
+# Variables:
+#   registry - the AgentRegistry the entry belongs to
+#   moduleName - the name of the agent's module
+#   author - the author of the agent
+#   playerId - the id its player is created with
+#   player - the player, None until getPlayer is called
+##
+class AgentEntry(object):
+
+    def __init__(self, registry, moduleName, author, playerId):
+        self.registry = registry
+        self.moduleName = moduleName
+        self.author = author
+        self.playerId = playerId
+        self.player = None
+
+    ##
+    # getModule
+    # Description: Imports the agent's module, if it hasn't been already
+    ##
+    def getModule(self):
+        return self.registry.importModule(self.moduleName)
+
+    ##
+    # getPlayer
+    # Description: Returns the agent's player, creating it the first time
+    ##
+    def getPlayer(self):
+        if self.player is None:
+            self.player = self.getModule().AIPlayer(self.playerId)
+        return self.player
+
+    ##
+    # makeCopy
+    # Description: Creates a new player of the same agent to play against it,
+    #   its author ends with "@@" so the two can be told apart
+    ##
+    def makeCopy(self):
+        copy = self.getModule().AIPlayer(COPY)
+        copy.author += "@@"
+        return copy
+
+
+##
+# AgentRegistry
+# Description: The agents in an AI folder, in the order of os.listdir
+#
+# Variables:
+#   aiDir - the absolute path of the AI folder
+#   entries - an AgentEntry per module (AgentEntry[])
+#   imported - how many modules the scan had to import to find their author
+##
+class AgentRegistry(object):
+
+    ##
+    # __init__
+    #
+    # Parameters:
+    #   aiDir - the folder the agents live in
+    #   useCache - False to import every module to find its author
+    ##
+    def __init__(self, aiDir, useCache=True):
+        self.aiDir = os.path.abspath(aiDir)
+        self.entries = []
+        self.imported = 0
+        self.scan(useCache)
+
+    ##
+    # scan
+    # Description: Lists the modules in the AI folder and works out their
+    #   authors, from the cache where the module hasn't changed since
+    ##
+    def scan(self, useCache=True):
+        cached = self.readCache() if useCache else {}
+        authors = {}
+        self.entries = []
+        self.imported = 0
+        for file in os.listdir(self.aiDir):
+            if re.match(r".*\.py$", file) or re.match(r".*\.pyc$", file):
+                moduleName, ext = os.path.splitext(file)
+                if moduleName in authors:
+                    # both a .py and a .pyc
+                    continue
+                mtime = os.stat(os.path.join(self.aiDir, file)).st_mtime_ns
+                known = cached.get(moduleName)
+                entry = AgentEntry(self, moduleName, None, len(self.entries))
+                if known is not None and known["mtime"] == mtime:
+                    entry.author = known["author"]
+                else:
+                    # new or changed, the only way to find its author is to make a player
+                    entry.player = self.importModule(moduleName).AIPlayer(entry.playerId)
+                    entry.author = entry.player.author
+                    self.imported += 1
+                authors[moduleName] = {"mtime": mtime, "author": entry.author}
+                self.entries.append(entry)
+        if authors != cached:
+            self.writeCache(authors)
+
+    ##
+    # importModule
+    # Description: Imports an agent's module by name from the AI folder.  The
+    #   folder is only on the import path while the module is imported.
+    ##
+    def importModule(self, moduleName):
+        sys.path.insert(0, self.aiDir)
+        try:
+            return importlib.import_module(moduleName)
+        finally:
+            sys.path.remove(self.aiDir)
+
+    ##
+    # find
+    # Description: Finds an agent by author
+    #
+    # Return: the first AgentEntry with that author, or None
+    ##
+    def find(self, author):
+        for entry in self.entries:
+            if entry.author == author:
+                return entry
+        return None
+
+    def readCache(self):
+        try:
+            with open(os.path.join(self.aiDir, CACHE_FILE)) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            return {}
+        return cache.get("agents", {})
+
+    def writeCache(self, authors):
+        path = os.path.join(self.aiDir, CACHE_FILE)
+        # every tournament worker scans too, so each writes its own temporary file
+        temp = "%s.%d" % (path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp, "w") as f:
+                json.dump({"version": CACHE_VERSION, "agents": authors}, f, indent=1)
+            os.replace(temp, path)
+        except OSError:
+            # a read-only AI folder only means scanning imports again next time
+            pass
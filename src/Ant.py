@@ -9,6 +9,31 @@ UNIT_STATS.append([3, 4, 2, 1, 2, True]) #Drone
 UNIT_STATS.append([2, 8, 4, 1, 2, False]) #Soldier
 UNIT_STATS.append([1, 2, 3, 3, 2, True]) #Ranged soldier
 
+#the last id handed out to a new ant (32 bit so StateCodec can store them)
+lastAntId = 0
+
+
+##
+# newAntId
+#
+# Return: an id for a new ant
+def newAntId():
+    global lastAntId
+    lastAntId = (lastAntId + 1) & 0xFFFFFFFF
+    return lastAntId
+
+
+##
+# noteAntId
+#
+# Description: Makes sure newAntId hands out ids after the given one, so ants
+#   made in this process don't share ids with ants from another (see
+#   StateCodec.decodeState)
+def noteAntId(uniqueId):
+    global lastAntId
+    if uniqueId > lastAntId:
+        lastAntId = uniqueId
+
 ##
 #Ant
 #Description: This class represents an ant on the board. All information
@@ -25,6 +50,8 @@ UNIT_STATS.append([1, 2, 3, 3, 2, True]) #Ranged soldier
 #   hasMoved - A boolean representing if the ant has moved yet this turn
 #   carrying - A boolean representing if the Ant's carrying food or not.
 #   player - The id of the player that owns the Ant
+#   UniqueID - A number identifying the ant, kept by its clones and by copies
+#       sent to other processes (see StateCodec.py)
 ##
 class Ant(object):
 
@@ -36,20 +63,20 @@ class Ant(object):
     #   inputCoords - The position on the board to place the Ant at (int,int)
     #   inputType - The type of ant to create (int)
     #   inputPlayer - The id of the player that owns the Ant (int)
+    #   inputId - The Ant's UniqueID, a new one if None (int)
     ##
-    def __init__(self, inputCoords, inputType, inputPlayer):
+    def __init__(self, inputCoords, inputType, inputPlayer, inputId = None):
         self.coords = inputCoords
         self.type = inputType
         self.hasMoved = False
         self.carrying = False
         self.player = inputPlayer
         self.health = UNIT_STATS[self.type][HEALTH]
-        self.UniqueID = id(self)
+        self.UniqueID = newAntId() if inputId is None else inputId
 
     def clone(self):
-        rtnAnt = Ant(self.coords, self.type, self.player)
+        rtnAnt = Ant(self.coords, self.type, self.player, self.UniqueID)
         rtnAnt.hasMoved = self.hasMoved
         rtnAnt.carrying = self.carrying
         rtnAnt.health = self.health
-        rtnAnt.UniqueID = self.UniqueID
         return rtnAnt
@@ -0,0 +1,60 @@
+##
+# BatchUtility.py
+#
+# Helpers for scoring a whole layer of search leaves in one call instead of one
+# utility() call per leaf.  An agent gathers the numbers its utility looks at
+# into one row per leaf while the search walks the layer, and then does the
+# distances and arithmetic for every leaf at once with NumPy (see
+# AISearch.AlphaBetaSearch leafFeatures/leafScores and Rogers.leafScores).
+#
+# NumPy is optional.  When it isn't installed HAVE_NUMPY is False and agents
+# score leaves one at a time with their normal utility function.
+#
+
+try:
+    import numpy
+    HAVE_NUMPY = True
+except ImportError:
+    numpy = None
+    HAVE_NUMPY = False
+
+#distance used where there is nothing to measure to
+NO_DISTANCE = float("inf")
+
+
+##
+# columns
+#
+# Parameters:
+#   rows - a list of equal length rows of numbers, one per leaf
+#
+# Return: a float array with one row per column of rows (so that
+#   "a, b, c = columns(rows)" unpacks the columns)
+def columns(rows):
+    return numpy.array(rows, dtype=float).T
+
+
+##
+# batchDist
+#
+# approxDist between two columns of coordinates
+#
+# Return: an array of |x1 - x2| + |y1 - y2|
+def batchDist(x1, y1, x2, y2):
+    return numpy.abs(x1 - x2) + numpy.abs(y1 - y2)
+
+
+##
+# batchMinDist
+#
+# Parameters:
+#   x, y - columns of coordinates
+#   targets - a list of (x, y) coords, the same for every row
+#
+# Return: an array of the approxDist from each coordinate to the nearest target
+#   (NO_DISTANCE if there are no targets)
+def batchMinDist(x, y, targets):
+    if len(targets) == 0:
+        return numpy.full(len(x), NO_DISTANCE)
+    points = numpy.array(targets, dtype=float)
+    return batchDist(x[:, None], y[:, None], points[:, 0], points[:, 1]).min(axis=1)
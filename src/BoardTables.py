@@ -0,0 +1,86 @@
+from Constants import *
+from Ant import UNIT_STATS
+
+##
+# BoardTables.py
+#
+# Lookup tables for the fixed BOARD_LENGTH x BOARD_LENGTH board, built once at
+# import time so the board geometry helpers in AIPlayerUtils and GameRules
+# don't have to build lists and check bounds on every call.
+#
+# Every table comes in two forms: indexed by cell id (x * BOARD_LENGTH + y,
+# see cellOf) for code that works on flat grids, and keyed by (x, y) tuple
+# for everything else.  Lists of coords are stored as tuples so they can be
+# shared; copy them before changing them.
+#
+
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+
+#the middle rows no one may build on and the queen may not enter
+QUEEN_FORBIDDEN_ROWS = frozenset([BOARD_LENGTH // 2 - 1, BOARD_LENGTH // 2])
+
+#order listAdjacent has always returned neighbors in
+ADJACENT_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+##
+# cellOf
+#
+# Return: the cell id of an x,y coord
+def cellOf(coords):
+    return coords[0] * BOARD_LENGTH + coords[1]
+
+
+##
+# coordsOf
+#
+# Return: the x,y coord (tuple) of a cell id
+def coordsOf(cell):
+    return CELL_COORDS[cell]
+
+
+##
+# computeAttackable
+#
+# Description: The cells within taxicab distance dist of coord (not counting
+#   coord itself), left to right and then top to bottom
+#
+# Return: a tuple of coords
+def computeAttackable(coord, dist):
+    res = []
+    for i in range(-dist, dist + 1):
+        yLen = dist - abs(i)
+        for j in range(-yLen, yLen + 1):
+            newCoord = (coord[0] + i, coord[1] + j)
+            if newCoord in LEGAL_COORDS and newCoord != coord:
+                res.append(newCoord)
+    return tuple(res)
+
+
+#cell id -> (x, y) and the set of every legal (x, y)
+CELL_COORDS = tuple(divmod(cell, BOARD_LENGTH) for cell in range(NUM_CELLS))
+LEGAL_COORDS = frozenset(CELL_COORDS)
+
+#4-neighbors of each cell
+ADJACENT = dict((coord, tuple((coord[0] + dx, coord[1] + dy) for dx, dy in ADJACENT_DELTAS
+                              if (coord[0] + dx, coord[1] + dy) in LEGAL_COORDS))
+                for coord in CELL_COORDS)
+ADJACENT_CELLS = tuple(tuple(cellOf(adj) for adj in ADJACENT[coord]) for coord in CELL_COORDS)
+
+#cells in attack range of each cell, for every range an ant type has
+ATTACK_RANGES = sorted(set(stats[RANGE] for stats in UNIT_STATS))
+ATTACKABLE = dict((dist, dict((coord, computeAttackable(coord, dist)) for coord in CELL_COORDS))
+                  for dist in ATTACK_RANGES)
+ATTACKABLE_CELLS = dict((dist, tuple(tuple(cellOf(target) for target in ATTACKABLE[dist][coord])
+                                     for coord in CELL_COORDS))
+                        for dist in ATTACK_RANGES)
+
+#cells a queen may stand on
+QUEEN_ALLOWED_MASK = tuple(coord[1] not in QUEEN_FORBIDDEN_ROWS for coord in CELL_COORDS)
+
+#where a player may place its own constructions and where the food goes
+#(coords as the placing player sees the board)
+HOME_TERRITORY_MASK = tuple(coord[1] < BOARD_LENGTH // 2 - 1 for coord in CELL_COORDS)
+ENEMY_TERRITORY_MASK = tuple(coord[1] >= BOARD_LENGTH // 2 + 1 for coord in CELL_COORDS)
+HOME_TERRITORY = frozenset(coord for coord in CELL_COORDS if HOME_TERRITORY_MASK[cellOf(coord)])
+ENEMY_TERRITORY = frozenset(coord for coord in CELL_COORDS if ENEMY_TERRITORY_MASK[cellOf(coord)])
@@ -0,0 +1,124 @@
+import heapq
+from collections import OrderedDict
+from Constants import *
+from BoardTables import NUM_CELLS, ADJACENT_CELLS, cellOf
+
+##
+# DistanceOracle.py
+#
+# Exact movement-cost distances between cells.  Entering a cell costs the
+# movement cost of the construction on it (grass costs 2, everything else 1);
+# ants are ignored, as in stepsToReach.
+#
+# Grass and food don't move once setup is over, so the distance field from a
+# cell (its distance to every other cell) is worked out once with Dijkstra and
+# then every query from that cell is a list lookup.  Oracles are shared by
+# every state with the same terrain, so a new one is only made when the
+# constructions that affect movement change.
+#
+
+#How many different terrains to keep oracles for (each board orientation of
+#each game in progress needs one)
+MAX_ORACLES = 8
+
+#terrain key -> DistanceOracle, least recently used first
+oracles = OrderedDict()
+
+
+##
+#DistanceOracle
+#Description: Distance fields over one fixed terrain
+#
+#Variables:
+#   costs - the cost of entering each cell, indexed by x * BOARD_LENGTH + y
+#   fields - cell id -> list of distances from it to every cell (filled lazily)
+##
+class DistanceOracle(object):
+
+    ##
+    #__init__
+    #
+    #Parameters:
+    #   terrainCosts - dict of coords -> cost for every cell that doesn't cost 1
+    ##
+    def __init__(self, terrainCosts):
+        self.costs = [1] * NUM_CELLS
+        for coords, cost in terrainCosts.items():
+            self.costs[cellOf(coords)] = cost
+        self.fields = {}
+
+    ##
+    #getField
+    #
+    #Parameters:
+    #   src - the starting cell (an x,y coord)
+    #
+    #Return: a list of the distances from src to each cell id
+    ##
+    def getField(self, src):
+        start = cellOf(src)
+        field = self.fields.get(start)
+        if field is None:
+            field = self.computeField(start)
+            self.fields[start] = field
+        return field
+
+    ##
+    #computeField
+    #Description: Dijkstra from one cell over the whole board
+    ##
+    def computeField(self, start):
+        costs = self.costs
+        field = [None] * NUM_CELLS
+        field[start] = 0
+        frontier = [(0, start)]
+        while frontier:
+            dist, cell = heapq.heappop(frontier)
+            if dist > field[cell]:
+                continue
+            for adj in ADJACENT_CELLS[cell]:
+                newDist = dist + costs[adj]
+                if field[adj] is None or newDist < field[adj]:
+                    field[adj] = newDist
+                    heapq.heappush(frontier, (newDist, adj))
+        return field
+
+    ##
+    #distance
+    #
+    #Parameters:
+    #   src - starting position (an x,y coord)
+    #   dst - destination position (an x,y coord)
+    #   ignoresGrass - True for ants that cross grass at normal cost
+    #
+    #Return: the cost of the cheapest route from src to dst
+    ##
+    def distance(self, src, dst, ignoresGrass = False):
+        if ignoresGrass:
+            #every cell costs 1 and nothing blocks
+            return abs(src[0] - dst[0]) + abs(src[1] - dst[1])
+        return self.getField(src)[cellOf(dst)]
+
+
+##
+# getDistanceOracle
+#
+# Description: Returns the oracle for a state's terrain, making one if no
+# state with the same terrain has asked before
+#
+# Parameters:
+#   terrainCosts - dict of coords -> cost for every cell that doesn't cost 1
+#                  (see OccupancyIndex.getTerrainCosts)
+#
+# Return: a DistanceOracle
+def getDistanceOracle(terrainCosts):
+    key = tuple(sorted((tuple(coords), cost) for coords, cost in terrainCosts.items()))
+    oracle = oracles.get(key)
+    if oracle is None:
+        oracle = DistanceOracle(terrainCosts)
+        oracles[key] = oracle
+        if len(oracles) > MAX_ORACLES:
+            oracles.popitem(last=False)
+    else:
+        oracles.move_to_end(key)
+    return oracle
@@ -7,6 +7,7 @@ from GamePane import *
 from SettingsPane import *
 from StatsPane import *
 from Constants import *
+from UpdateQueue import UpdateQueue
 import RedoneWidgets
 import base64
 import pickle
@@ -147,6 +148,10 @@ class GUIHandler:
         #self.setSeasonalGraphics()
         self.setup = True
 
+        # updates posted by the game thread, applied by drainUpdates
+        self.updates = UpdateQueue()
+        self.root.after(0, self.drainUpdates)
+
     # def menuPressed(self):
     #     print("Omg a menu button was pressed!")
 
@@ -260,18 +265,64 @@ class GUIHandler:
                 if self.waitingForHuman and self.phase in [SETUP_PHASE_1, SETUP_PHASE_2]:
                     self.gameHandler.showSetupConstructions(self.phase)
 
+    ##
+    # drainUpdates
+    #
+    # applies the updates the game thread has posted since the last call, then
+    # calls itself again after a frame (see Game.maxFps)
+    #
+    def drainUpdates(self):
+        try:
+            self.updates.drain()
+        finally:
+            self.root.after(max(1, int(1000 / self.game.maxFps)), self.drainUpdates)
+
     ##
     # showState
     #
     # updates the current gameState of the GUI and updates the
-    # GUI itself if appropriate to do so
+    # GUI itself if appropriate to do so.  Called by the game thread, which
+    # goes on changing the state, so the board is drawn on the next frame
+    # from a fastclone.  Only the last state posted before a frame gets a
+    # board built for it.
     #
     def showState(self, state):
         self.currentState = state
 
         if self.currentFrame == 2 and self.currentState is not None:
+            self.updates.post("state", self.drawState, state.fastclone())
+
+    def drawState(self, state):
+        if self.currentFrame == 2:
+            state.buildBoard()
             self.gameHandler.setToGameState(state)
 
+    ##
+    # showInstructions
+    #
+    # sets the text below the board on the next frame (for the game thread)
+    #
+    def showInstructions(self, text):
+        self.updates.post("instructions", self.gameHandler.setInstructionText, text)
+
+    ##
+    # showScores
+    #
+    # updates the current game log item, the score totals and the timings on the
+    # next frame (for the game thread)
+    #
+    def showScores(self, logText, scores, latency):
+        log = self.statsHandler.cur_log
+        if log is not None:
+            self.updates.post(("log", id(log)), self.setLogText, log, logText)
+        self.updates.post("scores", self.statsHandler.setScoreRecord, scores)
+        self.updates.post("latency", self.statsHandler.setLatencyRecord, latency)
+
+    def setLogText(self, log, text):
+        # the log may have been cleared since the text was posted
+        if log in self.statsHandler.log:
+            log.setTextLines(text)
+
     ##
     # setPlayers
     #
@@ -306,9 +357,13 @@ class GUIHandler:
     ##
     # getHumanMove
     #
-    # sets up GUI to receive a game move from a human player
+    # sets up GUI to receive a game move from a human player, once the updates
+    # posted before it have been applied
     #
     def getHumanMove(self, phase):
+        self.updates.post("human", self.askHumanMove, phase)
+
+    def askHumanMove(self, phase):
         if phase not in [SETUP_PHASE_1, SETUP_PHASE_2, PLAY_PHASE]:
             print("Game in wrong phase for human move")
             return
@@ -335,9 +390,13 @@ class GUIHandler:
     # getHumanAttack
     #
     # sets up the GUI to receive an attack from a human player
-    # the location passed from the game is already swapped back to P1 at top
+    # the location passed from the game is already swapped back to P1 at top.
+    # Like getHumanMove it waits for the updates posted before it.
     #
     def getHumanAttack(self, location):
+        self.updates.post("human", self.askHumanAttack, location)
+
+    def askHumanAttack(self, location):
         # disable undo during attacks
         self.gameHandler.undoButton.disable()
         self.gameHandler.setInstructionText("Select an ant to attack.")
@@ -471,8 +530,10 @@ class GUIHandler:
             self.pausePressed()
 
     def settingsPressed(self):
-        self.game.gamesToPlay = []
+        self.game.clearGames()
         self.game.goToSettings = True
+        # the game thread may be waiting for games rather than playing one
+        self.game.generalWake()
         self.killPressed()
 
         if not self.game.gameThread.is_alive():
@@ -9,14 +9,17 @@ from Location import *
 from Ant import *
 from Move import *
 from Player import Player
+from MatchEngine import GameRules, callWithTimeLimit, deriveSeed, newSeed
+from Tournament import TournamentRunner, makeJobs, getGameSeed, ISOLATED_GAME_TIMEOUT
+from GameRecord import GameRecord, saveRecord
+from Latency import LatencyStats, ENGINE
+from AgentProcess import AgentProcess, AGENT_FAILURES
+from StateCodec import CompactGameState
+from AgentRegistry import AgentRegistry, AgentEntry
+from UpdateQueue import DEFAULT_MAX_FPS
 import traceback
-from GUIHandler import *
 import threading
-import time
-import importlib
 import argparse
-from threading import Thread
-import functools
 
 from functools import partial
 import copy
@@ -32,9 +35,10 @@ class GameData:
 
 ##
 # Game
-# Description: Keeps track of game logic and manages the play loop.
+# Description: Keeps track of game logic and manages the play loop.  The rules
+#   themselves are shared with the headless engine through GameRules.
 ##
-class Game(object):
+class Game(GameRules):
     ##
     # __init__
     # Description: Initializes the game's attributes and UI.
@@ -46,13 +50,20 @@ class Game(object):
 
         # Initialize the game variables
         self.players = []
+        # the agents in the AI folder, see loadAIs
+        self.registry = None
         self.state = None
         self.move = None
         self.undoStates = []
         self.currentPlayers = []
         self.currentPlayerScores = []
         self.gamesToPlay = []
-        self.gamesToPlayLock = threading.Lock()
+        # reentrant so gameStartRequested can queue the games of several calls at once
+        self.gamesToPlayLock = threading.RLock()
+        # notified when games are queued or the game thread has to stop waiting for them
+        self.gamesQueued = threading.Condition(self.gamesToPlayLock)
+        # how many times generalWake has been called, see condWait
+        self.wakeups = 0
 
         self.hasHumanPlayer = False
         self.ended = False
@@ -85,22 +96,60 @@ class Game(object):
         self.playersReversed = False  # whether the players are currently swapped
         self.timeoutOn       = False
         self.timeout_limit   = 1
+        # whether timeout_limit counts the AI's CPU time instead of wall-clock time
+        self.cpuTime         = False
         self.autorestart     = False
         self.pauseOnStart    = False
         self.pauseConditions = []
         self.pauseOnIllegalMove = False
+        # worker processes for AI vs. AI games (1 plays them on the game thread)
+        self.numWorkers      = 1
+        self.tournament      = None
+        self.poolResults     = {}
+        # folder to save a GameRecord of every game in (None to not save them)
+        self.recordDir       = None
+        # timings of the calls into the agents and of the game's own work
+        self.latency         = LatencyStats()
+        # file the timings are written to when the games run out (None for no file)
+        self.latencyFile     = None
+        # run each AI in a process of its own that is killed if it runs out of time
+        self.isolateAgents   = False
+        # seconds a game played on a worker process may take (None for the runner's default)
+        self.gameTimeout     = None
+        # the AgentProcess of each author, see hostAgent
+        self.agentProcesses  = {}
+        # seed every game's seed is derived from (None for a fresh seed each game)
+        self.masterSeed      = None
+        # random numbers for the game itself (random human setup), seeded each game
+        self.random          = random.Random()
+        # most times a second the window shows what the game thread is doing
+        self.maxFps          = DEFAULT_MAX_FPS
+
+        # play the command line games without a window
+        self.headless        = False
+        self.UI              = None
 
         # other
         self.ee_seasonal = False
-        self.hotKeyInfo = Is.getHotKeyInfo()
-        self.antUnitStatsInfo = Is.getAntStats()
+        # the rules shown in the window, scraped from the source when there is one
+        self.hotKeyInfo = None
+        self.antUnitStatsInfo = None
+        # the command line comes first so -r and mistakes in it don't wait on the AIs or tkinter
+        self.processCommandLine()
         self.loadAIs()
         self.playerNamesCheckList = [ai[0].author for ai in self.players]
-        self.processCommandLine()
-        # setup GUI
-        # this has to be done in the main thread because Tkinter is dumb
         if testing:
             return
+        if self.headless:
+            self.playHeadless()
+            return
+
+        # setup GUI
+        # this has to be done in the main thread because Tkinter is dumb
+        # only import the window (and tkinter) once we know there is one
+        from GUIHandler import GUIHandler
+        self.hotKeyInfo = Is.getHotKeyInfo()
+        self.antUnitStatsInfo = Is.getAntStats()
 
         # Initializes the UI variables
         self.UI = GUIHandler(self)
@@ -117,47 +166,70 @@ class Game(object):
 
         self.gameThread = threading.Thread(target=self.start, daemon=True)
         self.gameThread.start()
-        self.delayWait = 0
 
         self.postProcessCommandLine()
         self.post_process_settings()
         self.UI.root.mainloop()
 
     def gameStartRequested(self):
-        while len(self.game_calls) > 0:
-            g = self.game_calls.pop(0)
-            self.UI.statsHandler.timeLabel.Reset()
-            g()
+        # the game thread only sees the games once they are all queued
+        with self.gamesQueued:
+            while len(self.game_calls) > 0:
+                g = self.game_calls.pop(0)
+                self.UI.statsHandler.timeLabel.Reset()
+                g()
 
     def submitHumanMove(self, move):
-        if not self.waitCond.acquire(blocking=False):
-            # we should be able to get the lock here
-            # if not, something broke
-            print("Error getting lock for human move")
-            return
         self.submittedMove = move
-        self.waitCond.notify()
-        self.waitCond.release()
+        self.generalWake()
 
     def submitHumanAttack(self, attack):
-        if not self.waitCond.acquire(blocking=False):
-            # we should be able to get the lock here
-            # if not, something broke
-            print("Error getting lock for human move")
-            return
         self.submittedAttack = attack
-        self.waitCond.notify()
-        self.waitCond.release()
+        self.generalWake()
 
     def submitHumanSetup(self, locations):
-        if not self.waitCond.acquire(blocking=False):
-            # we should be able to get the lock here
-            # if not, something broke
-            print("Error getting lock for human move")
-            return
         self.submittedSetup = locations
-        self.waitCond.notify()
-        self.waitCond.release()
+        self.generalWake()
+
+    ##
+    # queueGames
+    #
+    # Description: Adds games to the end of gamesToPlay and wakes the game
+    #              thread if it is waiting for some
+    #
+    # Parameters: games - the GameData to play (GameData[])
+    #
+    ##
+    def queueGames(self, games):
+        with self.gamesQueued:
+            self.gamesToPlay.extend(games)
+            self.gamesQueued.notify_all()
+
+    ##
+    # clearGames
+    #
+    # Description: Throws away the games that haven't started yet
+    #
+    ##
+    def clearGames(self):
+        with self.gamesQueued:
+            del self.gamesToPlay[:]
+
+    ##
+    # waitForGames
+    #
+    # Description: Blocks the game thread until there are games to play, the
+    #              client ends or the settings are asked for (which it shows)
+    #
+    ##
+    def waitForGames(self):
+        with self.gamesQueued:
+            while len(self.gamesToPlay) == 0 and not self.ended and not self.goToSettings:
+                self.gamesQueued.wait()
+            showSettings = self.goToSettings
+            self.goToSettings = False
+        if showSettings:
+            self.UI.showFrame(0)
 
     ##
     # startHumanVsAI
@@ -182,13 +254,10 @@ class Game(object):
                 print('    "' + player[0].author + '"')
             # Assume if we got here it was a command line argument because the gui
             # is populated from the AI list
-            self.UI.onClose()
+            self.closeForBadPlayer()
             # sys.exit(0)
 
-        self.gamesToPlayLock.acquire()
-        self.gamesToPlay.append(GameData(HumanPlayer.HumanPlayer(HUMAN), self.players[index][0]))
-        self.gamesToPlayLock.release()
-        self.generalWake()
+        self.queueGames([GameData(HumanPlayer.HumanPlayer(HUMAN), self.players[index][0])])
 
     ##
     # startAIvsAI
@@ -225,13 +294,10 @@ class Game(object):
                 print('    "' + player[0].author + '"')
             # Assume if we got here it was a command line argument because the gui
             # is populated from the AI list
-            self.UI.onClose()
+            self.closeForBadPlayer()
             # sys.exit(0)
 
-        self.gamesToPlayLock.acquire()
-        self.gamesToPlay.append(GameData(p1, p2, numGames))
-        self.gamesToPlayLock.release()
-        self.generalWake()
+        self.queueGames([GameData(p1, p2, numGames)])
 
     ##
     # startRR
@@ -261,19 +327,18 @@ class Game(object):
                     print('    "' + thisPlayer[0].author + '"')
                 # Assume if we got here it was a command line argument because the gui
                 # is populated from the AI list
-                self.UI.onClose()
+                self.closeForBadPlayer()
                 # sys.exit(0)
 
         # now that we have the AI's make all pairs
-        self.gamesToPlayLock.acquire()
+        games = []
         for i in range(len(ais)):
             for j in range(i + 1, len(ais)):
                 # don't make ais play themselves
                 if i == j:
                     continue
-                self.gamesToPlay.append(GameData(ais[i], ais[j], numGames))
-        self.gamesToPlayLock.release()
-        self.generalWake()
+                games.append(GameData(ais[i], ais[j], numGames))
+        self.queueGames(games)
 
     ##
     # startRRall
@@ -286,15 +351,14 @@ class Game(object):
     ##
     def startRRall(self, numGames):
         # pair up every loaded AI
-        self.gamesToPlayLock.acquire()
+        games = []
         for i in range(len(self.players)):
             for j in range(i + 1, len(self.players)):
                 # don't make ais play themselves
                 if i == j:
                     continue
-                self.gamesToPlay.append(GameData(self.players[i][0], self.players[j][0], numGames))
-        self.gamesToPlayLock.release()
-        self.generalWake()
+                games.append(GameData(self.players[i][0], self.players[j][0], numGames))
+        self.queueGames(games)
 
     ##
     # startAllOther
@@ -314,7 +378,7 @@ class Game(object):
                 print('    "' + thisPlayer[0].author + '"')
             # Assume if we got here it was a command line argument because the gui
             # is populated from the AI list
-            self.UI.onClose()
+            self.closeForBadPlayer()
             # sys.exit(0)
 
         # get named AI
@@ -324,13 +388,12 @@ class Game(object):
                 ai = player[0]
                 break
 
-        self.gamesToPlayLock.acquire()
+        games = []
         for player in self.players:
             if player[0] == ai:
                 continue
-            self.gamesToPlay.append(GameData(ai, player[0], numGames))
-        self.gamesToPlayLock.release()
-        self.generalWake()
+            games.append(GameData(ai, player[0], numGames))
+        self.queueGames(games)
 
     ##
     # startSelf
@@ -351,7 +414,7 @@ class Game(object):
                 print('    "' + thisPlayer[0].author + '"')
             # Assume if we got here it was a command line argument because the gui
             # is populated from the AI list
-            self.UI.onClose()
+            self.closeForBadPlayer()
             # sys.exit(0)
 
         # get original agent
@@ -364,16 +427,38 @@ class Game(object):
         # create a copy of the Agent you want to play itself
         p2 = self.createAICopy(playerOne)
 
-        self.gamesToPlayLock.acquire()
-        self.gamesToPlay.append(GameData(p1, p2, numGames))
-        self.gamesToPlayLock.release()
-        self.generalWake()
+        self.queueGames([GameData(p1, p2, numGames)])
+
+    ##
+    # closeForBadPlayer
+    #
+    # Description: Gives up on the command line after it named an AI that isn't loaded
+    #
+    ##
+    def closeForBadPlayer(self):
+        if self.UI is None:
+            sys.exit(1)
+        self.UI.onClose()
 
     def postProcessCommandLine(self):
         # graphics
         if self.ee_seasonal:
             self.UI.setSeasonalGraphics()
         # games
+        if self.queueCommandLineGames():
+            self.UI.showFrame(2)
+            self.UI.statsHandler.timeLabel.Reset()
+            self.UI.statsHandler.timeLabel.Start()
+
+    ##
+    # queueCommandLineGames
+    #
+    # Description: Queues the games asked for on the command line
+    #
+    # Return: True if the command line asked for games
+    #
+    ##
+    def queueCommandLineGames(self):
         if self.parser_args["twoP"]:
             if "human" == self.parser_args["players"][0].lower():
                 self.startHumanVsAI(self.parser_args["players"][1])
@@ -390,11 +475,8 @@ class Game(object):
             self.startAllOther(self.parser_args["numgames"], self.parser_args["players"][0])
         elif self.parser_args["self"]:
             self.startSelf(self.parser_args["numgames"], self.parser_args["players"][0])
-        if self.parser_args["RR"] or self.parser_args["RRall"] or self.parser_args["self"] or self.parser_args["all"] or \
-                self.parser_args["twoP"]:
-            self.UI.showFrame(2)
-            self.UI.statsHandler.timeLabel.Reset()
-            self.UI.statsHandler.timeLabel.Start()
+        return self.parser_args["RR"] or self.parser_args["RRall"] or self.parser_args["self"] or \
+            self.parser_args["all"] or self.parser_args["twoP"]
 
     ##
     # processCommandLine
@@ -415,6 +497,16 @@ class Game(object):
     #
     #           Useful Command Flags:
     #           -v >> Verbose print out game records to console
+    #           -j >> Number of worker processes for AI vs. AI games
+    #           --records >> Folder to save a binary record of every game in
+    #           --seed >> Master seed to make the games reproducible
+    #           --latency >> File (.csv or .json) to write agent move timings to
+    #           --timeout >> Seconds an AI has to answer each call before it loses
+    #           --isolate >> Run every AI in its own process, killed when out of time
+    #           --game-timeout >> Seconds a game on a worker process may take before it is abandoned
+    #           --cpu-time >> Apply the time limit to the CPU time the AIs use
+    #           --fps >> Most times a second the window is redrawn
+    #           --headless >> Play the games without a window and print the scores
     #           -h >> Print the command option help page
     #
     #           Example:
@@ -448,6 +540,35 @@ class Game(object):
                             help='February, March, October, December')
         parser.add_argument('-r', '--rules', action='store_true', dest='rules_request', default=False,
                             help='print the rules for the game (includes unit stats, hot keys...)')
+        parser.add_argument('-j', '--jobs', metavar='NUMWORKERS', type=int, dest='jobs', default=1,
+                            help='number of worker processes to play AI vs. AI games on '
+                                 '(0 for one per core, 1 plays them in this process)')
+        parser.add_argument('--records', metavar='DIR', type=str, dest='recordDir', default=None,
+                            help='save a binary record of every game in this folder (see GameReplayer.py)')
+        parser.add_argument('--seed', metavar='SEED', type=int, dest='seed', default=None,
+                            help='master seed; games are seeded from it so they can be played again exactly')
+        parser.add_argument('--latency', metavar='FILE', type=str, dest='latencyFile', default=None,
+                            help='write the percentiles of how long each agent took per call to FILE '
+                                 '(JSON if it ends in .json, CSV otherwise) when the games are done')
+        parser.add_argument('--timeout', metavar='SECONDS', type=float, dest='timeout', default=None,
+                            help='an AI that takes longer than SECONDS to answer a call loses the game '
+                                 '(no limit by default)')
+        parser.add_argument('--cpu-time', action='store_true', dest='cpuTime', default=False,
+                            help='apply the move time limit to the CPU time an AI uses rather than to '
+                                 'wall-clock time, so AIs don\'t lose on time on a busy machine')
+        parser.add_argument('--isolate', action='store_true', dest='isolate', default=False,
+                            help='run every AI in a process of its own; an AI that runs out of time is '
+                                 'killed (and restarted for the next game) instead of left running')
+        parser.add_argument('--game-timeout', metavar='SECONDS', type=float, dest='gameTimeout', default=None,
+                            help='abandon a game played on a worker process (see -j) that takes longer than '
+                                 'SECONDS and replace the workers, so a stuck AI can not hold on to one '
+                                 '(default %d with --isolate, no limit otherwise)' % ISOLATED_GAME_TIMEOUT)
+        parser.add_argument('--fps', metavar='FPS', type=float, dest='fps', default=DEFAULT_MAX_FPS,
+                            help='redraw the window at most FPS times a second; the game does not wait for '
+                                 'the window, states in between are skipped (default %(default)s)')
+        parser.add_argument('--headless', action='store_true', dest='headless', default=False,
+                            help='play the AI vs. AI games given on the command line on worker processes (see -j) '
+                                 'without opening a window, printing the scores as each pairing finishes')
 
         args = parser.parse_args()
         self.parser_args["numgames"] = args.numgames
@@ -461,9 +582,9 @@ class Game(object):
         # check for rules request
         if args.rules_request:
             print("="*80+"\nUNIT STATS\n"+"-"*80)
-            print(self.antUnitStatsInfo)
+            print(Is.getAntStats())
             print("="*80+"\nHOT KEYS\n"+"-"*80)
-            print(self.hotKeyInfo)
+            print(Is.getHotKeyInfo())
             exit(0)
         
         numCheck = re.compile("[0-9]*[1-9][0-9]*")
@@ -474,6 +595,31 @@ class Game(object):
             self.verbose = True
         if args.seasonal_graphics:
             self.ee_seasonal = True
+        if args.jobs < 0:
+            parser.error('Number of worker processes can not be negative')
+        self.numWorkers = args.jobs if args.jobs > 0 else multiprocessing.cpu_count()
+        self.recordDir = args.recordDir
+        self.masterSeed = args.seed
+        self.latencyFile = args.latencyFile
+        self.isolateAgents = args.isolate
+        if args.timeout is not None:
+            if args.timeout <= 0:
+                parser.error('Timeout must be a positive number of seconds')
+            self.timeoutOn = True
+            self.timeout_limit = args.timeout
+        if args.gameTimeout is not None and args.gameTimeout <= 0:
+            parser.error('Game timeout must be a positive number of seconds')
+        self.gameTimeout = args.gameTimeout
+        self.cpuTime = args.cpuTime
+        if args.fps <= 0:
+            parser.error('FPS must be a positive number')
+        self.maxFps = args.fps
+        self.headless = args.headless
+        if args.headless:
+            if not (args.RR or args.RRall or args.self or args.all or args.twoP):
+                parser.error('--headless needs games to play (--RR, --RRall, --self, --all or --2p)')
+            if args.players is not None and 'human' in [player.lower() for player in args.players]:
+                parser.error('Human not allowed in headless games')
         if (args.RR or args.RRall or args.self or args.all or args.twoP) and args.numgames is None:
             parser.error('Flags not valid without number of games (-n)')
         if args.twoP:
@@ -582,6 +728,7 @@ class Game(object):
                 for player in self.players:
                     if player[0].author != g.players[0]:
                         self.game_calls.append(partial(self.startAIvsAI, g.num_games, g.players[0], player[0].author))
+        self.latency.clear()
         if not testing: self.UI.statsHandler.clearLog()
 
     ##
@@ -595,25 +742,20 @@ class Game(object):
 
         while not self.ended:
             # if we have nothing to do, wait
-            while len(self.gamesToPlay) == 0 and not self.ended:
+            if len(self.gamesToPlay) == 0 or self.goToSettings:
                 self.running = False
-                if self.goToSettings:
-                    self.goToSettings = False
-                    self.UI.showFrame(0)
                 self.UI.statsHandler.timeLabel.Stop()
                 self.UI.statsHandler.timeLabel.PermanentlyStop()
-                # rough fix for mac race condition - that caused it not to start
-                if self.delayWait == 4:
-                    self.condWait()
-                else:
-                    self.delayWait = (self.delayWait + 1) % 5
-            if self.ended:
-                break
+                self.waitForGames()
+                continue
 
-            if self.restartGameList is None:
-                # why this has to be here, I do not know, but it does or else auto-restart breaks :(
-                time.sleep(.01)
-                self.restartGameList = list(self.gamesToPlay)
+            with self.gamesQueued:
+                if len(self.gamesToPlay) == 0:
+                    # cleared while we weren't looking
+                    continue
+                if self.restartGameList is None:
+                    self.restartGameList = list(self.gamesToPlay)
+                game = self.gamesToPlay.pop(0)
 
             self.UI.statsHandler.timeLabel.Start()
             self.UI.statsHandler.addLogItem()
@@ -621,10 +763,6 @@ class Game(object):
                 self.UI.pausePressed()
             self.running = True
 
-            self.gamesToPlayLock.acquire()
-            game = self.gamesToPlay.pop(0)
-            self.gamesToPlayLock.release()
-
             self.hasHumanPlayer = game.p1.author == "Human" or game.p2.author == "Human"
 
             # pause on start -- only for the first game
@@ -637,44 +775,176 @@ class Game(object):
             self.currentPlayerScores.append([self.truncateName(game.p1.author, 24), 0, 0])
             self.currentPlayerScores.append([self.truncateName(game.p2.author, 24), 0, 0])
 
-            for j in range(game.n):
-                self.UI.statsHandler.updateCurLogItem(self.tournamentStr(True))
-                self.UI.statsHandler.setScoreRecord(self.tournamentStr(False))
-                if self.verbose: print(self.tournamentStr(True), "\n")
-                self.setup(game, j)
-                self.UI.setPlayers(self.truncateName(self.currentPlayers[0].author),
-                                   self.truncateName(self.currentPlayers[1].author))
-                self.runGame()
-
-                if self.goToSettings or self.ended:
-                    self.killed = False
-                    break
-
-                if self.killed:
-                    self.killed = False
-                    continue
-                self.resolveEndGame()
+            if self.numWorkers > 1 and not self.hasHumanPlayer:
+                self.playGamesInPool(game)
+            else:
+                self.playGames(game)
 
-            self.UI.statsHandler.updateCurLogItem(self.tournamentStr(True))
-            self.UI.statsHandler.setScoreRecord(self.tournamentStr(False))
+            self.UI.showScores(self.tournamentStr(True), self.tournamentStr(False), self.latency.formatTable())
             if self.verbose: print(self.tournamentStr(True), "\n")
 
             self.UI.statsHandler.stopCurLogItem(True)
 
+            # the tournament is over, write out the timings
+            if len(self.gamesToPlay) == 0 and self.latencyFile is not None:
+                self.latency.exportFile(self.latencyFile)
+
             if len(self.gamesToPlay) == 0 and self.autorestart:
                 # self.UI.restartPressed()
                 self.restarted = True
                 
             if self.restarted:
                 self.restarted = False
-                self.gamesToPlay = self.restartGameList
+                self.queueGames(self.restartGameList)
                 self.restartGameList = None
+                self.latency.clear()
                 self.UI.statsHandler.clearLog()
                 self.UI.statsHandler.timeLabel.Reset()
         self.UI.statsHandler.stopCurLogItem()
         self.UI.statsHandler.timeLabel.Stop()
 
-            
+    ##
+    # playGames
+    # Description: Plays all the games of a GameData one after the other on the game thread
+    #
+    # Parameters:
+    #   game - the GameData to play (GameData)
+    ##
+    def playGames(self, game):
+        for j in range(game.n):
+            self.UI.showScores(self.tournamentStr(True), self.tournamentStr(False), self.latency.formatTable())
+            if self.verbose: print(self.tournamentStr(True), "\n")
+            self.setup(game, j)
+            self.UI.setPlayers(self.truncateName(self.currentPlayers[0].author),
+                               self.truncateName(self.currentPlayers[1].author))
+            self.runGame()
+
+            if self.goToSettings or self.ended:
+                self.killed = False
+                break
+
+            if self.killed:
+                self.killed = False
+                continue
+            self.resolveEndGame()
+
+    ##
+    # playGamesInPool
+    # Description: Plays all the games of a GameData on the worker processes.  Games
+    #   still waiting in gamesToPlay are handed to the workers too, so they keep busy
+    #   between pairings, but results are always merged into the score tables in the
+    #   order the games were queued.
+    #
+    # Parameters:
+    #   game - the GameData to play (GameData)
+    ##
+    def playGamesInPool(self, game):
+        limit = self.timeout_limit if self.timeoutOn else None
+        if self.tournament is None or self.tournament.timeoutLimit != limit:
+            self.cancelPoolGames()
+            self.tournament = TournamentRunner("AI", self.numWorkers, limit, recordDir=self.recordDir,
+                                               isolate=self.isolateAgents, cpuTime=self.cpuTime,
+                                               gameTimeout=self.gameTimeout)
+
+        # hand over everything that is queued and hasn't been sent yet
+        with self.gamesQueued:
+            for queued in [game] + self.gamesToPlay:
+                if id(queued) not in self.poolResults:
+                    jobs = makeJobs(queued.p1.author, queued.p2.author, queued.n, self.playerSwap, self.masterSeed)
+                    self.poolResults[id(queued)] = self.tournament.submit(jobs)
+
+        self.currentPlayers = [game.p1, game.p2]
+        self.UI.setPlayers(self.truncateName(game.p1.author), self.truncateName(game.p2.author))
+        self.UI.showInstructions("Playing on %d worker processes." % self.numWorkers)
+
+        for result in self.poolResults.pop(id(game)):
+            self.UI.showScores(self.tournamentStr(True), self.tournamentStr(False), self.latency.formatTable())
+            if self.verbose: print(self.tournamentStr(True), "\n")
+
+            # wait for the game, checking in regularly in case we've been stopped
+            while not result.ready() and not (self.killed or self.goToSettings or self.ended):
+                result.wait(0.1)
+
+            if self.goToSettings or self.ended:
+                self.killed = False
+                self.cancelPoolGames()
+                break
+
+            if self.killed:
+                self.killed = False
+                continue
+
+            winner, latency = result.get()
+            self.latency.merge(latency)
+            self.scorePoolGame(game, winner)
+
+    ##
+    # scorePoolGame
+    # Description: Adds the result of a game played by a worker process to the score tables
+    #
+    # Parameters:
+    #   game - the GameData the game was one of (GameData)
+    #   winner - 0 if game.p1 won, 1 if game.p2 won, None if nobody did
+    ##
+    def scorePoolGame(self, game, winner):
+        if winner is None:
+            return
+        loser = 1 - winner
+        players = [game.p1, game.p2]
+
+        self.currentPlayerScores[winner][1] += 1
+        self.currentPlayerScores[loser][2] += 1
+        if players[winner].playerId >= 0:
+            self.playerScores[players[winner].playerId][1] += 1
+        if players[loser].playerId >= 0:
+            self.playerScores[players[loser].playerId][2] += 1
+
+    ##
+    # cancelPoolGames
+    # Description: Stops the worker processes and forgets about games sent to them
+    ##
+    def cancelPoolGames(self):
+        if self.tournament is not None:
+            self.tournament.cancel()
+        self.poolResults = {}
+
+    ##
+    # playHeadless
+    # Description: Plays the games given on the command line on the worker
+    #   processes without a window, printing the scores of each pairing as it
+    #   finishes and the overall scores at the end
+    ##
+    def playHeadless(self):
+        self.queueCommandLineGames()
+        limit = self.timeout_limit if self.timeoutOn else None
+        self.tournament = TournamentRunner("AI", self.numWorkers, limit, recordDir=self.recordDir,
+                                           isolate=self.isolateAgents, cpuTime=self.cpuTime,
+                                           gameTimeout=self.gameTimeout)
+
+        # hand every game over at once so the workers keep busy between pairings
+        pairings = []
+        for game in self.gamesToPlay:
+            jobs = makeJobs(game.p1.author, game.p2.author, game.n, self.playerSwap, self.masterSeed)
+            pairings.append((game, self.tournament.submit(jobs)))
+        self.gamesToPlay = []
+
+        try:
+            for game, results in pairings:
+                self.currentPlayerScores = [[self.truncateName(game.p1.author, 24), 0, 0],
+                                            [self.truncateName(game.p2.author, 24), 0, 0]]
+                for result in results:
+                    winner, latency = result.get()
+                    self.latency.merge(latency)
+                    self.scorePoolGame(game, winner)
+                print(self.tournamentStr(True), "\n")
+        finally:
+            self.tournament.close()
+
+        print(self.tournamentStr(False))
+        if self.verbose:
+            print("\n" + self.latency.formatTable())
+        if self.latencyFile is not None:
+            self.latency.exportFile(self.latencyFile)
 
     def setup(self, game, count):
         self.state = GameState.getBlankState()
@@ -682,8 +952,8 @@ class Game(object):
 
         # load current players
         self.currentPlayers = []
-        self.currentPlayers.append(game.p1)
-        self.currentPlayers.append(game.p2)
+        self.currentPlayers.append(self.hostAgent(game.p1))
+        self.currentPlayers.append(self.hostAgent(game.p2))
         self.flipped = False
 
         # switch the order of the players if we should
@@ -695,6 +965,18 @@ class Game(object):
         self.winner = None
         self.loser = None
 
+        # seed the game and its players the same way the workers' MatchEngine does
+        gameSeed = getGameSeed(self.masterSeed, game.p1.author, game.p2.author, count)
+        if gameSeed is None:
+            gameSeed = newSeed()
+        self.random.seed(gameSeed)
+        random.seed(gameSeed)
+        for seat in range(len(self.currentPlayers)):
+            self.currentPlayers[seat].seedRandom(deriveSeed(gameSeed, seat))
+            if self.currentPlayers[seat].transpositionTable is not None:
+                self.currentPlayers[seat].transpositionTable.clear()
+        self.record = GameRecord([player.author for player in self.currentPlayers], gameSeed)
+
     ##
     # kill
     #
@@ -720,11 +1002,12 @@ class Game(object):
     #
     # restarts the game set
     def restartFromEnd(self):
-        self.gamesToPlay = self.restartGameList
+        games = self.restartGameList
         self.restartGameList = None
+        self.latency.clear()
         self.UI.statsHandler.clearLog()
         self.UI.statsHandler.timeLabel.Reset()
-        self.generalWake()
+        self.queueGames(games)
 
     ##
     # runGame
@@ -737,24 +1020,26 @@ class Game(object):
     def runGame(self):
         # build a list of things to place for player 1 in setup phase 1
         # 1 anthill/queen, 1 tunnel/worker, 9 obstacles
-        constrsToPlace = []
-        constrsToPlace += [Building(None, ANTHILL, PLAYER_ONE)]
-        constrsToPlace += [Building(None, TUNNEL, PLAYER_ONE)]
-        constrsToPlace += [Construction(None, GRASS) for i in range(0, 9)]
+        constrsToPlace = self.getSetupConstructions()
+
+        # let the players know how long they have to answer
+        for player in self.currentPlayers:
+            player.moveTimeLimit = self.timeout_limit if self.timeoutOn else None
+            player.cpuTime = self.cpuTime
 
         while not self.gameOver:
             if self.killed:
                 return
             # create a copy of the state to share with the player
-            theState = self.state.clone()
+            theState = self.latency.call(ENGINE, "clone", self.state.clone)
 
             # I think this is where it should go
             if self.UI is not None:
-                self.UI.showState(theState)
+                self.latency.call(ENGINE, "ui", self.UI.showState, theState)
 
             # if the player is player two, flip the board
             if theState.whoseTurn == PLAYER_TWO:
-                theState.flipBoard()
+                self.latency.call(ENGINE, "flip", theState.flipBoard)
 
             if self.state.phase == SETUP_PHASE_1 or self.state.phase == SETUP_PHASE_2:
                 currentPlayer = self.currentPlayers[self.state.whoseTurn]
@@ -764,11 +1049,11 @@ class Game(object):
                 # do auto-random setup for human player if required
                 if self.randomSetup and isinstance(currentPlayer, HumanPlayer.HumanPlayer):
                     if constrsToPlace[0].type != FOOD:
-                        coord = (random.randint(0, 9), random.randint(0, 3))
+                        coord = (self.random.randint(0, 9), self.random.randint(0, 3))
                         if self.state.board[coord[0]][coord[1]].constr is None:
                             targets.append(coord)
                     elif constrsToPlace[0].type == FOOD:
-                        coord = (random.randint(0, 9), random.randint(6, 9))
+                        coord = (self.random.randint(0, 9), self.random.randint(6, 9))
                         if self.state.board[coord[0]][coord[1]].constr is None:
                             targets.append(coord)
 
@@ -778,92 +1063,41 @@ class Game(object):
 
                 # get the placement from the player
                 if isinstance(currentPlayer, HumanPlayer.HumanPlayer) and not self.randomSetup:
+                    wakeups = self.wakeups
                     self.UI.getHumanMove(theState.phase)
-                    self.condWait()
+                    self.condWait(wakeups)
                     if self.killed:
                         return
                     targets += self.submittedSetup
                     self.submittedSetup = None
                 else:
-                    targets += currentPlayer.getPlacement(theState)
+                    try:
+                        targets += self.timePlayerCall(currentPlayer, "getPlacement", theState)
+                    except AGENT_FAILURES:
+                        traceback.print_exc(limit=0)
+                        self.setWinner(1 - self.state.whoseTurn)
+                        return
 
                 # only want to place as many targets as constructions to place
                 if len(targets) > len(constrsToPlace):
                     targets = targets[:len(constrsToPlace)]
 
-                validPlace = self.isValidPlacement(constrsToPlace, targets)
+                validPlace = self.latency.call(ENGINE, "validate", self.isValidPlacement, constrsToPlace, targets)
                 if validPlace:
-                    for target in targets:
-                        # translate coords to match player
-                        target = self.state.coordLookup(target, self.state.whoseTurn)
-                        # get construction to place
-                        constr = constrsToPlace.pop(0)
-                        # give constr its coords
-                        constr.coords = target
-                        # put constr on board
-                        self.state.board[target[0]][target[1]].constr = constr
-                        if constr.type == ANTHILL or constr.type == TUNNEL:
-                            # update the inventory
-                            self.state.inventories[self.state.whoseTurn].constrs.append(constr)
-                        else:  # grass and food
-                            self.state.inventories[NEUTRAL].constrs.append(constr)
+                    self.placeConstructions(constrsToPlace, targets)
 
                     # if AI mode, pause to observe move until next or continue is clicked
                     self.pauseGame()
 
                     if not constrsToPlace:
-                        constrsToPlace = []
-                        if self.state.phase == SETUP_PHASE_1:
-                            if self.state.whoseTurn == PLAYER_ONE:
-                                constrsToPlace += [Building(None, ANTHILL, PLAYER_TWO)]
-                                constrsToPlace += [Building(None, TUNNEL, PLAYER_TWO)]
-                                constrsToPlace += [Construction(None, GRASS) for i in range(0, 9)]
-                            elif self.state.whoseTurn == PLAYER_TWO:
-                                constrsToPlace += [Construction(None, FOOD) for i in range(0, 2)]
-                                self.state.phase = SETUP_PHASE_2
-                        elif self.state.phase == SETUP_PHASE_2:
-                            if self.state.whoseTurn == PLAYER_ONE:
-                                constrsToPlace += [Construction(None, FOOD) for i in range(0, 2)]
-                            elif self.state.whoseTurn == PLAYER_TWO:
-                                # if we're finished placing, add in queens and move to play phase
-                                p1inventory = self.state.inventories[PLAYER_ONE]
-                                p2inventory = self.state.inventories[PLAYER_TWO]
-                                # get anthill coords
-                                p1AnthillCoords = p1inventory.constrs[0].coords
-                                p2AnthillCoords = p2inventory.constrs[0].coords
-                                # get tunnel coords
-                                p1TunnelCoords = p1inventory.constrs[1].coords
-                                p2TunnelCoords = p2inventory.constrs[1].coords
-                                # create queen and worker ants
-                                p1Queen = Ant(p1AnthillCoords, QUEEN, PLAYER_ONE)
-                                p2Queen = Ant(p2AnthillCoords, QUEEN, PLAYER_TWO)
-                                p1Worker = Ant(p1TunnelCoords, WORKER, PLAYER_ONE)
-                                p2Worker = Ant(p2TunnelCoords, WORKER, PLAYER_TWO)
-                                # put ants on board
-                                self.state.board[p1Queen.coords[0]][p1Queen.coords[1]].ant = p1Queen
-                                self.state.board[p2Queen.coords[0]][p2Queen.coords[1]].ant = p2Queen
-                                self.state.board[p1Worker.coords[0]][p1Worker.coords[1]].ant = p1Worker
-                                self.state.board[p2Worker.coords[0]][p2Worker.coords[1]].ant = p2Worker
-                                # add the queens to the inventories
-                                p1inventory.ants.append(p1Queen)
-                                p2inventory.ants.append(p2Queen)
-                                p1inventory.ants.append(p1Worker)
-                                p2inventory.ants.append(p2Worker)
-                                # give the players the initial food
-                                p1inventory.foodCount = 1
-                                p2inventory.foodCount = 1
-                                # change to play phase
-                                self.state.phase = PLAY_PHASE
-
-                        # change player turn in state
-                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+                        constrsToPlace = self.advanceSetup()
 
                 else:
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
                         # cause current player to lose game because AIs aren't allowed to make mistakes.
                         code = self.error(INVALID_PLACEMENT, targets, currentPlayer)
                         self.setWinner(1 - self.state.whoseTurn)
-                        self.UI.gameHandler.setInstructionText(code)
+                        self.UI.showInstructions(code)
                         # pause for the illegal move
                         if self.pauseOnIllegalMove and not self.UI.paused:
                             self.UI.pausePressed()
@@ -873,27 +1107,25 @@ class Game(object):
 
                 if isinstance(currentPlayer, HumanPlayer.HumanPlayer):
                     # alert the UI that we need a move, then wait until it gives one to us
+                    wakeups = self.wakeups
                     self.UI.getHumanMove(theState.phase)
-                    self.condWait()
+                    self.condWait(wakeups)
                     if self.killed:
                         return
                     self.move = self.submittedMove
                     self.submittedMove = None
                 else:
-                    if self.timeoutOn:
-                        t = Thread(target=self.get_move, args=(currentPlayer, theState))
-                        t.daemon = True
-                        try:
-                            t.start()
-                            t.join(self.timeout_limit)
-                            if t.isAlive():
-                                raise Exception('function [get_move] timeout [%s seconds] exceeded!' % self.timeout_limit)
-                        except Exception as je:
-                            traceback.print_exc(limit=0)
-                            self.setWinner(1 - self.state.whoseTurn)
-                            return
-                    else:
-                        self.get_move(currentPlayer, theState)
+                    try:
+                        # an AgentProcess keeps its own time
+                        if self.timeoutOn and not isinstance(currentPlayer, AgentProcess):
+                            callWithTimeLimit(self.get_move, (currentPlayer, theState), self.timeout_limit,
+                                              self.cpuTime)
+                        else:
+                            self.get_move(currentPlayer, theState)
+                    except AGENT_FAILURES:
+                        traceback.print_exc(limit=0)
+                        self.setWinner(1 - self.state.whoseTurn)
+                        return
 
                 if self.move != None and self.move.coordList != None:
                     for i in range(0, len(self.move.coordList)):
@@ -901,7 +1133,7 @@ class Game(object):
                         self.move.coordList[i] = self.state.coordLookup(self.move.coordList[i], self.state.whoseTurn)
 
                 # make sure it's a valid move
-                validMove = self.isValidMove(self.move)
+                validMove = self.latency.call(ENGINE, "validate", self.isValidMove, self.move)
 
                 # complete the move if valid
                 if validMove:
@@ -909,22 +1141,8 @@ class Game(object):
                     if self.move.moveType == MOVE_ANT:
                         # record state in undo before applying move
                         if self.hasHumanPlayer:
-                            self.undoStates.append(self.state.clone())
-                        startCoord = self.move.coordList[0]
-                        endCoord = self.move.coordList[-1]
-
-                        # take ant from start coord
-                        antToMove = self.state.board[startCoord[0]][startCoord[1]].ant
-
-                        # change ant's coords and hasMoved status
-                        antToMove.coords = (endCoord[0], endCoord[1])
-                        antToMove.hasMoved = True
-
-                        # remove ant from location
-                        self.state.board[startCoord[0]][startCoord[1]].ant = None
-
-                        # put ant at last loc in coordList
-                        self.state.board[endCoord[0]][endCoord[1]].ant = antToMove
+                            self.undoStates.append(CompactGameState.fromGameState(self.state))
+                        antToMove = self.moveAnt(self.move)
 
                         # if AI mode, pause to observe move until next or continue is clicked
                         self.pauseGame()
@@ -936,23 +1154,8 @@ class Game(object):
                     elif self.move.moveType == BUILD:
                         # record state in undo before applying move
                         if self.hasHumanPlayer:
-                            self.undoStates.append(self.state.clone())
-                        coord = self.move.coordList[0]
-                        currentPlayerInv = self.state.inventories[self.state.whoseTurn]
-
-                        # subtract the cost of the item from the player's food count
-                        if self.move.buildType == TUNNEL:
-                            currentPlayerInv.foodCount -= CONSTR_STATS[self.move.buildType][BUILD_COST]
-
-                            tunnel = Building(coord, TUNNEL, self.state.whoseTurn)
-                            self.state.board[coord[0]][coord[1]].constr = tunnel
-                        else:
-                            currentPlayerInv.foodCount -= UNIT_STATS[self.move.buildType][COST]
-
-                            ant = Ant(coord, self.move.buildType, self.state.whoseTurn)
-                            ant.hasMoved = True
-                            self.state.board[coord[0]][coord[1]].ant = ant
-                            self.state.inventories[self.state.whoseTurn].ants.append(ant)
+                            self.undoStates.append(CompactGameState.fromGameState(self.state))
+                        self.buildFromMove(self.move)
 
                         # if AI mode, pause to observe move until next or continue is clicked
                         self.pauseGame()
@@ -965,46 +1168,24 @@ class Game(object):
                         # reset undo moves on each turn change
                         self.undoStates = []
 
-                        # take care of end of turn business for ants and constructions
-                        for ant in self.state.inventories[self.state.whoseTurn].ants:
-                            constrUnderAnt = self.state.board[ant.coords[0]][ant.coords[1]].constr
-                            if constrUnderAnt != None:
-                                # if constr is enemy's and ant hasnt moved, affect capture health of buildings
-                                if type(
-                                        constrUnderAnt) is Building and not constrUnderAnt.player == self.state.whoseTurn:
-                                    constrUnderAnt.captureHealth -= 1
-                                # have all worker ants on food sources gather food
-                                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
-                                    ant.carrying = True
-                                # deposit carried food (only workers carry)
-                                elif (
-                                        constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
-                                    self.state.inventories[self.state.whoseTurn].foodCount += 1
-                                    ant.carrying = False
-
-                            # reset hasMoved on all ants of player
-                            ant.hasMoved = False
-
-                        # clear any currently highlighted squares
-                        # self.ui.coordList = []
-
-                        # switch whose turn it is
-                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+                        # take care of end of turn business and switch whose turn it is
+                        self.endTurn()
 
                         # notify player which AI is acting
                         nextPlayerName = self.currentPlayers[self.state.whoseTurn].author
-                        self.UI.gameHandler.setInstructionText(nextPlayerName + "'s turn.")
+                        self.UI.showInstructions(nextPlayerName + "'s turn.")
 
                         # if AI mode, pause to observe move until next or continue is clicked
                         self.pauseGame()
                     elif self.move.moveType == UNDO and len(self.undoStates) > 0:
-                        self.state = self.undoStates.pop()
+                        self.state = self.undoStates.pop().toGameState()
+                        self.record.addUndo()
                 else:
                     # human can give None move, AI can't
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
                         code = self.error(INVALID_MOVE, self.move, currentPlayer)
                         self.setWinner(1 - self.state.whoseTurn)
-                        self.UI.gameHandler.setInstructionText(code)
+                        self.UI.showInstructions(code)
                         # pause for the illegal move
                         if self.pauseOnIllegalMove and not self.UI.paused:
                             self.UI.pausePressed()
@@ -1025,9 +1206,12 @@ class Game(object):
                 self.setWinner(PLAYER_TWO)
 
     def get_move(self, currentPlayer, theState):
-        self.move = currentPlayer.getMove(theState)
+        self.move = self.timePlayerCall(currentPlayer, "getMove", theState)
 
     def resolveEndGame(self):
+        if self.recordDir is not None:
+            saveRecord(self.record, self.recordDir)
+
         if self.UI is not None:
             self.UI.showState(self.state)
             # notify the user of the winner
@@ -1042,7 +1226,7 @@ class Game(object):
             if self.errored:
                 self.errored = False
             else:
-                self.UI.gameHandler.setInstructionText("%s has won!" % winnerName)
+                self.UI.showInstructions("%s has won!" % winnerName)
 
         # adjust the wins and losses of players
         # because of how human and copies are handled currently, problems
@@ -1069,6 +1253,7 @@ class Game(object):
         self.gameOver = True
         self.winner = self.currentPlayers[id].playerId
         self.loser = self.currentPlayers[1 - id].playerId
+        self.record.setResult(id)
 
         # tell the players if they won or lost
         self.currentPlayers[id].registerWin(True)
@@ -1091,44 +1276,38 @@ class Game(object):
     ##
     def resolveAttack(self, attackingAnt, currentPlayer):
         # check if player wants to attack
-        validAttackCoords = []
-        opponentId = (self.state.whoseTurn + 1) % 2
-        for ant in self.state.inventories[opponentId].ants:
-            if self.isValidAttack(attackingAnt, ant.coords):
-                # keep track of valid attack coords (flipped for player two)
-                validAttackCoords.append(self.state.coordLookup(ant.coords, self.state.whoseTurn))
+        validAttackCoords = self.listAttackCoords(attackingAnt)
         if validAttackCoords != []:
-            theState = self.state.clone()
+            theState = self.latency.call(ENGINE, "clone", self.state.clone)
 
             if self.UI is not None:
-                self.UI.showState(theState)
+                self.latency.call(ENGINE, "ui", self.UI.showState, theState)
 
             if theState.whoseTurn == PLAYER_TWO:
-                theState.flipBoard()
+                self.latency.call(ENGINE, "flip", theState.flipBoard)
 
             if isinstance(currentPlayer, HumanPlayer.HumanPlayer):
                 # have to swap ant back for the GUI if its player 2
+                wakeups = self.wakeups
                 self.UI.getHumanAttack(self.state.coordLookup(attackingAnt.coords, theState.whoseTurn))
-                self.condWait()
+                self.condWait(wakeups)
                 if self.killed:
                     return
 
                 attackCoord = self.submittedAttack
                 self.submittedAttack = None
             else:
-                attackCoord = self.state.coordLookup(
-                    currentPlayer.getAttack(theState, attackingAnt.clone(), validAttackCoords), theState.whoseTurn)
-
-            # decrement ants health
-            attackedAnt = self.state.board[attackCoord[0]][attackCoord[1]].ant
-            attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
+                try:
+                    attackCoord = self.state.coordLookup(
+                        self.timePlayerCall(currentPlayer, "getAttack", theState, attackingAnt.clone(),
+                                            validAttackCoords), theState.whoseTurn)
+                except AGENT_FAILURES:
+                    traceback.print_exc(limit=0)
+                    self.setWinner(1 - self.state.whoseTurn)
+                    return
 
-            # check for dead ant
-            if attackedAnt.health <= 0:
-                # remove dead ant from board
-                self.state.board[attackCoord[0]][attackCoord[1]].ant = None
-                # remove dead ant from inventory
-                self.state.inventories[opponentId].ants.remove(attackedAnt)
+            # decrement ants health and remove it if it died
+            self.applyAttack(attackingAnt, attackCoord)
 
             # if AI mode, pause to observe attack until next or continue is clicked
             self.pauseGame()
@@ -1136,6 +1315,7 @@ class Game(object):
     ##
     # loadAIs
     # Description: Loads the AIPlayers from the AI subdirectory into the game.
+    #   The players are AgentEntry's until they play.
     #
     # Parameters:
     #   humanMode - a boolean value, if true then the IDs of he AI players are
@@ -1144,49 +1324,47 @@ class Game(object):
     def loadAIs(self):
         # Reset the player list in case some have been loaded already
         self.players = []
+        # worker processes hold their own copies of the agents
+        self.cancelPoolGames()
+        self.closeAgentProcesses()
         self.playerScores = []
 
         # self.addPlayer(HumanPlayer.HumanPlayer(0))
 
-        # Attempt to load AIs. Exit gracefully if user trying to load weird stuff.
-        filesInAIFolder = os.listdir("AI")
-        # Change directory to AI subfolder so modules can be loaded (they won't load as filenames).
-        os.chdir('AI')
-
-        # Add current directory in python's import search order.
-        sys.path.insert(0, os.getcwd())
-        # Make player instances from all AIs in folder.
-        i = 0
-        for file in filesInAIFolder:
-            if re.match(".*\.py$", file) or re.match(".*\.pyc$", file):
-                moduleName, ext = os.path.splitext(file)
-                # Check to see if the file is already loaded.
-                # temp = __import__(moduleName, globals(), locals(), [], -1)
-                temp = importlib.import_module(moduleName)
-                self.addPlayer(temp.AIPlayer(i))
-                i += 1
-        # Remove current directory from python's import search order.
-        sys.path.pop(0)
-        # Revert working directory to parent.
-        os.chdir('..')
+        # Find the AIs in the AI folder.  Only the ones that are new or have
+        # changed since the last run are imported now, the rest are imported
+        # when they first play (see hostAgent).
+        self.registry = AgentRegistry("AI")
+        for entry in self.registry.entries:
+            self.addPlayer(entry)
+
+    ##
+    # hostAgent
+    # Description: With --isolate, gives the AgentProcess an AI plays through,
+    #   one per author, created the first time it is needed.  Otherwise (and for
+    #   humans) the player itself.
+    #
+    # Parameters:
+    #   player - a Player or the AgentEntry of one
+    ##
+    def hostAgent(self, player):
+        if isinstance(player, AgentEntry):
+            player = player.getPlayer()
+        if not self.isolateAgents or isinstance(player, HumanPlayer.HumanPlayer):
+            return player
+        if player.author not in self.agentProcesses:
+            self.agentProcesses[player.author] = AgentProcess(player, "AI")
+        return self.agentProcesses[player.author]
+
+    def closeAgentProcesses(self):
+        for agent in self.agentProcesses.values():
+            agent.close()
+        self.agentProcesses = {}
 
     def createAICopy(self, player):
-        filesInAIFolder = os.listdir("AI")
-        os.chdir('AI')
-        sys.path.insert(0, os.getcwd())
-        for file in filesInAIFolder:
-            if re.match(".*\.py$", file) or re.match(".*\.pyc$", file):
-                moduleName, ext = os.path.splitext(file)
-                temp = importlib.import_module(moduleName)
-                copy = temp.AIPlayer(COPY)
-                if copy.author == player:
-                    copy.author += "@@"
-                    break
-        sys.path.pop(0)
-        os.chdir('..')
-        return copy
-
-    def addPlayer(self, p: Player):
+        return self.registry.find(player).makeCopy()
+
+    def addPlayer(self, p):
         self.players.append([p, ACTIVE])
         self.playerScores.append([self.truncateName(p.author, 30), 0, 0])
 
@@ -1213,440 +1391,6 @@ class Game(object):
             return
         print(msg)
 
-    ##
-    # isValidMove(Move)
-    # Description: Checks to see if the move is valid for the current player.
-    #
-    # Parameters:
-    #   move - The Move to check (Move)
-    #
-    # Returns: None if no move is given, true if the given move is valid, or false if the given move is invalid
-    ##
-    def isValidMove(self, move):
-        # check for no move
-        if move == None:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            return None
-
-        # check that the move is well-formed typewise (tuples, ints, etc)
-        if type(move) != Move:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("ERROR:  player did not supply an object of type 'Move'")
-            return False
-        if type(move.moveType) != int:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("       Move type must be an integer.")
-            return False
-        # for END or UNDO type moves, lots we don't need to check
-        if move.moveType == END or move.moveType == UNDO:
-            return True
-        if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
-            self.errorReport("ERROR: Invalid Move: " + str(move))
-            self.errorReport("       The coordinate list is empty!")
-            return False
-        index = 0
-        for coord in move.coordList:
-            if (type(coord) != tuple):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " is not a tuple.")
-                return False
-            if (len(coord) != 2):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport(
-                    "       Coordinate at index " + str(index) + " has " + str(len(coord)) + "entries instead of 2.")
-                return False
-            if (type(coord[0]) != int) or (type(coord[1]) != int):
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Coordinate at index " + str(index) + " contains a value that is not an int.")
-                return False
-            index += 1
-        if type(move.buildType) != type(None) and type(move.buildType) != int:
-            return False
-
-        # for MOVE_ANT and BUILD type moves
-        if move.moveType == MOVE_ANT:
-            firstCoord = move.coordList[0]
-            # check valid start location (good coords and ant ownership)
-            if self.checkMoveStart(firstCoord):
-                # get ant to move
-                antToMove = self.state.board[firstCoord[0]][firstCoord[1]].ant
-                movePoints = UNIT_STATS[antToMove.type][MOVEMENT]
-                previousCoord = None
-
-                index = 0
-                for coord in move.coordList:
-                    # if first runthough, need to set up previous coord
-                    if previousCoord == None:
-                        previousCoord = coord
-                        continue
-                    # if any to-coords are invalid, return invalid move
-                    if not self.checkMovePath(previousCoord, coord):
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Illegal movement path at index" + str(index))
-                        return False
-
-                    # subtract cost of loc from movement points
-                    constrAtLoc = self.state.board[coord[0]][coord[1]].constr
-                    if constrAtLoc == None or UNIT_STATS[antToMove.type][IGNORES_GRASS]:
-                        movePoints -= 1
-                    else:
-                        movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
-
-                    previousCoord = coord
-                    index += 1
-
-                # Check for Queen ant trying to leave her territory
-                if (antToMove.type == QUEEN):
-                    for coord in move.coordList:
-                        if (coord[1] == BOARD_LENGTH / 2 - 1) \
-                                or (coord[1] == BOARD_LENGTH / 2):
-                            self.errorReport("ERROR: Invalid Move: " + str(move))
-                            self.errorReport("       Queen ant may not leave her own territory")
-                            return False
-
-                # within movement range and hasn't moved yet?
-                if (movePoints < 0):
-                    self.errorReport("ERROR: Invalid Move: " + str(move))
-                    self.errorReport("       Ant has insufficient movement points for this move")
-                    return False
-                if antToMove.hasMoved:
-                    self.errorReport("ERROR: Invalid Move: " + str(move))
-                    self.errorReport("       Ant has already made a move this turn")
-                    return False
-                else:
-                    return True
-
-        elif move.moveType == BUILD:
-            # coord list must contain one point for build
-            if len(move.coordList) != 1:
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       for a BUILD move, the coordinate list should contain exactly 1 coordinate")
-                return False
-
-            buildCoord = move.coordList[0]
-            # check valid start location
-            if self.checkBuildStart(buildCoord):
-                # we're building either an ant or constr for sure ->
-                # -> no longer able to build tunnels, so can only build ants.
-
-                if self.state.board[buildCoord[0]][buildCoord[1]].ant == None:
-                    # we know we're building an ant
-                    buildCost = None
-                    # check buildType for valid ant
-                    if move.buildType == WORKER:
-                        buildCost = UNIT_STATS[WORKER][COST]
-                    elif move.buildType == DRONE:
-                        buildCost = UNIT_STATS[DRONE][COST]
-                    elif move.buildType == SOLDIER:
-                        buildCost = UNIT_STATS[SOLDIER][COST]
-                    elif move.buildType == R_SOLDIER:
-                        buildCost = UNIT_STATS[R_SOLDIER][COST]
-                    else:
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
-                        return False
-
-                    # check the player has enough food
-                    currFood = self.state.inventories[self.state.whoseTurn].foodCount
-                    if currFood >= buildCost:
-                        # self.ui.notify("")
-                        return True
-                    else:
-                        self.errorReport("ERROR: Invalid Move: " + str(move))
-                        self.errorReport("       Player has " + str(currFood) + " food but needs " + str(
-                            buildCost) + " to build this ant")
-                        return False
-
-
-                # Below is the code that allows a player to build more tunnels during the course of a game,
-                # in case it is ever desired to be a part of the game again.
-
-                # else:
-                #     # we know we're building a construction
-                #     adjacentCoords = []
-                #     adjacentCoords.append(addCoords(buildCoord, (0, -1)))
-                #     adjacentCoords.append(addCoords(buildCoord, (0, 1)))
-                #     adjacentCoords.append(addCoords(buildCoord, (-1, 0)))
-                #     adjacentCoords.append(addCoords(buildCoord, (1, 0)))
-                #
-                #     # check that there's no food in adjacent locations
-                #     for aCoord in adjacentCoords:
-                #         if aCoord[0] >= 0 and aCoord[0] < 10 and aCoord[1] >= 0 and aCoord[1] < 10:
-                #             if (self.state.board[aCoord[0]][aCoord[1]].constr != None and
-                #                         self.state.board[aCoord[0]][aCoord[1]].constr.type == FOOD):
-                #                 self.errorReport("ERROR: Invalid Move: " + str(move))
-                #                 self.errorReport("       Cannot tunnel build next to food.")
-                #                 return False
-                #
-                #     buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
-                #     if self.state.inventories[self.state.whoseTurn].foodCount >= buildCost:
-                #         # self.ui.notify("")
-                #         return True
-                #     else:
-                #         self.errorReport("ERROR: Invalid Move: " + str(move))
-                #         self.errorReport("       Must have at least " + str(buildCost) + " food to build a tunnel.")
-                #         return False
-
-
-            else:  # invalid build start
-                self.errorReport("ERROR: Invalid Move: " + str(move))
-                self.errorReport("       Build location invalid.  Possible cause:")
-                loc = self.state.board[buildCoord[0]][buildCoord[1]]
-                if loc.ant == None:  # building ant
-                    self.errorReport("         - Anthill does not belong to current player")
-                else:
-                    if (move.buildType != TUNNEL):
-                        self.errorReport("         - Anthill is already occupied")
-                    elif (loc.ant.hasMoved):
-                        self.errorReport("         - Worker ant has already moved this turn")
-                    else:
-                        self.errorReport("         - Worker ant does not belong to current player")
-        else:
-            # invalid numeric move type
-            return False
-
-    ##
-    # isValidPlacement
-    # Description: Checks that the given placement of Constructions is valid
-    #
-    # Paramters:
-    #   items - The items to place (Construction[])
-    #   targets - A list of the coordinates to place the items at ((int,int)[])
-    #
-    # Returns None if no target is given, true if it is a valid placement, or false if it is an invalid placement
-    ##
-    def isValidPlacement(self, items, targets):
-        # check for well-formed input of targets (from players)
-        if type(targets) == type(None) or type(targets) != list:
-            return False
-            # If no target, return None (human vs ai caught by caller)
-        if len(targets) == 0:
-            return None
-        for coord in targets:
-            if not self.isValidCoord(coord):
-                return False
-
-        for i in range(0, len(targets)):
-            # Nobody can place in the center two rows of the board or on their opponents side
-
-            # check item type
-            if items[i].type == ANTHILL or items[i].type == TUNNEL or items[i].type == GRASS:
-                # check targets[i] is within proper boundaries y-wise
-                # must be on own side
-                if not self.isInHomeTerritory(targets[i]):
-                    return False
-            # check item type
-            elif items[i].type == FOOD:
-                # check targets[i] is within proper boundaries y-wise
-                # must be on opponent's side
-                if not self.isInEnemyTerritory(targets[i]):
-                    return False
-            else:
-                # I don't know what this type is.
-                return False
-
-            # change target to access appropriate players locations
-            aTarget = self.state.coordLookup(targets[i], self.state.whoseTurn)
-            # make sure nothing is there yet
-            if self.state.board[aTarget[0]][aTarget[1]].constr:
-                return False
-            # This item should be placed and this location becomes occupied
-            self.state.board[aTarget[0]][aTarget[1]].constr = items[i]
-
-        return True
-
-    ##
-    # isValidAttack
-    # Description: Determines whether the attack with the given parameters is valid
-    #   Attacking ant is assured to exist and belong to the player whose turn it is
-    #
-    # Parameters:
-    #   attackingAnt - The Ant that is attacking (Ant)
-    #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
-    #
-    # Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
-    ##
-    def isValidAttack(self, attackingAnt, attackCoord):
-        if attackCoord == None:
-            return None
-
-        # check for well-formed input from players
-        if not self.isValidCoord(attackCoord):
-            return False
-
-        attackLoc = self.state.board[attackCoord[0]][attackCoord[1]]
-
-        if attackLoc.ant == None or attackLoc.ant.player == attackingAnt.player:
-            return False
-
-        # we know we have an enemy ant
-        range = UNIT_STATS[attackingAnt.type][RANGE]
-        diffX = abs(attackingAnt.coords[0] - attackCoord[0])
-        diffY = abs(attackingAnt.coords[1] - attackCoord[1])
-
-        # pythagoras would be proud
-        if range >= diffX + diffY:
-            # return True if within range
-            return True
-        else:
-            return False
-
-    ##
-    # isValidCoord
-    # Description: Retruns whether this coord represents a valid board location.
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if the coordinate is between (0,0) and (9,9)
-    ##
-    def isValidCoord(self, coord):
-        # check for well-formed coord
-        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
-            return False
-
-        # check boundaries
-        if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
-            return False
-
-        return True
-
-    ##
-    # isInHomeTerritory
-    #
-    # Description: determines whether the position is in the player's
-    # home territory
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if it is and False otherwise
-    #
-    ##
-    def isInHomeTerritory(self, coord):
-        if not self.isValidCoord(coord):
-            return False
-        if not (coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1):
-            return False
-        return True
-
-    ##
-    # isInEnemyTerritory
-    #
-    # Description: determines whether the position is in the player's
-    # enemy's territory
-    #
-    # Parameters:
-    #   coord - The coord to be checked trying to be checked ((int, int))
-    #
-    # Returns: True if it is and False otherwise
-    #
-    ##
-    def isInEnemyTerritory(self, coord):
-        if not self.isValidCoord(coord):
-            return False
-        if not (coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1):
-            return False
-        return True
-
-    ##
-    # checkMoveStart
-    # Description: Checks if the location is valid to move from.
-    #  (bounds and ant ownership)
-    #
-    # Parameters:
-    #   coord - The starting point for the move ((int, int))
-    #
-    # Returns: True if it is a valid starting point for a move and false if not
-    ##
-    def checkMoveStart(self, coord):
-        # check location is on board
-        if self.isValidCoord(coord):
-            antToMove = self.state.board[coord[0]][coord[1]].ant
-            # check that an ant exists at the loc
-            if antToMove != None:
-                # check that it's the player's ant and that it hasn't moved
-                if antToMove.player == self.state.whoseTurn and not antToMove.hasMoved:
-                    return True
-
-        return False
-
-    ##
-    # checkMovePath
-    # Description: Checks if the location is valid to move to.
-    #  (clear path, adjacent locations)
-    #
-    # Parameters:
-    #   fromCoord - The Ant's current coordinate ((int, int))
-    #   toCoord - The coorinate to move the Ant to ((int, int))
-    #
-    # Returns: True if it is a valid move and false otherwise
-    #
-    # Note: fromCoord must always have been checked by the time it's passed
-    #  (either in checkMoveStart or previous checkMovePath call)
-    ##
-    def checkMovePath(self, fromCoord, toCoord):
-        # check location is on board
-        if self.isValidCoord(toCoord):
-            # check that squares are adjacent (difference on only one axis is 1)
-            if ((abs(fromCoord[0] - toCoord[0]) == 1 and abs(fromCoord[1] - toCoord[1]) == 0) or
-                    (abs(fromCoord[0] - toCoord[0]) == 0 and abs(fromCoord[1] - toCoord[1]) == 1)):
-                antAtLoc = self.state.board[toCoord[0]][toCoord[1]].ant
-                # check if an ant exists at the loc
-                if antAtLoc == None:
-                    return True
-
-        return False
-
-    ##
-    # checkBuildStart
-    # Description: Checks if the location is valid to build from.
-    #  (bounds and building ownership)
-    #
-    # Parameters:
-    #   coord - The coordinate trying to be used to build ((int, int))
-    #
-    # Returns: True if it is a valid build location and false otherwise
-    ##
-    def checkBuildStart(self, coord):
-        # check location is on board
-        if self.isValidCoord(coord):
-            loc = self.state.board[coord[0]][coord[1]]
-            # check that an empty anthill exists at the loc
-            if loc.constr != None and loc.constr.type == ANTHILL and loc.ant == None:
-                # check that it's the player's anthill
-                if loc.constr.player == self.state.whoseTurn:
-                    return True
-            # check that an ant exists at an empty location
-            elif loc.ant != None and loc.ant.type == WORKER and loc.constr == None:
-                # check that it's the player's ant and it hasn't moved
-                if loc.ant.player == self.state.whoseTurn and not loc.ant.hasMoved:
-                    return True
-
-        return False
-
-    ##
-    # hasWon(int)
-    # Description: Determines whether the game has ended in victory for the given player.
-    #
-    # Parameters:
-    #   playerId - The ID of the player being checked for winning (int)
-    #
-    # Returns: True if the player with playerId has won the game.
-    ##
-    def hasWon(self, playerId):
-        opponentId = 1 - playerId
-
-        if ((self.state.phase == PLAY_PHASE) and
-                ((self.state.inventories[opponentId].getQueen() == None) or
-                     (self.state.inventories[opponentId].getAnthill().captureHealth <= 0) or
-                     (self.state.inventories[playerId].foodCount >= FOOD_GOAL) or
-                     (self.state.inventories[opponentId].foodCount == 0 and
-                              len(self.state.inventories[opponentId].ants) == 1))):
-            return True
-        else:
-            return False
-
     ##
     # pauseGame
     # Description: Will pause the game if set to AI mode until user clicks next or continue
@@ -1661,18 +1405,30 @@ class Game(object):
             return
 
         # pause using this wait condition
-        # The GUI thread will wake
+        # The GUI thread will wake us once waitingOnAI is set, so a wake that
+        # comes before we start waiting still counts
+        wakeups = self.wakeups
         self.waitingOnAI = True
-        self.condWait()
+        if self.UI.paused:
+            self.condWait(wakeups)
         self.waitingOnAI = False
 
-    def condWait(self):
-        # python conditions require a lock hold to notify() for some reason
-        # this is annoying in our case, where we lock to save CPU time
-        # so we have each thread hold the lock for as little as possible
-        self.waitCond.acquire()
-        self.waitCond.wait()
-        self.waitCond.release()
+    ##
+    # condWait
+    #
+    # blocks the game thread until generalWake is called
+    #
+    # Parameters:
+    #   wakeups - the value of self.wakeups to wait for a change from, taken
+    #             before asking for whatever will wake us.  Defaults to its
+    #             value now.
+    #
+    def condWait(self, wakeups = None):
+        with self.waitCond:
+            if wakeups is None:
+                wakeups = self.wakeups
+            while self.wakeups == wakeups:
+                self.waitCond.wait()
 
     ##
     # generalWake
@@ -1681,11 +1437,11 @@ class Game(object):
     # could cause errors if used in the wrong place
     #
     def generalWake(self):
-        if not self.waitCond.acquire(blocking=False):
-            print("Could not get lock to wake thread.")
-            return
-        self.waitCond.notify()
-        self.waitCond.release()
+        with self.waitCond:
+            self.wakeups += 1
+            self.waitCond.notify_all()
+        with self.gamesQueued:
+            self.gamesQueued.notify_all()
 
     ##
     # printTournament
@@ -1733,53 +1489,6 @@ class Game(object):
         s = "\n".join(s)
         return s
 
-    ##
-    # error
-    # Description: Called when an AI player makes an error. Gives a description
-    #    of what went wrong and exits the program.
-    #
-    # Parameters:
-    #   errorCode - A code indicating the type of error
-    #        info - the offending object that caused the error
-    ##
-    def error(self, errorCode, info, player = None):
-        self.errored = True
-        errorMsg = "AI ERROR: "
-        if player is not None:
-            errorMsg += player.author + ": "
-
-        if errorCode == INVALID_PLACEMENT:
-            # info is a coord list
-            errorMsg += "invalid placement\nCoords given: "
-            lastCoord = info.pop()
-            for coord in info:
-                errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
-            errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
-
-        elif errorCode == INVALID_MOVE:
-            # info is a move
-            errorMsg += "invalid move: " + str(info) + "\n"
-            if info == None:
-                errorMsg += "Move is non-move type: None"
-            elif type(info) != Move:
-                errorMsg += "Move is non-move type: " + str(type(info))
-            elif info.moveType == None:
-                errorMsg += "moveType is non-int type: None"
-            elif type(info.moveType) != int:
-                errorMsg += "moveType is non-int type: " + str(type(info.moveType))
-            elif info.moveType < MOVE_ANT or info.moveType > END:
-                errorMsg += "moveType not a recognized value: " + str(info.moveType)
-            elif info.moveType == MOVE_ANT:
-                pass
-
-        else:  # INVALID_ATTACK
-            # info is a coord
-            errorMsg += "invalid attack\n"
-            errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
-
-        print(errorMsg)
-        return errorMsg
-
 
     ###
     # pauseConditionReached
@@ -19,6 +19,14 @@ import os
 #
 #
 
+# textures of the constructions and ants, "Blue" or "Red" is appended for the
+# anthill, tunnel and the ants
+CONSTRUCT_TEXTURES = {GRASS: "grass", FOOD: "food", ANTHILL: "anthill", TUNNEL: "tunnel"}
+ANT_TEXTURES = {WORKER: "worker", SOLDIER: "soldier", QUEEN: "queen", R_SOLDIER: "rsoldier", DRONE: "drone"}
+
+# where each kind of ant wears a hat
+HAT_POSITIONS = {WORKER: (24, 9), SOLDIER: (23, 9), QUEEN: (25, 7), R_SOLDIER: (23, 5), DRONE: (23, 7)}
+
 
 class GamePane:
 
@@ -232,11 +240,15 @@ class GamePane:
     ##
     # setToGameState
     #
-    # sets the board elements to reflect a given game state
+    # sets the board elements to reflect a given game state.  Only the tiles
+    # that show something different (or a highlight) are redrawn.
+    #
+    # Return: the BoardButtons that were redrawn
     #
     def setToGameState(self, state: GameState):
         self.p1Food.set(state.inventories[PLAYER_ONE].foodCount)
         self.p2Food.set(state.inventories[PLAYER_TWO].foodCount)
+        changed = []
         for col in range(BOARD_LENGTH):
             for row in range(BOARD_LENGTH):
                 loc: Location = state.board[col][row]
@@ -275,7 +287,12 @@ class GamePane:
                     aType = None
 
                 # sets highlights to false
-                self.boardIcons[row][col].setImage(cType, aType, antTeam, constTeam, moved, health, False, False, carrying, healthConst)
+                button = self.boardIcons[row][col]
+                tile = (cType, aType, antTeam, constTeam, moved, health, carrying, healthConst)
+                if tile != button.tile or button.highlight or button.attackHighlight:
+                    changed.append(button)
+                    button.setImage(cType, aType, antTeam, constTeam, moved, health, False, False, carrying, healthConst)
+        return changed
 
     ##
     # showSetupConstructions
@@ -717,6 +734,19 @@ class BoardButton:
         self.highlight = False
         self.attackHighlight = False
         self.carrying = False
+        self.tile = self.getTile()
+
+        # the tile's canvas items, bottom layer first.  They are made once and
+        # updated in place, see showImage.
+        loc = (2, 2)
+        self.images = {}
+        self.terrainItem = self.createItem(loc)
+        self.constructItem = self.createItem(loc)
+        self.antItem = self.createItem(loc)
+        self.hatItem = self.createItem(loc)
+        self.carryingItem = self.createItem((loc[0] + 48, loc[1] + 48))
+        self.healthItems = []
+        self.healthConstItems = []
 
         # draw initial tile
         self.reDraw()
@@ -776,78 +806,60 @@ class BoardButton:
             changed = True
 
         if changed:
+            self.tile = self.getTile()
             self.reDraw()
 
+    ##
+    # getTile
+    #
+    # Return: what the tile shows of the game state, in the order
+    #   GamePane.setToGameState compares it (construct, ant, antTeam, constTeam,
+    #   moved, health, carrying, healthConst)
+    #
+    def getTile(self):
+        return (self.construct, self.ant, self.antTeam, self.constTeam, self.moved, self.health, self.carrying,
+                self.healthConst)
+
     ##
     # reDraw
     #
-    # re draws this tile based on its internal values
+    # brings this tile's canvas items up to date with its internal values
     #
     def reDraw(self):
-        # general offset
-        loc = (2, 2)
-
-        # clear canvas
-        self.label.delete("all")
-        
-        # important vals/refs
-        NW = tkinter.N + tkinter.W
         my_textures = self.handler.textures
-        
+
         # draw base
         if self.highlight:
-            self.label.create_image(loc, anchor=NW, image=my_textures["terrain_green"])
+            terrain = "terrain_green"
         elif self.attackHighlight:
-            self.label.create_image(loc, anchor=NW, image=my_textures["terrain_red"])
+            terrain = "terrain_red"
         elif self.moved:
-            self.label.create_image(loc, anchor=NW, image=my_textures["terrain_grey"])
+            terrain = "terrain_grey"
         else:
-            self.label.create_image(loc, anchor=NW, image=my_textures["terrain"])
-
-        # team color
-        team = "Blue" if self.constTeam == PLAYER_ONE else "Red"
+            terrain = "terrain"
+        self.showImage(self.terrainItem, my_textures[terrain])
 
         # draw construct
-        if self.construct == GRASS:
-            self.label.create_image(loc, anchor=NW, image=my_textures["grass"])
-        elif self.construct == FOOD:
-            self.label.create_image(loc, anchor=NW, image=my_textures["food"])
-        elif self.construct == ANTHILL:
-            self.label.create_image(loc, anchor=NW, image=my_textures["anthill" + team])
-        elif self.construct == TUNNEL:
-            self.label.create_image(loc, anchor=NW, image=my_textures["tunnel" + team])
-
-        # team color
-        team = "Blue" if self.antTeam == PLAYER_ONE else "Red"
+        team = "Blue" if self.constTeam == PLAYER_ONE else "Red"
+        construct = CONSTRUCT_TEXTURES.get(self.construct)
+        if construct is not None and self.construct in (ANTHILL, TUNNEL):
+            construct += team
+        self.showImage(self.constructItem, my_textures[construct] if construct else None)
 
         # draw ant
-        if self.ant == WORKER:
-            self.label.create_image(loc, anchor=NW, image=my_textures["worker" + team])
-            if my_textures["hat"] is not None:
-                self.label.create_image((24, 9), anchor=NW, image=my_textures["hat"])
-        elif self.ant == SOLDIER:
-            self.label.create_image(loc, anchor=NW, image=my_textures["soldier" + team])
-            if my_textures["hat"] is not None:
-                self.label.create_image((23, 9), anchor=NW, image=my_textures["hat"])
-        elif self.ant == QUEEN:
-            self.label.create_image(loc, anchor=NW, image=my_textures["queen" + team])
-            if my_textures["hat"] is not None:
-                self.label.create_image((25, 7), anchor=NW, image=my_textures["hat"])
-        elif self.ant == R_SOLDIER:
-            self.label.create_image(loc, anchor=NW, image=my_textures["rsoldier" + team])
-            if my_textures["hat"] is not None:
-                self.label.create_image((23, 5), anchor=NW, image=my_textures["hat"])
-        elif self.ant == DRONE:
-            self.label.create_image(loc, anchor=NW, image=my_textures["drone" + team])
-            if my_textures["hat"] is not None:
-                self.label.create_image((23, 7), anchor=NW, image=my_textures["hat"])
+        team = "Blue" if self.antTeam == PLAYER_ONE else "Red"
+        ant = ANT_TEXTURES.get(self.ant)
+        self.showImage(self.antItem, my_textures[ant + team] if ant else None)
+        hat = my_textures["hat"] if ant else None
+        if hat is not None:
+            self.label.coords(self.hatItem, *HAT_POSITIONS[self.ant])
+        self.showImage(self.hatItem, hat)
 
         # carrying mark
-        if self.carrying:
-            self.label.create_image((loc[0] + 48, loc[1] + 48), anchor=NW, image=my_textures["carrying"])
-
+        self.showImage(self.carryingItem, my_textures["carrying"] if self.carrying else None)
 
         # draw health
+        images = []
         if self.health:
             if self.health[0] <= 8 or self.health[1] <= 8:
                 blue = 0
@@ -857,28 +869,53 @@ class BoardButton:
                 blue = self.health[1] - 8
                 green = 8 - blue
                 red = 0
+            images = [my_textures["healthDouble"]] * blue + [my_textures["healthFull"]] * green + \
+                     [my_textures["healthEmpty"]] * red
+        self.showImages(self.healthItems, images, 5)
 
-            count = 0
-            for j in range(blue):
-                self.label.create_image((loc[0] + 3, loc[1] + count * 8), 
-                                         anchor=NW, image=my_textures["healthDouble"])
-                count += 1
-            for j in range(green):
-                self.label.create_image((loc[0] + 3, loc[1] + count * 8), 
-                                         anchor=NW, image=my_textures["healthFull"])
-                count += 1
-            for j in range(red):
-                self.label.create_image((loc[0] + 3, loc[1] + count * 8), 
-                                         anchor=NW, image=my_textures["healthEmpty"])
-                count += 1
-
+        images = []
         if self.healthConst:
             for k in range(self.healthConst[0]):
-                if k < self.healthConst[1]:
-                    self.label.create_image((loc[0] + 55, loc[1] + k * 8), 
-                                             anchor=NW, image=my_textures["healthFull"])
-                else:
-                    self.label.create_image((loc[0] + 55, loc[1] + k * 8), 
-                                             anchor=NW, image=my_textures["healthEmpty"])
+                images.append(my_textures["healthFull" if k < self.healthConst[1] else "healthEmpty"])
+        self.showImages(self.healthConstItems, images, 57)
+
+    ##
+    # createItem
+    #
+    # adds a hidden image item to the tile's canvas
+    #
+    # Return: the item's id
+    #
+    def createItem(self, loc):
+        item = self.label.create_image(loc, anchor = tkinter.N + tkinter.W, state = tkinter.HIDDEN)
+        self.images[item] = None
+        return item
 
+    ##
+    # showImage
+    #
+    # shows an image in one of the tile's items, or hides the item if image is
+    # None.  The canvas is only touched if that changes what the item shows.
+    #
+    def showImage(self, item, image):
+        if self.images[item] is image:
+            return
+        if image is None:
+            self.label.itemconfigure(item, state = tkinter.HIDDEN)
+        else:
+            self.label.itemconfigure(item, image = image, state = tkinter.NORMAL)
+        self.images[item] = image
 
+    ##
+    # showImages
+    #
+    # shows a column of health markers, one per image, in the given items,
+    # creating more items if there are too few and hiding the rest
+    #
+    # x - the column's left edge
+    #
+    def showImages(self, items, images, x):
+        while len(items) < len(images):
+            items.append(self.createItem((x, 2 + len(items) * 8)))
+        for i, item in enumerate(items):
+            self.showImage(item, images[i] if i < len(images) else None)
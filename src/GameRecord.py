@@ -0,0 +1,219 @@
+import os, struct, time
+from Constants import *
+from BoardTables import cellOf, coordsOf
+
+##
+# GameRecord.py
+#
+# A compact binary log of one game (see GameReplayer.py to play one back).
+#
+# GameRules writes every change it makes to the board into the record of the
+# game being played (see GameRules.record): setup placements, then a stream of
+# moves, builds, attacks and turn ends.  Coordinates are stored as board cells
+# (x * BOARD_LENGTH + y, one byte), so a typical move is 3-4 bytes and a whole
+# game a few kilobytes.  The record also keeps the agents' names, the seed the
+# game was played with and who won.
+#
+# File layout (little endian):
+#   magic "ANTR", version (B), flags (B), seed (q), winner (B, 255 for none),
+#   turns (I), 2 x (name length (H), utf-8 name), event length (I), events
+#
+
+MAGIC = b"ANTR"
+VERSION = 1
+RECORD_EXTENSION = ".antr"
+
+#flags
+HAS_SEED = 1
+
+#winner byte when there was none
+NO_WINNER = 255
+
+#event opcodes and what follows them
+EVENT_PLACE = 1     #cell
+EVENT_MOVE = 2      #number of cells, cells of the path
+EVENT_BUILD = 3     #build type, cell
+EVENT_ATTACK = 4    #cell of the ant attacked
+EVENT_END = 5       #nothing
+EVENT_UNDO = 6      #nothing (a human took back their last move or build)
+
+HEADER_FORMAT = "<4sBBqBI"
+
+#files written by this process so far, for unique file names
+recordsSaved = 0
+
+
+##
+#GameRecord
+#Description: Everything needed to replay one game
+#
+#Variables:
+#   playerNames - the authors of the players in seat order (str[])
+#   seed - the seed the game was played with, None if not known (int)
+#   winner - the seat that won, None if nobody did (int)
+#   turns - the number of turns ended (int)
+#   events - the encoded event stream (bytearray)
+##
+class GameRecord(object):
+
+    ##
+    #__init__
+    #Description: Creates a new, empty GameRecord
+    #
+    #Parameters:
+    #   playerNames - the authors of the players in seat order (str[])
+    #   seed - the seed the game is played with (int or None)
+    ##
+    def __init__(self, playerNames, seed = None):
+        self.playerNames = list(playerNames)
+        self.seed = seed
+        self.winner = None
+        self.turns = 0
+        self.events = bytearray()
+
+    def addPlacement(self, coord):
+        self.events += bytes((EVENT_PLACE, cellOf(coord)))
+
+    def addMove(self, coordList):
+        self.events += bytes([EVENT_MOVE, len(coordList)] + [cellOf(coord) for coord in coordList])
+
+    def addBuild(self, coord, buildType):
+        self.events += bytes((EVENT_BUILD, buildType, cellOf(coord)))
+
+    def addAttack(self, coord):
+        self.events += bytes((EVENT_ATTACK, cellOf(coord)))
+
+    def addEnd(self):
+        self.events.append(EVENT_END)
+        self.turns += 1
+
+    def addUndo(self):
+        self.events.append(EVENT_UNDO)
+
+    ##
+    #setResult
+    #Description: Records who won
+    #
+    #Parameters:
+    #   winner - the seat that won or None
+    ##
+    def setResult(self, winner):
+        self.winner = winner
+
+    ##
+    #listEvents
+    #Description: Decodes the event stream
+    #
+    #Return: a list of tuples (opcode, arguments...) with coords as (x, y):
+    #   (EVENT_PLACE, coord), (EVENT_MOVE, coordList), (EVENT_BUILD, coord, buildType),
+    #   (EVENT_ATTACK, coord), (EVENT_END,), (EVENT_UNDO,)
+    ##
+    def listEvents(self):
+        events = self.events
+        result = []
+        i = 0
+        while i < len(events):
+            opcode = events[i]
+            if opcode == EVENT_PLACE or opcode == EVENT_ATTACK:
+                result.append((opcode, coordsOf(events[i + 1])))
+                i += 2
+            elif opcode == EVENT_MOVE:
+                length = events[i + 1]
+                result.append((opcode, [coordsOf(cell) for cell in events[i + 2:i + 2 + length]]))
+                i += 2 + length
+            elif opcode == EVENT_BUILD:
+                result.append((opcode, coordsOf(events[i + 2]), events[i + 1]))
+                i += 3
+            elif opcode == EVENT_END or opcode == EVENT_UNDO:
+                result.append((opcode,))
+                i += 1
+            else:
+                raise ValueError("bad event %d at offset %d of game record" % (opcode, i))
+        return result
+
+    ##
+    #toBytes
+    #
+    #Return: the record in the binary file format (bytes)
+    ##
+    def toBytes(self):
+        flags = HAS_SEED if self.seed is not None else 0
+        winner = NO_WINNER if self.winner is None else self.winner
+        data = bytearray(struct.pack(HEADER_FORMAT, MAGIC, VERSION, flags, self.seed or 0, winner, self.turns))
+        for name in self.playerNames:
+            encoded = name.encode("utf-8")
+            data += struct.pack("<H", len(encoded)) + encoded
+        data += struct.pack("<I", len(self.events)) + self.events
+        return bytes(data)
+
+    ##
+    #fromBytes
+    #
+    #Parameters:
+    #   data - a record in the binary file format (bytes)
+    #
+    #Return: the GameRecord
+    ##
+    @staticmethod
+    def fromBytes(data):
+        magic, version, flags, seed, winner, turns = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC or version > VERSION:
+            raise ValueError("not a game record this version can read")
+        offset = struct.calcsize(HEADER_FORMAT)
+        names = []
+        for i in range(2):
+            length, = struct.unpack_from("<H", data, offset)
+            offset += 2
+            names.append(bytes(data[offset:offset + length]).decode("utf-8"))
+            offset += length
+        length, = struct.unpack_from("<I", data, offset)
+        offset += 4
+
+        record = GameRecord(names, seed if flags & HAS_SEED else None)
+        record.winner = None if winner == NO_WINNER else winner
+        record.turns = turns
+        record.events = bytearray(data[offset:offset + length])
+        return record
+
+    ##
+    #save
+    #Description: Writes the record to a file
+    ##
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.toBytes())
+
+    ##
+    #load
+    #
+    #Return: the GameRecord stored in a file
+    ##
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return GameRecord.fromBytes(f.read())
+
+    def __str__(self):
+        return "<GameRecord: %s vs %s, %d turns, winner %s, %d bytes of events>" % \
+            (self.playerNames[0], self.playerNames[1], self.turns, self.winner, len(self.events))
+
+
+##
+# saveRecord
+#
+# Description: Writes a record into a folder under a name no other game
+#   (from this or any other process) will use
+#
+# Parameters:
+#   record - the GameRecord to save
+#   recordDir - the folder to put it in (created if needed)
+#
+# Return: the path written
+def saveRecord(record, recordDir):
+    global recordsSaved
+    os.makedirs(recordDir, exist_ok=True)
+    recordsSaved += 1
+    name = "%s-%d-%d%s" % (time.strftime("%Y%m%d-%H%M%S"), os.getpid(), recordsSaved, RECORD_EXTENSION)
+    path = os.path.join(recordDir, name)
+    record.save(path)
+    return path
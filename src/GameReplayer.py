@@ -0,0 +1,155 @@
+from Constants import *
+from GameState import GameState
+from Move import Move
+from MatchEngine import GameRules
+from GameRecord import *
+from StateCodec import CompactGameState
+
+##
+# GameReplayer.py
+#
+# Plays back a GameRecord.  Only rule-checked changes are recorded, so the
+# position at any turn can be rebuilt by applying them directly, without the
+# agents and without checking anything again:
+#
+#       record = GameRecord.load("games/20240101-120000-1234-1.antr")
+#       state = GameReplayer(record).seekTurn(40)
+#
+
+
+##
+#GameReplayer
+#Description: Rebuilds the positions of a recorded game by applying its
+#   events with the same GameRules methods that made them.  Nothing is
+#   validated and no agents are involved.
+#
+#Variables:
+#   record - the GameRecord being replayed
+#   state - the position reached so far (GameState)
+#   turns - the number of turns ended so far
+#   position - index of the next event to apply
+#   turnStarts - index of the first event of each turn
+#   hasUndo - whether the record has any undos (states are only saved for them if so)
+##
+class GameReplayer(GameRules):
+
+    ##
+    #__init__
+    #Description: Creates a GameReplayer positioned at the empty board
+    #
+    #Parameters:
+    #   record - the GameRecord to replay
+    ##
+    def __init__(self, record):
+        self.record = None  #don't record the replay
+        self.gameRecord = record
+        self.events = record.listEvents()
+        self.currentPlayers = None
+        self.hasUndo = any(event[0] == EVENT_UNDO for event in self.events)
+
+        #index of the first event of each turn
+        self.turnStarts = [len([event for event in self.events if event[0] == EVENT_PLACE])]
+        for i in range(len(self.events)):
+            if self.events[i][0] == EVENT_END:
+                self.turnStarts.append(i + 1)
+        self.reset()
+
+    ##
+    #reset
+    #Description: Goes back to the empty board
+    ##
+    def reset(self):
+        self.state = GameState.getBlankState()
+        self.state.phase = SETUP_PHASE_1
+        self.constrsToPlace = self.getSetupConstructions()
+        self.turns = 0
+        self.position = 0
+        self.lastMovedAnt = None
+        self.undoStates = []
+
+    ##
+    #step
+    #Description: Applies the next event
+    #
+    #Return: the event applied (see GameRecord.listEvents) or None at the end
+    ##
+    def step(self):
+        if self.position >= len(self.events):
+            return None
+        event = self.events[self.position]
+        self.position += 1
+        opcode = event[0]
+
+        if opcode == EVENT_PLACE:
+            #placeConstructions wants the coord as the placing player sees it
+            self.placeConstructions(self.constrsToPlace, [self.state.coordLookup(event[1], self.state.whoseTurn)])
+            if not self.constrsToPlace:
+                self.constrsToPlace = self.advanceSetup()
+        elif opcode == EVENT_MOVE:
+            self.saveUndoState()
+            self.lastMovedAnt = self.moveAnt(Move(MOVE_ANT, event[1], None))
+        elif opcode == EVENT_BUILD:
+            self.saveUndoState()
+            self.buildFromMove(Move(BUILD, [event[1]], event[2]))
+        elif opcode == EVENT_ATTACK:
+            self.applyAttack(self.lastMovedAnt, event[1])
+        elif opcode == EVENT_END:
+            self.undoStates = []
+            self.endTurn()
+            self.turns += 1
+        elif opcode == EVENT_UNDO:
+            self.state = self.undoStates.pop().toGameState()
+        return event
+
+    ##
+    #saveUndoState
+    #Description: Keeps an encoded copy of the state before each move, as Game
+    #   does for human players, if the record has any undos to replay
+    ##
+    def saveUndoState(self):
+        if self.hasUndo:
+            self.undoStates.append(CompactGameState.fromGameState(self.state))
+
+    ##
+    #seekTurn
+    #Description: Moves to the start of a turn.  Going backwards replays from
+    #   the beginning.
+    #
+    #Parameters:
+    #   turn - the number of turns that have ended, 0 for the end of setup (int)
+    #
+    #Return: the state at that point (GameState, owned by the replayer; clone it
+    #   to keep it)
+    ##
+    def seekTurn(self, turn):
+        if turn < 0 or turn >= len(self.turnStarts):
+            raise IndexError("the record has no turn %d" % turn)
+        target = self.turnStarts[turn]
+        if self.position > target:
+            self.reset()
+        while self.position < target:
+            self.step()
+        return self.state
+
+    ##
+    #replay
+    #Description: Plays the rest of the record
+    #
+    #Return: the final state (GameState)
+    ##
+    def replay(self):
+        while self.step() is not None:
+            pass
+        return self.state
+
+    ##
+    #getWinner
+    #
+    #Return: the seat the rules say has won the replayed position, None if nobody
+    ##
+    def getWinner(self):
+        if self.hasWon(PLAYER_ONE):
+            return PLAYER_ONE
+        if self.hasWon(PLAYER_TWO):
+            return PLAYER_TWO
+        return None
@@ -27,6 +27,8 @@ def subtractCoords(tuple1, tuple2):
 #   inventories - A tuple containing the Inventory for each player.
 #   phase - The current phase of the game.
 #    whoseTurn - The ID of the Player who's turn it currently is.
+#   index - The OccupancyIndex used by getAntAt/getConstrAt (built on demand)
+#   hashKey - The cached Zobrist hash (see Transposition.py), None until needed
 ##
 class GameState(object):
 
@@ -46,6 +48,49 @@ class GameState(object):
         self.inventories = inputInventories
         self.phase = inputPhase
         self.whoseTurn = inputTurn
+        self.index = None
+        self.hashKey = None
+
+    ##
+    #getOccupancyIndex
+    #Description: Returns the OccupancyIndex for this state, (re)building it if
+    #   it has never been built or the inventories changed since it was.
+    #
+    #Return: an up to date OccupancyIndex
+    ##
+    def getOccupancyIndex(self):
+        index = self.index
+        if index is None or not index.isCurrent(self):
+            index = OccupancyIndex(self)
+            self.index = index
+        return index
+
+    ##
+    #invalidateIndex
+    #Description: Throws away the OccupancyIndex.  Only needed after changing the
+    #   state in ways the index can't notice (e.g. swapping an ant in an
+    #   inventory for a different one without changing the list's length).
+    ##
+    def invalidateIndex(self):
+        if self.index is not None:
+            self.index.valid = False
+            self.index = None
+
+    ##
+    #setAntCoords
+    #Description: Moves an ant of this state, keeping the OccupancyIndex up to
+    #   date.  Setting ant.coords directly works too, but the index is then
+    #   rebuilt by the next lookup.
+    #
+    #Parameters:
+    #   ant - an Ant in one of this state's inventories
+    #   coords - where it moves to
+    ##
+    def setAntCoords(self, ant, coords):
+        oldCoords = ant.coords
+        ant.coords = coords
+        if self.index is not None:
+            self.index.moved(self.index.ants, ant, oldCoords, coords)
 
     ##
     #coordLookup
@@ -69,6 +114,8 @@ class GameState(object):
     #
     ##
     def flipBoard(self):
+        self.invalidateIndex()
+        self.hashKey = None
         for col in self.board:
             col.reverse()
             
@@ -86,6 +133,8 @@ class GameState(object):
     #
     ##
     def clearConstrs(self):
+        self.invalidateIndex()
+        self.hashKey = None
         for col in self.board:
             for loc in col:
                 loc.constr = None
@@ -229,3 +278,203 @@ class GameState(object):
                            Inventory(NEUTRAL, [], cons3, 0) ]
         
         return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+
+
+    ##
+    #buildBoard
+    #Description: Gives a state from fastclone a board again, built from the
+    #   inventories
+    ##
+    def buildBoard(self):
+        board = GameState.getBlankState().board
+        for inv in self.inventories:
+            for constr in inv.constrs:
+                board[constr.coords[0]][constr.coords[1]].constr = constr
+            for ant in inv.ants:
+                board[ant.coords[0]][ant.coords[1]].ant = ant
+        self.board = board
+
+
+##
+#OccupancyIndex
+#
+#Description: Maps coordinates to the ant and the construction on them so
+#   AIPlayerUtils.getAntAt and getConstrAt don't have to scan every inventory.
+#   It is built from the inventories, so it also works for states made by
+#   fastclone (which have no board).
+#
+#   Ants are moved with GameState.setAntCoords, which updates the index
+#   (getNextState, applyMove, undoMove and the engine all do).  The index
+#   remembers every ant and where it was, so ants added, removed or moved
+#   some other way (e.g. an agent setting ant.coords) are noticed by the next
+#   lookup, which rebuilds it.  Constructions added or removed are noticed by
+#   comparing the inventory lists to the stamp taken when the index was built.
+#
+#Variables:
+#   ants - dict of coords -> Ant
+#   constrs - dict of coords -> Construction (including grass and food)
+#   antLists - a copy of each inventory's ant list when last in sync
+#   antCoords - the coords of those ants
+#   stamp - the identity and length of the construction lists when last in sync
+#   valid - False once the index can no longer be trusted
+#   exact - False if two objects shared a coordinate when the index was built
+#   terrainCosts - cached result of getTerrainCosts (None until asked for)
+##
+class OccupancyIndex(object):
+
+    ##
+    #__init__
+    #Description: Builds the index for a state.  When two objects share a
+    #   coordinate the first one in inventory order wins, as it did for the
+    #   linear search.
+    #
+    #Parameters:
+    #   state - the GameState to index
+    ##
+    def __init__(self, state):
+        self.ants = {}
+        self.constrs = {}
+        self.valid = True
+        self.exact = True
+        self.terrainCosts = None
+        for inv in state.inventories:
+            for ant in inv.ants:
+                self.insert(self.ants, ant)
+            for constr in inv.constrs:
+                self.insert(self.constrs, constr)
+        self.antLists = [list(inv.ants) for inv in state.inventories]
+        self.antCoords = [[ant.coords for ant in inv.ants] for inv in state.inventories]
+        self.stamp = OccupancyIndex.getStamp(state)
+
+    ##
+    #getStamp
+    #Description: Cheap fingerprint of which construction lists the
+    #   inventories hold and how long they are
+    ##
+    @staticmethod
+    def getStamp(state):
+        p1, p2, neutral = state.inventories
+        return (id(p1.constrs), len(p1.constrs), id(p2.constrs), len(p2.constrs),
+                id(neutral.constrs), len(neutral.constrs))
+
+    ##
+    #isCurrent
+    #Description: Checks the index still matches the state: the same ants
+    #   where they were, and the same construction lists
+    ##
+    def isCurrent(self, state):
+        if not self.valid:
+            return False
+        p1, p2, neutral = state.inventories
+        ants1, ants2, ants3 = self.antLists
+        coords1, coords2, coords3 = self.antCoords
+        return ants1 == p1.ants and ants2 == p2.ants and ants3 == neutral.ants and \
+            coords1 == [ant.coords for ant in ants1] and coords2 == [ant.coords for ant in ants2] and \
+            (not ants3 or coords3 == [ant.coords for ant in ants3]) and \
+            self.stamp == OccupancyIndex.getStamp(state)
+
+    ##
+    #findAnt
+    #
+    #Return: (the index of the ant's inventory, its position in antLists), or
+    #   None if the index doesn't know the ant
+    ##
+    def findAnt(self, ant):
+        for i in (ant.player, 0, 1, 2):
+            if 0 <= i < len(self.antLists) and ant in self.antLists[i]:
+                return i, self.antLists[i].index(ant)
+        return None
+
+    ##
+    #insert
+    #Description: Adds an object to one of the tables
+    ##
+    def insert(self, table, item):
+        try:
+            if item.coords in table:
+                self.exact = False
+            else:
+                table[item.coords] = item
+        except TypeError:
+            pass  # unhashable coords (e.g. a list) never matched a tuple lookup anyway
+
+    ##
+    #moved
+    #Description: Moves an object to new coords in one of the tables (see
+    #   GameState.setAntCoords)
+    #
+    #Parameters:
+    #   table - self.ants or self.constrs
+    #   item - the object that moved
+    #   oldCoords - where it was
+    #   newCoords - where it is going
+    ##
+    def moved(self, table, item, oldCoords, newCoords):
+        if not self.valid or oldCoords == newCoords:
+            return
+        try:
+            if not self.exact or table.get(oldCoords) is not item or newCoords in table:
+                # let the next lookup rebuild rather than guess the scan order
+                self.valid = False
+                return
+            del table[oldCoords]
+            table[newCoords] = item
+            if table is self.constrs:
+                self.terrainCosts = None
+        except TypeError:
+            self.valid = False
+            return
+        if table is self.ants:
+            found = self.findAnt(item)
+            if found is None or self.antCoords[found[0]][found[1]] != oldCoords:
+                self.valid = False
+                return
+            self.antCoords[found[0]][found[1]] = newCoords
+
+    ##
+    #getTerrainCosts
+    #Description: Returns the cost of moving onto each cell that doesn't cost
+    #   the default of 1.  Cached until a construction moves.
+    #
+    #Return: dict of coords -> movement cost
+    ##
+    def getTerrainCosts(self):
+        if self.terrainCosts is None:
+            self.terrainCosts = {}
+            for coords, constr in self.constrs.items():
+                if constr.movementCost != 1:
+                    self.terrainCosts[coords] = constr.movementCost
+        return self.terrainCosts
+
+    ##
+    #addAnt
+    #Description: Adds an ant that was just put in one of state's inventories
+    ##
+    def addAnt(self, state, ant):
+        if self.valid:
+            self.insert(self.ants, ant)
+            for i in range(len(state.inventories)):
+                ants = state.inventories[i].ants
+                if ant in ants:
+                    position = ants.index(ant)
+                    self.antLists[i].insert(position, ant)
+                    self.antCoords[i].insert(position, ant.coords)
+                    return
+            self.valid = False
+
+    ##
+    #removeAnt
+    #Description: Drops an ant that was just removed from state's inventory
+    ##
+    def removeAnt(self, state, ant):
+        if self.valid:
+            try:
+                found = self.findAnt(ant)
+                if self.exact and self.ants.get(ant.coords) is ant and found is not None:
+                    del self.ants[ant.coords]
+                    del self.antLists[found[0]][found[1]]
+                    del self.antCoords[found[0]][found[1]]
+                    return
+            except TypeError:
+                pass
+            self.valid = False
@@ -0,0 +1,184 @@
+import time, json, csv
+
+##
+# Latency.py
+#
+# Timing of every call the game makes into an agent (getPlacement, getMove,
+# getAttack) and of the game's own work between them (cloning and flipping
+# the state for the player, checking moves, drawing).  Samples are kept per
+# agent and per kind of call and summarized as percentiles:
+#
+#       result = self.latency.call(player.author, "getMove", player.getMove, theState)
+#       ...
+#       self.latency.exportFile("latency.csv")
+#
+# The game's own work is filed under the name ENGINE.  When players are held to
+# CPU time limits the CPU time of each call is also kept, under the call's
+# category with CPU_SUFFIX added.
+#
+
+#name the game's own overhead is recorded under
+ENGINE = "(engine)"
+
+#added to a category for the CPU time (rather than wall-clock time) of the calls
+CPU_SUFFIX = " cpu"
+
+#percentiles shown in summaries
+PERCENTILES = (50, 90, 99)
+
+#columns of a summary row, in export order
+SUMMARY_FIELDS = ("name", "category", "count", "total", "mean", "p50", "p90", "p99", "max")
+
+
+##
+# percentile
+#
+# Parameters:
+#   sortedSamples - the samples in increasing order (non-empty list)
+#   p - the percentile wanted (0 to 100)
+#
+# Return: the value below which p percent of the samples fall, interpolating
+#   between the two nearest samples
+def percentile(sortedSamples, p):
+    position = (len(sortedSamples) - 1) * p / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sortedSamples) - 1)
+    fraction = position - lower
+    return sortedSamples[lower] + (sortedSamples[upper] - sortedSamples[lower]) * fraction
+
+
+##
+#LatencyStats
+#Description: Collects timings and summarizes them
+#
+#Variables:
+#   samples - dict of (name, category) -> list of durations in seconds
+##
+class LatencyStats(object):
+
+    def __init__(self):
+        self.samples = {}
+
+    ##
+    #add
+    #Description: Records one duration
+    #
+    #Parameters:
+    #   name - the agent's author, or ENGINE
+    #   category - what was timed, e.g. "getMove" or "clone"
+    #   seconds - how long it took (float)
+    ##
+    def add(self, name, category, seconds):
+        #setdefault so a timed out agent's thread can still add safely
+        self.samples.setdefault((name, category), []).append(seconds)
+
+    ##
+    #call
+    #Description: Calls a function and records how long it took, even if it
+    #   raises
+    #
+    #Parameters:
+    #   name - the agent's author, or ENGINE
+    #   category - what is being timed
+    #   function - the function to call
+    #   args - its arguments
+    #
+    #Return: whatever the function returned
+    ##
+    def call(self, name, category, function, *args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.add(name, category, time.perf_counter() - start)
+
+    ##
+    #callWithCpu
+    #Description: Like call, but also records the CPU time the calling thread
+    #   used under category + CPU_SUFFIX
+    ##
+    def callWithCpu(self, name, category, function, *args):
+        start = time.perf_counter()
+        startCpu = time.thread_time()
+        try:
+            return function(*args)
+        finally:
+            self.add(name, category + CPU_SUFFIX, time.thread_time() - startCpu)
+            self.add(name, category, time.perf_counter() - start)
+
+    ##
+    #merge
+    #Description: Adds all the samples of another LatencyStats to this one
+    ##
+    def merge(self, other):
+        for key, durations in other.samples.items():
+            if key not in self.samples:
+                self.samples[key] = []
+            self.samples[key].extend(durations)
+
+    def clear(self):
+        self.samples = {}
+
+    ##
+    #summary
+    #
+    #Return: a list of dicts with the SUMMARY_FIELDS (times in seconds), one per
+    #   (name, category), agents first and the engine last
+    ##
+    def summary(self):
+        rows = []
+        for (name, category) in sorted(list(self.samples), key=lambda key: (key[0] == ENGINE, key)):
+            durations = sorted(self.samples[(name, category)])
+            row = {"name": name, "category": category, "count": len(durations),
+                   "total": sum(durations), "mean": sum(durations) / len(durations),
+                   "max": durations[-1]}
+            for p in PERCENTILES:
+                row["p%d" % p] = percentile(durations, p)
+            rows.append(row)
+        return rows
+
+    ##
+    #formatTable
+    #
+    #Parameters:
+    #   nameWidth - characters to cut names down to
+    #
+    #Return: the summary as fixed width text, times in milliseconds
+    ##
+    def formatTable(self, nameWidth = 16):
+        lines = ["%-*s %-16s %6s %8s %8s %8s" % (nameWidth, "Agent", "Call", "Count", "p50 ms", "p99 ms", "max ms")]
+        for row in self.summary():
+            lines.append("%-*s %-16s %6d %8.2f %8.2f %8.2f" % (nameWidth, row["name"][:nameWidth], row["category"],
+                                                            row["count"], row["p50"] * 1000, row["p99"] * 1000,
+                                                            row["max"] * 1000))
+        return "\n".join(lines)
+
+    ##
+    #exportCSV
+    #Description: Writes the summary as CSV, one row per (name, category)
+    ##
+    def exportCSV(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            for row in self.summary():
+                writer.writerow(row)
+
+    ##
+    #exportJSON
+    #Description: Writes the summary as a JSON list of objects
+    ##
+    def exportJSON(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    ##
+    #exportFile
+    #Description: Writes the summary as JSON if the path ends in .json, as CSV
+    #   otherwise
+    ##
+    def exportFile(self, path):
+        if path.lower().endswith(".json"):
+            self.exportJSON(path)
+        else:
+            self.exportCSV(path)
@@ -0,0 +1,1146 @@
+import traceback, hashlib, random, time, threading
+from threading import Thread
+from Constants import *
+from Construction import *
+from Building import *
+from Ant import *
+from Move import *
+from GameState import *
+from GameRecord import GameRecord, saveRecord
+from Latency import LatencyStats, ENGINE, CPU_SUFFIX
+from BoardTables import LEGAL_COORDS, QUEEN_FORBIDDEN_ROWS, HOME_TERRITORY, ENEMY_TERRITORY
+
+
+##
+# GameRules
+# Description: The rules of Antics, separated from the play loop so they can be
+#   shared by the GUI driven Game and the headless MatchEngine.  Nothing in
+#   here touches the UI.
+#
+#   Subclasses must provide:
+#       state - the authoritative GameState (GameState)
+#       currentPlayers - the Players in seat order (Player[])
+#       latency - where player calls are timed (LatencyStats)
+#
+#   Every change the rules make to the state is also written to record, the
+#   GameRecord of the game being played, if there is one.
+##
+class GameRules(object):
+
+    # the GameRecord of the game being played (None for no record)
+    record = None
+
+    # True if the players' time limits count their CPU time, not wall-clock time
+    cpuTime = False
+
+    ##
+    # timePlayerCall
+    # Description: Calls getPlacement, getMove or getAttack of an AI player,
+    #   starting its move clock (see Player.remainingTime) and recording how
+    #   long it took.  With cpuTime the CPU time it used is recorded too.
+    #
+    # Parameters:
+    #   player - the Player (or AgentProcess)
+    #   name - the name of the method to call
+    #   args - the arguments to pass it
+    #
+    # Returns: whatever the player returned
+    ##
+    def timePlayerCall(self, player, name, *args):
+        method = getattr(player, name)
+        player.startMoveClock()
+        if not self.cpuTime:
+            return self.latency.call(player.author, name, method, *args)
+        if getattr(player, "enforcesTimeLimit", False):
+            # the player runs elsewhere and reports its own CPU time
+            answer = self.latency.call(player.author, name, method, *args)
+            if player.lastCpuTime is not None:
+                self.latency.add(player.author, name + CPU_SUFFIX, player.lastCpuTime)
+            return answer
+        return self.latency.callWithCpu(player.author, name, method, *args)
+
+    ##
+    # errorReport
+    #
+    # Description:  Notifies the user of an invalid move.  For AI
+    # players, this takes the form of a message on the console.
+    #
+    # Parameters:
+    #   msg - the message to send
+    #
+    def errorReport(self, msg):
+        print(msg)
+
+    ##
+    # isValidMove(Move)
+    # Description: Checks to see if the move is valid for the current player.
+    #
+    # Parameters:
+    #   move - The Move to check (Move)
+    #
+    # Returns: None if no move is given, true if the given move is valid, or false if the given move is invalid
+    ##
+    def isValidMove(self, move):
+        # check for no move
+        if move == None:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            return None
+
+        # check that the move is well-formed typewise (tuples, ints, etc)
+        if type(move) != Move:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("ERROR:  player did not supply an object of type 'Move'")
+            return False
+        if type(move.moveType) != int:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("       Move type must be an integer.")
+            return False
+        # for END or UNDO type moves, lots we don't need to check
+        if move.moveType == END or move.moveType == UNDO:
+            return True
+        if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("       The coordinate list is empty!")
+            return False
+        index = 0
+        for coord in move.coordList:
+            if (type(coord) != tuple):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " is not a tuple.")
+                return False
+            if (len(coord) != 2):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport(
+                    "       Coordinate at index " + str(index) + " has " + str(len(coord)) + "entries instead of 2.")
+                return False
+            if (type(coord[0]) != int) or (type(coord[1]) != int):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " contains a value that is not an int.")
+                return False
+            index += 1
+        if type(move.buildType) != type(None) and type(move.buildType) != int:
+            return False
+
+        # for MOVE_ANT and BUILD type moves
+        if move.moveType == MOVE_ANT:
+            firstCoord = move.coordList[0]
+            # check valid start location (good coords and ant ownership)
+            if self.checkMoveStart(firstCoord):
+                # get ant to move
+                antToMove = self.state.board[firstCoord[0]][firstCoord[1]].ant
+                movePoints = UNIT_STATS[antToMove.type][MOVEMENT]
+                previousCoord = None
+
+                index = 0
+                for coord in move.coordList:
+                    # if first runthough, need to set up previous coord
+                    if previousCoord == None:
+                        previousCoord = coord
+                        continue
+                    # if any to-coords are invalid, return invalid move
+                    if not self.checkMovePath(previousCoord, coord):
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Illegal movement path at index" + str(index))
+                        return False
+
+                    # subtract cost of loc from movement points
+                    constrAtLoc = self.state.board[coord[0]][coord[1]].constr
+                    if constrAtLoc == None or UNIT_STATS[antToMove.type][IGNORES_GRASS]:
+                        movePoints -= 1
+                    else:
+                        movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
+
+                    previousCoord = coord
+                    index += 1
+
+                # Check for Queen ant trying to leave her territory
+                if (antToMove.type == QUEEN):
+                    for coord in move.coordList:
+                        if coord[1] in QUEEN_FORBIDDEN_ROWS:
+                            self.errorReport("ERROR: Invalid Move: " + str(move))
+                            self.errorReport("       Queen ant may not leave her own territory")
+                            return False
+
+                # within movement range and hasn't moved yet?
+                if (movePoints < 0):
+                    self.errorReport("ERROR: Invalid Move: " + str(move))
+                    self.errorReport("       Ant has insufficient movement points for this move")
+                    return False
+                if antToMove.hasMoved:
+                    self.errorReport("ERROR: Invalid Move: " + str(move))
+                    self.errorReport("       Ant has already made a move this turn")
+                    return False
+                else:
+                    return True
+
+        elif move.moveType == BUILD:
+            # coord list must contain one point for build
+            if len(move.coordList) != 1:
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       for a BUILD move, the coordinate list should contain exactly 1 coordinate")
+                return False
+
+            buildCoord = move.coordList[0]
+            # check valid start location
+            if self.checkBuildStart(buildCoord):
+                # we're building either an ant or constr for sure ->
+                # -> no longer able to build tunnels, so can only build ants.
+
+                if self.state.board[buildCoord[0]][buildCoord[1]].ant == None:
+                    # we know we're building an ant
+                    buildCost = None
+                    # check buildType for valid ant
+                    if move.buildType == WORKER:
+                        buildCost = UNIT_STATS[WORKER][COST]
+                    elif move.buildType == DRONE:
+                        buildCost = UNIT_STATS[DRONE][COST]
+                    elif move.buildType == SOLDIER:
+                        buildCost = UNIT_STATS[SOLDIER][COST]
+                    elif move.buildType == R_SOLDIER:
+                        buildCost = UNIT_STATS[R_SOLDIER][COST]
+                    else:
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
+                        return False
+
+                    # check the player has enough food
+                    currFood = self.state.inventories[self.state.whoseTurn].foodCount
+                    if currFood >= buildCost:
+                        # self.ui.notify("")
+                        return True
+                    else:
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Player has " + str(currFood) + " food but needs " + str(
+                            buildCost) + " to build this ant")
+                        return False
+
+
+                # Below is the code that allows a player to build more tunnels during the course of a game,
+                # in case it is ever desired to be a part of the game again.
+
+                # else:
+                #     # we know we're building a construction
+                #     adjacentCoords = []
+                #     adjacentCoords.append(addCoords(buildCoord, (0, -1)))
+                #     adjacentCoords.append(addCoords(buildCoord, (0, 1)))
+                #     adjacentCoords.append(addCoords(buildCoord, (-1, 0)))
+                #     adjacentCoords.append(addCoords(buildCoord, (1, 0)))
+                #
+                #     # check that there's no food in adjacent locations
+                #     for aCoord in adjacentCoords:
+                #         if aCoord[0] >= 0 and aCoord[0] < 10 and aCoord[1] >= 0 and aCoord[1] < 10:
+                #             if (self.state.board[aCoord[0]][aCoord[1]].constr != None and
+                #                         self.state.board[aCoord[0]][aCoord[1]].constr.type == FOOD):
+                #                 self.errorReport("ERROR: Invalid Move: " + str(move))
+                #                 self.errorReport("       Cannot tunnel build next to food.")
+                #                 return False
+                #
+                #     buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
+                #     if self.state.inventories[self.state.whoseTurn].foodCount >= buildCost:
+                #         # self.ui.notify("")
+                #         return True
+                #     else:
+                #         self.errorReport("ERROR: Invalid Move: " + str(move))
+                #         self.errorReport("       Must have at least " + str(buildCost) + " food to build a tunnel.")
+                #         return False
+
+
+            else:  # invalid build start
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Build location invalid.  Possible cause:")
+                loc = self.state.board[buildCoord[0]][buildCoord[1]]
+                if loc.ant == None:  # building ant
+                    self.errorReport("         - Anthill does not belong to current player")
+                else:
+                    if (move.buildType != TUNNEL):
+                        self.errorReport("         - Anthill is already occupied")
+                    elif (loc.ant.hasMoved):
+                        self.errorReport("         - Worker ant has already moved this turn")
+                    else:
+                        self.errorReport("         - Worker ant does not belong to current player")
+        else:
+            # invalid numeric move type
+            return False
+
+    ##
+    # isValidPlacement
+    # Description: Checks that the given placement of Constructions is valid
+    #
+    # Paramters:
+    #   items - The items to place (Construction[])
+    #   targets - A list of the coordinates to place the items at ((int,int)[])
+    #
+    # Returns None if no target is given, true if it is a valid placement, or false if it is an invalid placement
+    ##
+    def isValidPlacement(self, items, targets):
+        # check for well-formed input of targets (from players)
+        if type(targets) == type(None) or type(targets) != list:
+            return False
+            # If no target, return None (human vs ai caught by caller)
+        if len(targets) == 0:
+            return None
+        for coord in targets:
+            if not self.isValidCoord(coord):
+                return False
+
+        for i in range(0, len(targets)):
+            # Nobody can place in the center two rows of the board or on their opponents side
+
+            # check item type
+            if items[i].type == ANTHILL or items[i].type == TUNNEL or items[i].type == GRASS:
+                # check targets[i] is within proper boundaries y-wise
+                # must be on own side
+                if not self.isInHomeTerritory(targets[i]):
+                    return False
+            # check item type
+            elif items[i].type == FOOD:
+                # check targets[i] is within proper boundaries y-wise
+                # must be on opponent's side
+                if not self.isInEnemyTerritory(targets[i]):
+                    return False
+            else:
+                # I don't know what this type is.
+                return False
+
+            # change target to access appropriate players locations
+            aTarget = self.state.coordLookup(targets[i], self.state.whoseTurn)
+            # make sure nothing is there yet
+            if self.state.board[aTarget[0]][aTarget[1]].constr:
+                return False
+            # This item should be placed and this location becomes occupied
+            self.state.board[aTarget[0]][aTarget[1]].constr = items[i]
+
+        return True
+
+    ##
+    # isValidAttack
+    # Description: Determines whether the attack with the given parameters is valid
+    #   Attacking ant is assured to exist and belong to the player whose turn it is
+    #
+    # Parameters:
+    #   attackingAnt - The Ant that is attacking (Ant)
+    #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
+    #
+    # Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
+    ##
+    def isValidAttack(self, attackingAnt, attackCoord):
+        if attackCoord == None:
+            return None
+
+        # check for well-formed input from players
+        if not self.isValidCoord(attackCoord):
+            return False
+
+        attackLoc = self.state.board[attackCoord[0]][attackCoord[1]]
+
+        if attackLoc.ant == None or attackLoc.ant.player == attackingAnt.player:
+            return False
+
+        # we know we have an enemy ant
+        range = UNIT_STATS[attackingAnt.type][RANGE]
+        diffX = abs(attackingAnt.coords[0] - attackCoord[0])
+        diffY = abs(attackingAnt.coords[1] - attackCoord[1])
+
+        # pythagoras would be proud
+        if range >= diffX + diffY:
+            # return True if within range
+            return True
+        else:
+            return False
+
+    ##
+    # isValidCoord
+    # Description: Retruns whether this coord represents a valid board location.
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if the coordinate is between (0,0) and (9,9)
+    ##
+    def isValidCoord(self, coord):
+        # check for well-formed coord
+        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
+            return False
+
+        # check boundaries
+        return coord in LEGAL_COORDS
+
+    ##
+    # isInHomeTerritory
+    #
+    # Description: determines whether the position is in the player's
+    # home territory
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if it is and False otherwise
+    #
+    ##
+    def isInHomeTerritory(self, coord):
+        return self.isValidCoord(coord) and coord in HOME_TERRITORY
+
+    ##
+    # isInEnemyTerritory
+    #
+    # Description: determines whether the position is in the player's
+    # enemy's territory
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if it is and False otherwise
+    #
+    ##
+    def isInEnemyTerritory(self, coord):
+        return self.isValidCoord(coord) and coord in ENEMY_TERRITORY
+
+    ##
+    # checkMoveStart
+    # Description: Checks if the location is valid to move from.
+    #  (bounds and ant ownership)
+    #
+    # Parameters:
+    #   coord - The starting point for the move ((int, int))
+    #
+    # Returns: True if it is a valid starting point for a move and false if not
+    ##
+    def checkMoveStart(self, coord):
+        # check location is on board
+        if self.isValidCoord(coord):
+            antToMove = self.state.board[coord[0]][coord[1]].ant
+            # check that an ant exists at the loc
+            if antToMove != None:
+                # check that it's the player's ant and that it hasn't moved
+                if antToMove.player == self.state.whoseTurn and not antToMove.hasMoved:
+                    return True
+
+        return False
+
+    ##
+    # checkMovePath
+    # Description: Checks if the location is valid to move to.
+    #  (clear path, adjacent locations)
+    #
+    # Parameters:
+    #   fromCoord - The Ant's current coordinate ((int, int))
+    #   toCoord - The coorinate to move the Ant to ((int, int))
+    #
+    # Returns: True if it is a valid move and false otherwise
+    #
+    # Note: fromCoord must always have been checked by the time it's passed
+    #  (either in checkMoveStart or previous checkMovePath call)
+    ##
+    def checkMovePath(self, fromCoord, toCoord):
+        # check location is on board
+        if self.isValidCoord(toCoord):
+            # check that squares are adjacent (difference on only one axis is 1)
+            if ((abs(fromCoord[0] - toCoord[0]) == 1 and abs(fromCoord[1] - toCoord[1]) == 0) or
+                    (abs(fromCoord[0] - toCoord[0]) == 0 and abs(fromCoord[1] - toCoord[1]) == 1)):
+                antAtLoc = self.state.board[toCoord[0]][toCoord[1]].ant
+                # check if an ant exists at the loc
+                if antAtLoc == None:
+                    return True
+
+        return False
+
+    ##
+    # checkBuildStart
+    # Description: Checks if the location is valid to build from.
+    #  (bounds and building ownership)
+    #
+    # Parameters:
+    #   coord - The coordinate trying to be used to build ((int, int))
+    #
+    # Returns: True if it is a valid build location and false otherwise
+    ##
+    def checkBuildStart(self, coord):
+        # check location is on board
+        if self.isValidCoord(coord):
+            loc = self.state.board[coord[0]][coord[1]]
+            # check that an empty anthill exists at the loc
+            if loc.constr != None and loc.constr.type == ANTHILL and loc.ant == None:
+                # check that it's the player's anthill
+                if loc.constr.player == self.state.whoseTurn:
+                    return True
+            # check that an ant exists at an empty location
+            elif loc.ant != None and loc.ant.type == WORKER and loc.constr == None:
+                # check that it's the player's ant and it hasn't moved
+                if loc.ant.player == self.state.whoseTurn and not loc.ant.hasMoved:
+                    return True
+
+        return False
+
+    ##
+    # hasWon(int)
+    # Description: Determines whether the game has ended in victory for the given player.
+    #
+    # Parameters:
+    #   playerId - The ID of the player being checked for winning (int)
+    #
+    # Returns: True if the player with playerId has won the game.
+    ##
+    def hasWon(self, playerId):
+        opponentId = 1 - playerId
+
+        if ((self.state.phase == PLAY_PHASE) and
+                ((self.state.inventories[opponentId].getQueen() == None) or
+                     (self.state.inventories[opponentId].getAnthill().captureHealth <= 0) or
+                     (self.state.inventories[playerId].foodCount >= FOOD_GOAL) or
+                     (self.state.inventories[opponentId].foodCount == 0 and
+                              len(self.state.inventories[opponentId].ants) == 1))):
+            return True
+        else:
+            return False
+
+
+    ##
+    # error
+    # Description: Called when an AI player makes an error. Gives a description
+    #    of what went wrong and exits the program.
+    #
+    # Parameters:
+    #   errorCode - A code indicating the type of error
+    #        info - the offending object that caused the error
+    ##
+    def error(self, errorCode, info, player = None):
+        self.errored = True
+        errorMsg = "AI ERROR: "
+        if player is not None:
+            errorMsg += player.author + ": "
+
+        if errorCode == INVALID_PLACEMENT:
+            # info is a coord list
+            errorMsg += "invalid placement\nCoords given: "
+            lastCoord = info.pop()
+            for coord in info:
+                errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
+            errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
+
+        elif errorCode == INVALID_MOVE:
+            # info is a move
+            errorMsg += "invalid move: " + str(info) + "\n"
+            if info == None:
+                errorMsg += "Move is non-move type: None"
+            elif type(info) != Move:
+                errorMsg += "Move is non-move type: " + str(type(info))
+            elif info.moveType == None:
+                errorMsg += "moveType is non-int type: None"
+            elif type(info.moveType) != int:
+                errorMsg += "moveType is non-int type: " + str(type(info.moveType))
+            elif info.moveType < MOVE_ANT or info.moveType > END:
+                errorMsg += "moveType not a recognized value: " + str(info.moveType)
+            elif info.moveType == MOVE_ANT:
+                pass
+
+        else:  # INVALID_ATTACK
+            # info is a coord
+            errorMsg += "invalid attack\n"
+            errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
+
+        print(errorMsg)
+        return errorMsg
+
+    ##
+    # getSetupConstructions
+    # Description: Returns the constructions player one places first in setup phase 1:
+    #   1 anthill, 1 tunnel and 9 grass
+    #
+    # Returns: a list of Construction
+    ##
+    @staticmethod
+    def getSetupConstructions():
+        constrsToPlace = []
+        constrsToPlace += [Building(None, ANTHILL, PLAYER_ONE)]
+        constrsToPlace += [Building(None, TUNNEL, PLAYER_ONE)]
+        constrsToPlace += [Construction(None, GRASS) for i in range(0, 9)]
+        return constrsToPlace
+
+    ##
+    # placeConstructions
+    # Description: Puts already validated setup placements on the board for the
+    #   player whose turn it is.
+    #
+    # Parameters:
+    #   constrsToPlace - The Constructions still to be placed, consumed from the front (Construction[])
+    #   targets - The coordinates given by the player, from their point of view ((int,int)[])
+    ##
+    def placeConstructions(self, constrsToPlace, targets):
+        for target in targets:
+            # translate coords to match player
+            target = self.state.coordLookup(target, self.state.whoseTurn)
+            # get construction to place
+            constr = constrsToPlace.pop(0)
+            # give constr its coords
+            constr.coords = target
+            if self.record is not None:
+                self.record.addPlacement(target)
+            # put constr on board
+            self.state.board[target[0]][target[1]].constr = constr
+            if constr.type == ANTHILL or constr.type == TUNNEL:
+                # update the inventory
+                self.state.inventories[self.state.whoseTurn].constrs.append(constr)
+            else:  # grass and food
+                self.state.inventories[NEUTRAL].constrs.append(constr)
+
+    ##
+    # advanceSetup
+    # Description: Called once a player has placed everything they were given.  Moves
+    #   the game on to the next setup step (adding the queens and workers when setup is
+    #   over) and passes the turn.
+    #
+    # Returns: The Constructions the next player has to place (Construction[])
+    ##
+    def advanceSetup(self):
+        constrsToPlace = []
+        if self.state.phase == SETUP_PHASE_1:
+            if self.state.whoseTurn == PLAYER_ONE:
+                constrsToPlace += [Building(None, ANTHILL, PLAYER_TWO)]
+                constrsToPlace += [Building(None, TUNNEL, PLAYER_TWO)]
+                constrsToPlace += [Construction(None, GRASS) for i in range(0, 9)]
+            elif self.state.whoseTurn == PLAYER_TWO:
+                constrsToPlace += [Construction(None, FOOD) for i in range(0, 2)]
+                self.state.phase = SETUP_PHASE_2
+        elif self.state.phase == SETUP_PHASE_2:
+            if self.state.whoseTurn == PLAYER_ONE:
+                constrsToPlace += [Construction(None, FOOD) for i in range(0, 2)]
+            elif self.state.whoseTurn == PLAYER_TWO:
+                # if we're finished placing, add in queens and move to play phase
+                p1inventory = self.state.inventories[PLAYER_ONE]
+                p2inventory = self.state.inventories[PLAYER_TWO]
+                # get anthill coords
+                p1AnthillCoords = p1inventory.constrs[0].coords
+                p2AnthillCoords = p2inventory.constrs[0].coords
+                # get tunnel coords
+                p1TunnelCoords = p1inventory.constrs[1].coords
+                p2TunnelCoords = p2inventory.constrs[1].coords
+                # create queen and worker ants
+                p1Queen = Ant(p1AnthillCoords, QUEEN, PLAYER_ONE)
+                p2Queen = Ant(p2AnthillCoords, QUEEN, PLAYER_TWO)
+                p1Worker = Ant(p1TunnelCoords, WORKER, PLAYER_ONE)
+                p2Worker = Ant(p2TunnelCoords, WORKER, PLAYER_TWO)
+                # put ants on board
+                self.state.board[p1Queen.coords[0]][p1Queen.coords[1]].ant = p1Queen
+                self.state.board[p2Queen.coords[0]][p2Queen.coords[1]].ant = p2Queen
+                self.state.board[p1Worker.coords[0]][p1Worker.coords[1]].ant = p1Worker
+                self.state.board[p2Worker.coords[0]][p2Worker.coords[1]].ant = p2Worker
+                # add the queens to the inventories
+                p1inventory.ants.append(p1Queen)
+                p2inventory.ants.append(p2Queen)
+                p1inventory.ants.append(p1Worker)
+                p2inventory.ants.append(p2Worker)
+                # give the players the initial food
+                p1inventory.foodCount = 1
+                p2inventory.foodCount = 1
+                # change to play phase
+                self.state.phase = PLAY_PHASE
+
+        # change player turn in state
+        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+        return constrsToPlace
+
+    ##
+    # moveAnt
+    # Description: Applies a validated MOVE_ANT move (in board coordinates) to the state
+    #
+    # Parameters:
+    #   move - The Move to apply (Move)
+    #
+    # Returns: The Ant that was moved
+    ##
+    def moveAnt(self, move):
+        startCoord = move.coordList[0]
+        endCoord = move.coordList[-1]
+
+        if self.record is not None:
+            self.record.addMove(move.coordList)
+
+        # take ant from start coord
+        antToMove = self.state.board[startCoord[0]][startCoord[1]].ant
+
+        # change ant's coords and hasMoved status
+        self.state.setAntCoords(antToMove, (endCoord[0], endCoord[1]))
+        antToMove.hasMoved = True
+
+        # remove ant from location
+        self.state.board[startCoord[0]][startCoord[1]].ant = None
+
+        # put ant at last loc in coordList
+        self.state.board[endCoord[0]][endCoord[1]].ant = antToMove
+        return antToMove
+
+    ##
+    # buildFromMove
+    # Description: Applies a validated BUILD move (in board coordinates) to the state
+    #
+    # Parameters:
+    #   move - The Move to apply (Move)
+    ##
+    def buildFromMove(self, move):
+        coord = move.coordList[0]
+        currentPlayerInv = self.state.inventories[self.state.whoseTurn]
+        if self.record is not None:
+            self.record.addBuild(coord, move.buildType)
+
+        # subtract the cost of the item from the player's food count
+        if move.buildType == TUNNEL:
+            currentPlayerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
+
+            tunnel = Building(coord, TUNNEL, self.state.whoseTurn)
+            self.state.board[coord[0]][coord[1]].constr = tunnel
+        else:
+            currentPlayerInv.foodCount -= UNIT_STATS[move.buildType][COST]
+
+            ant = Ant(coord, move.buildType, self.state.whoseTurn)
+            ant.hasMoved = True
+            self.state.board[coord[0]][coord[1]].ant = ant
+            self.state.inventories[self.state.whoseTurn].ants.append(ant)
+
+    ##
+    # endTurn
+    # Description: Takes care of end of turn business for the ants and constructions of
+    #   the player whose turn it is and then passes the turn.
+    ##
+    def endTurn(self):
+        if self.record is not None:
+            self.record.addEnd()
+        for ant in self.state.inventories[self.state.whoseTurn].ants:
+            constrUnderAnt = self.state.board[ant.coords[0]][ant.coords[1]].constr
+            if constrUnderAnt != None:
+                # if constr is enemy's and ant hasnt moved, affect capture health of buildings
+                if type(constrUnderAnt) is Building and not constrUnderAnt.player == self.state.whoseTurn:
+                    constrUnderAnt.captureHealth -= 1
+                # have all worker ants on food sources gather food
+                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
+                    ant.carrying = True
+                # deposit carried food (only workers carry)
+                elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
+                    self.state.inventories[self.state.whoseTurn].foodCount += 1
+                    ant.carrying = False
+
+            # reset hasMoved on all ants of player
+            ant.hasMoved = False
+
+        # switch whose turn it is
+        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+
+    ##
+    # listAttackCoords
+    # Description: Lists the enemy ants the given ant may attack after moving
+    #
+    # Parameters:
+    #   attackingAnt - The Ant that just moved (Ant)
+    #
+    # Returns: The coordinates of attackable ants from the point of view of the
+    #   player whose turn it is ((int,int)[])
+    ##
+    def listAttackCoords(self, attackingAnt):
+        validAttackCoords = []
+        opponentId = (self.state.whoseTurn + 1) % 2
+        for ant in self.state.inventories[opponentId].ants:
+            if self.isValidAttack(attackingAnt, ant.coords):
+                # keep track of valid attack coords (flipped for player two)
+                validAttackCoords.append(self.state.coordLookup(ant.coords, self.state.whoseTurn))
+        return validAttackCoords
+
+    ##
+    # applyAttack
+    # Description: Applies a validated attack (in board coordinates) to the state
+    #
+    # Parameters:
+    #   attackingAnt - The Ant that is attacking (Ant)
+    #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
+    ##
+    def applyAttack(self, attackingAnt, attackCoord):
+        opponentId = (self.state.whoseTurn + 1) % 2
+        if self.record is not None:
+            self.record.addAttack(attackCoord)
+
+        # decrement ants health
+        attackedAnt = self.state.board[attackCoord[0]][attackCoord[1]].ant
+        attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
+
+        # check for dead ant
+        if attackedAnt.health <= 0:
+            # remove dead ant from board
+            self.state.board[attackCoord[0]][attackCoord[1]].ant = None
+            # remove dead ant from inventory
+            self.state.inventories[opponentId].ants.remove(attackedAnt)
+
+
+##
+# deriveSeed
+# Description: Makes a new seed from a seed and some distinguishing values, e.g.
+#   the seed of a game from a tournament's master seed and the game's number.
+#   The same arguments give the same seed in every process and on every run.
+#
+# Parameters:
+#   seed - the seed to derive from (int)
+#   parts - anything with a stable repr (ints, strings, tuples of them)
+#
+# Returns: a seed (non-negative int below 2**63)
+##
+def deriveSeed(seed, *parts):
+    digest = hashlib.sha256(repr((seed,) + parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little") & ((1 << 63) - 1)
+
+
+##
+# newSeed
+# Description: Picks a seed for a game nobody asked to be reproducible, so it can
+#   still be re-run from its record
+#
+# Returns: a seed (non-negative int below 2**63)
+##
+def newSeed():
+    return random.SystemRandom().getrandbits(63)
+
+
+##
+# MoveTimeout
+# Description: Raised when a player takes longer than the time limit to answer
+##
+class MoveTimeout(Exception):
+    pass
+
+
+#True where the CPU time of a running thread can be read from another thread
+CPU_CLOCKS = hasattr(time, "pthread_getcpuclockid")
+
+#a player on a CPU time limit is also stopped after this many times the limit
+#in wall-clock time, in case it waits on something without using the CPU
+CPU_WALL_FACTOR = 10
+
+
+##
+# callWithTimeLimit
+# Description: Calls a function in a thread of its own and stops waiting for
+#   it when it runs out of time.  The thread can't be stopped, it is left to
+#   finish in the background.
+#
+#   With cpuTime the limit counts the CPU time the thread uses (read through
+#   its pthread CPU clock), so a player doesn't lose time to other processes
+#   on a busy machine.  Where there are no thread CPU clocks wall-clock time is
+#   used instead.
+#
+# Parameters:
+#   function - the function to call
+#   args - its arguments (tuple)
+#   limit - the seconds it has
+#   cpuTime - True for a limit in CPU seconds, False for wall-clock seconds
+#   name - what to call the function in the MoveTimeout message (its __name__
+#          if None)
+#
+# Returns: whatever the function returned
+# Raises: MoveTimeout if it did not return in time, or whatever it raised
+##
+def callWithTimeLimit(function, args, limit, cpuTime=False, name=None):
+    result = []
+    failure = []
+    clock = []
+    started = threading.Event()
+
+    def call():
+        if cpuTime and CPU_CLOCKS:
+            clock.append(time.pthread_getcpuclockid(threading.get_ident()))
+        started.set()
+        try:
+            result.append(function(*args))
+        except Exception as e:
+            failure.append(e)
+
+    t = Thread(target=call, daemon=True)
+    t.start()
+    if cpuTime and CPU_CLOCKS:
+        started.wait()
+        wallDeadline = time.perf_counter() + limit * CPU_WALL_FACTOR
+        while t.is_alive():
+            try:
+                used = time.clock_gettime(clock[0])
+            except OSError:
+                #the thread has just finished
+                break
+            if used >= limit or time.perf_counter() >= wallDeadline:
+                break
+            #a thread can't use more CPU time than wall-clock time
+            t.join(max(limit - used, 0.001))
+    else:
+        t.join(limit)
+
+    if t.is_alive():
+        raise MoveTimeout('function [%s] timeout [%s %sseconds] exceeded!' %
+                          (name or function.__name__, limit, "CPU " if cpuTime else ""))
+    if failure:
+        raise failure[0]
+    return result[0]
+
+
+##
+# MatchEngine
+# Description: Plays a single AI vs. AI game with no UI at all.  Setup, play,
+#   attack resolution and win detection follow the same rules as Game.runGame,
+#   but nothing is drawn and the game never pauses, so it can be used as a
+#   library call on machines without a display:
+#
+#       engine = MatchEngine(AIPlayer(0), AIPlayer(1))
+#       winner = engine.play()
+#
+# Variables:
+#   currentPlayers - the two Players in seat order (Player[])
+#   state - the authoritative GameState of the game being played
+#   timeoutLimit - max seconds a player may take to answer a call (None for no limit)
+#   cpuTime - True if timeoutLimit counts the player's CPU time, False for wall-clock time
+#   turnLimit - the game is abandoned without a winner after this many turns (None for no limit)
+#   winner - the seat (PLAYER_ONE or PLAYER_TWO) of the winner, None until decided
+#   loser - the seat of the loser, None until decided
+#   turns - the number of turns ended so far
+#   recordDir - folder to save a GameRecord of each game in (None to not save them)
+#   record - the GameRecord of the current or last game
+#   seed - the seed of the next game (None to pick one, see reset)
+#   gameSeed - the seed of the current or last game
+#   latency - timings of the player calls and the engine's own work (LatencyStats),
+#       kept over all the games the engine plays
+##
+class MatchEngine(GameRules):
+
+    ##
+    # __init__
+    # Description: Creates a new MatchEngine
+    #
+    # Parameters:
+    #   p1 - the Player moving first (Player)
+    #   p2 - the Player moving second (Player)
+    #   timeoutLimit - max seconds per player call, None to wait forever (float)
+    #   turnLimit - max number of turns before giving up on the game, None for no limit (int)
+    #   recordDir - folder to save game records in, None to not save them (str)
+    #   seed - the seed to play the game with, None for a new one each game (int)
+    #   cpuTime - True to limit the players' CPU time instead of wall-clock time (bool)
+    ##
+    def __init__(self, p1, p2, timeoutLimit=None, turnLimit=None, recordDir=None, seed=None, cpuTime=False):
+        self.currentPlayers = [p1, p2]
+        self.timeoutLimit = timeoutLimit
+        self.cpuTime = cpuTime
+        self.turnLimit = turnLimit
+        self.state = None
+        self.constrsToPlace = []
+        self.winner = None
+        self.loser = None
+        self.gameOver = False
+        self.errored = False
+        self.turns = 0
+        self.recordDir = recordDir
+        self.seed = seed
+        self.gameSeed = None
+        self.latency = LatencyStats()
+
+    ##
+    # reset
+    # Description: Gets the engine ready to play a new game between the same players.
+    #   Each player's random is seeded from the game's seed and its seat, and so
+    #   is the random module, for agents that still use it directly.
+    ##
+    def reset(self):
+        self.state = GameState.getBlankState()
+        self.state.phase = SETUP_PHASE_1
+        self.constrsToPlace = self.getSetupConstructions()
+        self.winner = None
+        self.loser = None
+        self.gameOver = False
+        self.errored = False
+        self.turns = 0
+        self.gameSeed = self.seed if self.seed is not None else newSeed()
+        self.record = GameRecord([player.author for player in self.currentPlayers], self.gameSeed)
+        random.seed(self.gameSeed)
+        for seat in range(len(self.currentPlayers)):
+            self.currentPlayers[seat].moveTimeLimit = self.timeoutLimit
+            self.currentPlayers[seat].cpuTime = self.cpuTime
+            self.currentPlayers[seat].seedRandom(deriveSeed(self.gameSeed, seat))
+            # nothing learned in an earlier game may change how this one is played
+            if self.currentPlayers[seat].transpositionTable is not None:
+                self.currentPlayers[seat].transpositionTable.clear()
+
+    ##
+    # play
+    # Description: Plays a whole game from an empty board
+    #
+    # Returns: the seat (PLAYER_ONE or PLAYER_TWO) of the winner or None if the
+    #   turn limit was reached first
+    ##
+    def play(self):
+        self.reset()
+        while not self.gameOver:
+            if self.state.phase == PLAY_PHASE:
+                self.playMove()
+            else:
+                self.playSetup()
+
+            # determine if someone is a winner.
+            if not self.gameOver:
+                if self.hasWon(PLAYER_ONE):
+                    self.setWinner(PLAYER_ONE)
+                elif self.hasWon(PLAYER_TWO):
+                    self.setWinner(PLAYER_TWO)
+
+            if self.turnLimit is not None and self.turns >= self.turnLimit:
+                break
+
+        if self.recordDir is not None:
+            saveRecord(self.record, self.recordDir)
+        return self.winner
+
+    ##
+    # getPlayerState
+    # Description: Creates the copy of the state that is handed to the player whose
+    #   turn it is (flipped for player two so both play from the top of the board)
+    #
+    # Returns: a GameState
+    ##
+    def getPlayerState(self):
+        theState = self.latency.call(ENGINE, "clone", self.state.clone)
+        if theState.whoseTurn == PLAYER_TWO:
+            self.latency.call(ENGINE, "flip", theState.flipBoard)
+        return theState
+
+    ##
+    # askPlayer
+    # Description: Calls into a player through timePlayerCall, enforcing the
+    #   time limit if there is one.  A player that enforces its own limit (see
+    #   AgentProcess) is called directly.
+    #
+    # Parameters:
+    #   method - the bound Player method to call
+    #   args - the arguments to pass it
+    #
+    # Returns: whatever the player returned
+    # Raises: MoveTimeout if the player did not answer in time
+    ##
+    def askPlayer(self, method, *args):
+        player = method.__self__
+        if self.timeoutLimit is None or getattr(player, "enforcesTimeLimit", False):
+            return self.timePlayerCall(player, method.__name__, *args)
+        return callWithTimeLimit(self.timePlayerCall, (player, method.__name__) + args,
+                                 self.timeoutLimit, self.cpuTime, method.__name__)
+
+    ##
+    # playSetup
+    # Description: Asks the player whose turn it is for their setup placements and
+    #   puts them on the board
+    ##
+    def playSetup(self):
+        currentPlayer = self.currentPlayers[self.state.whoseTurn]
+        theState = self.getPlayerState()
+
+        # hide the 1st player's set anthill and grass placement from the 2nd player
+        if theState.whoseTurn == PLAYER_TWO and self.state.phase == SETUP_PHASE_1:
+            theState.clearConstrs()
+
+        try:
+            targets = self.askPlayer(currentPlayer.getPlacement, theState)
+        except MoveTimeout:
+            traceback.print_exc(limit=0)
+            self.setWinner(1 - self.state.whoseTurn)
+            return
+
+        # only want to place as many targets as constructions to place
+        if type(targets) == list and len(targets) > len(self.constrsToPlace):
+            targets = targets[:len(self.constrsToPlace)]
+
+        if not self.latency.call(ENGINE, "validate", self.isValidPlacement, self.constrsToPlace, targets):
+            # AIs aren't allowed to make mistakes
+            if type(targets) == list and len(targets) > 0:
+                self.error(INVALID_PLACEMENT, list(targets), currentPlayer)
+            else:
+                self.error(INVALID_PLACEMENT, [(None, None)], currentPlayer)
+            self.setWinner(1 - self.state.whoseTurn)
+            return
+
+        self.placeConstructions(self.constrsToPlace, targets)
+        if not self.constrsToPlace:
+            self.constrsToPlace = self.advanceSetup()
+
+    ##
+    # playMove
+    # Description: Asks the player whose turn it is for a move and applies it
+    ##
+    def playMove(self):
+        currentPlayer = self.currentPlayers[self.state.whoseTurn]
+        theState = self.getPlayerState()
+
+        try:
+            move = self.askPlayer(currentPlayer.getMove, theState)
+        except MoveTimeout:
+            traceback.print_exc(limit=0)
+            self.setWinner(1 - self.state.whoseTurn)
+            return
+
+        if type(move) == Move and type(move.coordList) == list:
+            for i in range(0, len(move.coordList)):
+                # translate coords of move to match player
+                move.coordList[i] = self.state.coordLookup(move.coordList[i], self.state.whoseTurn)
+
+        # AIs lose the game on any invalid move
+        if not self.latency.call(ENGINE, "validate", self.isValidMove, move):
+            self.error(INVALID_MOVE, move, currentPlayer)
+            self.setWinner(1 - self.state.whoseTurn)
+            return
+
+        if move.moveType == MOVE_ANT:
+            antToMove = self.moveAnt(move)
+            # check and take action for attack (workers can not attack)
+            if antToMove.type != WORKER:
+                self.resolveAttack(antToMove, currentPlayer)
+        elif move.moveType == BUILD:
+            self.buildFromMove(move)
+        elif move.moveType == END:
+            self.endTurn()
+            self.turns += 1
+
+    ##
+    # resolveAttack
+    # Description: Asks the player which enemy to attack, if any are in range of the
+    #   ant that just moved, and applies the attack.
+    #
+    # Parameters:
+    #   attackingAnt - The Ant that has an available attack (Ant)
+    #   currentPlayer - The Player whose turn it currently is (Player)
+    ##
+    def resolveAttack(self, attackingAnt, currentPlayer):
+        validAttackCoords = self.listAttackCoords(attackingAnt)
+        if validAttackCoords == []:
+            return
+
+        theState = self.getPlayerState()
+        try:
+            attackCoord = self.askPlayer(currentPlayer.getAttack, theState, attackingAnt.clone(),
+                                         list(validAttackCoords))
+        except MoveTimeout:
+            traceback.print_exc(limit=0)
+            self.setWinner(1 - self.state.whoseTurn)
+            return
+
+        if type(attackCoord) == list:
+            attackCoord = tuple(attackCoord)
+        if attackCoord not in validAttackCoords:
+            self.error(INVALID_ATTACK, attackCoord if type(attackCoord) == tuple else (None, None), currentPlayer)
+            self.setWinner(1 - self.state.whoseTurn)
+            return
+
+        self.applyAttack(attackingAnt, self.state.coordLookup(attackCoord, self.state.whoseTurn))
+
+    ##
+    # setWinner
+    # Description: Given a seat (0 or 1), sets that player to be the winner of the current game.
+    #
+    # Parameters:
+    #   id - the seat of the winning player. (int)
+    ##
+    def setWinner(self, id):
+        self.gameOver = True
+        self.winner = id
+        self.loser = 1 - id
+        self.record.setResult(id)
+
+        # tell the players if they won or lost
+        self.currentPlayers[id].registerWin(True)
+        self.currentPlayers[1 - id].registerWin(False)
+
@@ -0,0 +1,223 @@
+import heapq
+from Constants import *
+from Construction import CONSTR_STATS
+from BoardTables import NUM_CELLS, ADJACENT_CELLS, cellOf, coordsOf
+
+##
+# PathFinder.py
+#
+# Path finding on the board with flat per-cell tables instead of node
+# objects.  Cells are numbered x * BOARD_LENGTH + y and neighbors are visited
+# in the same order as AIPlayerUtils.listAdjacent, so ties are broken the same
+# way as the searches this replaces:
+#
+#   findPath       - A* toward a goal (AIPlayerUtils.aStarSearchPath)
+#   findGreedyPath - best cell reachable this turn (AIPlayerUtils.createPathToward)
+#
+# Each call builds two grids from the state: the cost of entering every cell
+# (see getCostGrid) and which cells hold an ant (see getBlockedGrid).
+#
+
+
+##
+# cellDist
+#
+# Return: the approxDist between two cell ids
+def cellDist(cell1, cell2):
+    x1, y1 = divmod(cell1, BOARD_LENGTH)
+    x2, y2 = divmod(cell2, BOARD_LENGTH)
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+##
+# getCostGrid
+#
+# Parameters:
+#   state - a GameState
+#   ignoresGrass - True for ants that cross grass at normal cost
+#
+# Return: a list of the cost of moving onto each cell id
+def getCostGrid(state, ignoresGrass = False):
+    costs = [1] * NUM_CELLS
+    if ignoresGrass:
+        return costs
+    if hasattr(state, "getOccupancyIndex"):
+        for coords, cost in state.getOccupancyIndex().getTerrainCosts().items():
+            costs[cellOf(coords)] = cost
+    else:
+        #the first construction on a cell is the one that counts
+        for inv in reversed(state.inventories):
+            for constr in reversed(inv.constrs):
+                costs[cellOf(constr.coords)] = CONSTR_STATS[constr.type][MOVE_COST]
+    return costs
+
+
+##
+# getBlockedGrid
+#
+# Parameters:
+#   state - a GameState
+#
+# Return: a list of booleans, True for each cell id an ant stands on
+def getBlockedGrid(state):
+    blocked = [False] * NUM_CELLS
+    if hasattr(state, "getOccupancyIndex"):
+        for coords in state.getOccupancyIndex().ants:
+            blocked[cellOf(coords)] = True
+    else:
+        for inv in state.inventories:
+            for ant in inv.ants:
+                blocked[cellOf(ant.coords)] = True
+    return blocked
+
+
+##
+# findPath
+#
+# Description: A* search from start toward goal where every step costs 1.
+#   The path stops on the cell next to the goal, so the goal itself must be
+#   free of ants to be found.  Cells with ants are never entered.
+#
+# Parameters:
+#   state - a GameState
+#   start - where the path starts (an x,y coord)
+#   goal - where the path is headed (an x,y coord)
+#   maxLength - if not None, the path is cut down to this many coords (e.g. an
+#               ant's movement + 1 for the part it can walk this turn)
+#
+# Return: a list of coords from start, [] if start is the goal or False if
+#   the goal can't be reached
+def findPath(state, start, goal, maxLength = None):
+    if tuple(start) == tuple(goal):
+        return []
+    startCell = cellOf(start)
+    goalCell = cellOf(goal)
+    blocked = getBlockedGrid(state)
+
+    #best[cell] is the lowest step count pushed for a cell, parent[cell] the
+    #cell it came from.  Equal f values pop in the order they were pushed.
+    best = [None] * NUM_CELLS
+    parent = [None] * NUM_CELLS
+    closed = [False] * NUM_CELLS
+    best[startCell] = 0
+    counter = 0
+    openSet = [(cellDist(startCell, goalCell), counter, startCell)]
+    while openSet:
+        f, order, cell = heapq.heappop(openSet)
+        if closed[cell]:
+            continue
+        closed[cell] = True
+        steps = best[cell] + 1
+        for adj in ADJACENT_CELLS[cell]:
+            if blocked[adj]:
+                continue
+            if adj == goalCell:
+                return tracePath(parent, cell, maxLength)
+            if closed[adj] or (best[adj] is not None and best[adj] <= steps):
+                continue
+            best[adj] = steps
+            parent[adj] = cell
+            counter += 1
+            heapq.heappush(openSet, (steps + cellDist(adj, goalCell), counter, adj))
+    return False
+
+
+##
+# tracePath
+#
+# Return: the coords from the start of the search to cell, cut to maxLength
+def tracePath(parent, cell, maxLength = None):
+    path = []
+    while cell is not None:
+        path.append(coordsOf(cell))
+        cell = parent[cell]
+    path.reverse()
+    if maxLength is not None:
+        return path[:maxLength]
+    return path
+
+
+##
+# findGreedyPath
+#
+# Description: Finds the path, within the movement available, that ends as
+#   close to the target as possible.  Of the paths that get equally close the
+#   one createPathToward has always returned is chosen: staying put first, then
+#   the first neighbor (in listAdjacent order) that can still get that close,
+#   and so on.
+#
+#   A Dijkstra pass finds how close the target can be reached and a reverse
+#   pass from those closest cells tells which neighbors still lead to one, so
+#   the path is then walked without any backtracking.
+#
+# Parameters:
+#   state - a GameState
+#   source - the start location of the path (an x,y coord)
+#   target - the target location for the path (an x,y coord)
+#   movement - amount of movement to spend on the path (int)
+#   ignoresGrass - True if grass costs no extra movement
+#
+# Return: (path, dist) where path is a list of coords starting at source and
+#   dist is the approxDist from its end to the target
+def findGreedyPath(state, source, target, movement, ignoresGrass = False):
+    source = tuple(source)
+    sourceCell = cellOf(source)
+    targetCell = cellOf(target)
+    dist = cellDist(sourceCell, targetCell)
+    if dist == 0 or movement <= 0:
+        return ([source], dist)
+
+    costs = getCostGrid(state, ignoresGrass)
+    blocked = getBlockedGrid(state)
+
+    #how close to the target can we get?
+    spent = [None] * NUM_CELLS
+    spent[sourceCell] = 0
+    frontier = [(0, sourceCell)]
+    reached = []
+    while frontier:
+        used, cell = heapq.heappop(frontier)
+        if used > spent[cell]:
+            continue
+        reached.append(cell)
+        for adj in ADJACENT_CELLS[cell]:
+            newUsed = used + costs[adj]
+            if blocked[adj] or newUsed > movement:
+                continue
+            if spent[adj] is None or newUsed < spent[adj]:
+                spent[adj] = newUsed
+                heapq.heappush(frontier, (newUsed, adj))
+    bestDist = min([cellDist(cell, targetCell) for cell in reached])
+    if bestDist == dist:
+        return ([source], dist)
+
+    #toGoal[cell] is the movement needed to get from cell to one of the
+    #closest cells (the cell itself may hold an ant, the rest of the way can't)
+    toGoal = [None] * NUM_CELLS
+    frontier = []
+    for cell in reached:
+        if cellDist(cell, targetCell) == bestDist:
+            toGoal[cell] = 0
+            frontier.append((0, cell))
+    heapq.heapify(frontier)
+    while frontier:
+        needed, cell = heapq.heappop(frontier)
+        if needed > toGoal[cell] or blocked[cell]:
+            continue
+        newNeeded = needed + costs[cell]
+        for adj in ADJACENT_CELLS[cell]:
+            if newNeeded <= movement and (toGoal[adj] is None or newNeeded < toGoal[adj]):
+                toGoal[adj] = newNeeded
+                heapq.heappush(frontier, (newNeeded, adj))
+
+    path = [source]
+    cell = sourceCell
+    while cellDist(cell, targetCell) != bestDist:
+        for adj in ADJACENT_CELLS[cell]:
+            left = movement - costs[adj]
+            if not blocked[adj] and toGoal[adj] is not None and toGoal[adj] <= left:
+                movement = left
+                cell = adj
+                break
+        path.append(coordsOf(cell))
+    return (path, bestDist)
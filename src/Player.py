@@ -1,3 +1,6 @@
+import random, time
+from Transposition import TranspositionTable
+
 ##
 #Player
 #Description: The responsbility of this class is to interact with the game by
@@ -6,6 +9,15 @@
 #
 #Variables:
 #   playerId - The id of the player.
+#   transpositionTable - see getTranspositionTable (None until first used)
+#   moveTimeLimit - seconds the game allows for each move (None if unlimited).
+#       Set by the game before play starts.
+#   cpuTime - True if moveTimeLimit counts the CPU time this player uses rather
+#       than wall-clock time.  Set by the game along with moveTimeLimit.
+#   moveStarted - moveClock() when the game last called the player (see remainingTime)
+#   random - the player's own random.Random.  The game seeds it before each game
+#       (see seedRandom), so a player that draws all its random numbers from it
+#       plays the same way every time the game is replayed with the same seed.
 ##
 class Player(object):
 
@@ -21,7 +33,68 @@ class Player(object):
     def __init__(self, inputPlayerId, inputAuthor):
         self.playerId = inputPlayerId
         self.author = inputAuthor
+        self.transpositionTable = None
+        self.moveTimeLimit = None
+        self.cpuTime = False
+        self.moveStarted = None
+        self.random = random.Random()
+
+    ##
+    #getTranspositionTable
+    #Description: Returns this player's transposition table (see Transposition.py),
+    #   creating it the first time.  The table lives as long as the player, so
+    #   searches can reuse evaluations and best moves from earlier turns.
+    #
+    #Parameters:
+    #   size - the number of slots to create the table with (int)
+    #
+    #Return: a TranspositionTable
+    ##
+    def getTranspositionTable(self, size = 1 << 16):
+        if self.transpositionTable is None:
+            self.transpositionTable = TranspositionTable(size)
+        return self.transpositionTable
     
+    ##
+    #seedRandom
+    #Description: Called by the game before each game starts to reseed self.random
+    #
+    #Parameters:
+    #   seed - the seed for this player in this game (int)
+    ##
+    def seedRandom(self, seed):
+        self.random.seed(seed)
+
+    ##
+    #moveClock
+    #Description: The clock moveTimeLimit is measured on: CPU time of the calling
+    #   thread (the one the player is called on) or wall-clock time
+    #
+    #Return: seconds (float, only differences between readings mean anything)
+    ##
+    def moveClock(self):
+        return time.thread_time() if self.cpuTime else time.perf_counter()
+
+    ##
+    #startMoveClock
+    #Description: Called by the game on the thread it calls the player on, just
+    #   before getPlacement, getMove or getAttack
+    ##
+    def startMoveClock(self):
+        self.moveStarted = self.moveClock()
+
+    ##
+    #remainingTime
+    #Description: How long the player may still take over the current call.  A
+    #   search can deepen while there is time left and stop before it runs out.
+    #
+    #Return: seconds left (float, may be negative), None if there is no limit
+    ##
+    def remainingTime(self):
+        if self.moveTimeLimit is None or self.moveStarted is None:
+            return None
+        return self.moveTimeLimit - (self.moveClock() - self.moveStarted)
+
     ##
     #getPlacement
     #Description: called during setup phase for each Construction that must be placed by the player.
@@ -0,0 +1,266 @@
+import random
+import functools
+from Constants import *
+from AIPlayerUtils import *
+
+##
+# Rollout.py
+#
+# Plays games out from a position as fast as possible, without Players, the
+# Game loop or any copying beyond one fastclone per batch of playouts.  Moves
+# are made in place with applyMove and taken back with undoMove once the game
+# is over, as soon as getWinner says so (or the turn limit is reached).  The
+# policy is handed the legal moves as a LegalMoves, which lists them from the
+# cached movement paths and only makes a Move for the ones asked for.  This is
+# the building block for Monte Carlo style agents:
+#
+#       stats = playRollouts(currentState, 200)
+#       myWinRate = stats.winRate(currentState.whoseTurn)
+#
+# Rollouts follow the getNextState rules, so an ant that moves next to an
+# enemy always attacks the first enemy in range.
+#
+
+#Turns (END moves) after which a playout is called a draw
+DEFAULT_TURN_LIMIT = 100
+
+#Hard cap on moves per turn, in case a policy never ends its turn
+MAX_MOVES_PER_TURN = 100
+
+
+##
+# queenMovementPaths
+#
+# the paths of cachedMovementPaths that keep the queen in her territory
+#
+# Return: a tuple of paths (tuples of coords)
+@functools.lru_cache(maxsize=8192)
+def queenMovementPaths(coords, movement, region, costs):
+    return tuple([path for path in cachedMovementPaths(coords, movement, region, costs)
+                  if isPathOkForQueen(path)])
+
+
+##
+#LegalMoves
+#Description: The moves listAllLegalMoves would return, in the same order,
+#   as a read only sequence.  The paths come from cachedMovementPaths and a
+#   Move is only made for the moves that are looked at, so picking one move
+#   out of hundreds costs about as much as picking one out of ten.
+#
+#Variables:
+#   groups - (number of moves before the ant's, ant's coords, its paths) for
+#            each ant that can move
+#   numMovementMoves - the number of MOVE_ANT moves
+#   hillCoords - where the player's anthill is
+#   buildTypes - the ant types there is a BUILD move for
+#   length - the number of moves, END included
+##
+class LegalMoves(object):
+
+    def __init__(self, state):
+        self.groups = []
+        count = 0
+        myInv = state.inventories[state.whoseTurn]
+        index = state.getOccupancyIndex()
+        for ant in myInv.ants:
+            if ant.hasMoved:
+                continue
+            movement = UNIT_STATS[ant.type][MOVEMENT]
+            ignoresGrass = UNIT_STATS[ant.type][IGNORES_GRASS]
+            key = getMovementKey(state, ant.coords, movement, ignoresGrass, index)
+            if key is None:
+                paths = listAllMovementPaths(state, ant.coords, movement, ignoresGrass)
+                if ant.type == QUEEN:
+                    paths = [path for path in paths if isPathOkForQueen(path)]
+            elif ant.type == QUEEN:
+                paths = queenMovementPaths(*key)
+            else:
+                paths = cachedMovementPaths(*key)
+            if paths:
+                self.groups.append((count, ant.coords, paths))
+                count += len(paths)
+        self.numMovementMoves = count
+
+        #the same BUILD moves as listAllBuildMoves
+        self.hillCoords = myInv.getAnthill().coords
+        self.buildTypes = []
+        if getAntAt(state, self.hillCoords) is None:
+            self.buildTypes = [antType for antType in range(1, len(UNIT_STATS))
+                               if UNIT_STATS[antType][COST] <= myInv.foodCount]
+        self.length = count + len(self.buildTypes) + 1
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if i < 0 or i >= self.length:
+            raise IndexError("move index out of range")
+        if i < self.numMovementMoves:
+            for start, coords, paths in reversed(self.groups):
+                if i >= start:
+                    path = paths[i - start]
+                    return Move(MOVE_ANT, [coords] + list(path[1:]), None)
+        i -= self.numMovementMoves
+        if i < len(self.buildTypes):
+            return Move(BUILD, [self.hillCoords], self.buildTypes[i])
+        return Move(END, None, None)
+
+
+##
+# randomPolicy
+#
+# The policy of AI/Random.py: any legal move with equal probability, except
+# that builds are skipped once the player has 3 or more ants.
+#
+# Parameters:
+#   state - the state to move from
+#   moves - the legal moves in that state, a LegalMoves (never empty, END is
+#           always legal)
+#   rng - the random.Random to draw from
+#
+# Return: the Move to make
+def randomPolicy(state, moves, rng):
+    numAnts = len(state.inventories[state.whoseTurn].ants)
+    selectedMove = moves[rng.randint(0, len(moves) - 1)]
+    while selectedMove.moveType == BUILD and numAnts >= 3:
+        selectedMove = moves[rng.randint(0, len(moves) - 1)]
+    return selectedMove
+
+
+##
+# rollout
+#
+# Description: Plays one game out from the given state
+#
+# Parameters:
+#   state - where to start (GameState, not changed)
+#   policy - function (state, moves, rng) -> Move choosing each move
+#   turnLimit - turns to play before giving up (int)
+#   rng - random.Random to use (a new one if None)
+#
+# Return: (winner, turns) where winner is PLAYER_ONE, PLAYER_TWO or None for a
+#   draw and turns is the number of turns played
+def rollout(state, policy = randomPolicy, turnLimit = DEFAULT_TURN_LIMIT, rng = None):
+    return playOut(state.fastclone(), policy, turnLimit, rng)
+
+
+##
+# playOut
+#
+# Description: Plays one game out on the given state with applyMove, then
+#   takes every move back with undoMove
+#
+# Parameters:
+#   state - where to start (a GameState from fastclone, restored before returning)
+#   policy, turnLimit, rng - see rollout
+#
+# Return: (winner, turns), see rollout
+def playOut(state, policy = randomPolicy, turnLimit = DEFAULT_TURN_LIMIT, rng = None):
+    if rng is None:
+        rng = random.Random()
+    tokens = []
+    turns = 0
+    movesThisTurn = 0
+    try:
+        while True:
+            winner = getWinner(state)
+            if winner is not None:
+                return (state.whoseTurn if winner == 1 else 1 - state.whoseTurn), turns
+            if turns >= turnLimit:
+                return None, turns
+
+            if movesThisTurn >= MAX_MOVES_PER_TURN:
+                move = Move(END, None, None)
+            else:
+                move = policy(state, LegalMoves(state), rng)
+            tokens.append(applyMove(state, move))
+            movesThisTurn += 1
+            if move.moveType == END:
+                turns += 1
+                movesThisTurn = 0
+    finally:
+        for token in reversed(tokens):
+            undoMove(state, token)
+
+
+##
+#RolloutStats
+#Description: The outcome of a batch of playouts
+#
+#Variables:
+#   games - number of playouts
+#   wins - [wins for PLAYER_ONE, wins for PLAYER_TWO]
+#   draws - playouts that hit the turn limit
+#   totalTurns - turns played over all playouts
+##
+class RolloutStats(object):
+
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.draws = 0
+        self.totalTurns = 0
+
+    ##
+    #add
+    #Description: Records the result of one playout
+    ##
+    def add(self, winner, turns):
+        self.games += 1
+        self.totalTurns += turns
+        if winner is None:
+            self.draws += 1
+        else:
+            self.wins[winner] += 1
+
+    ##
+    #winRate
+    #
+    #Parameters:
+    #   playerId - PLAYER_ONE or PLAYER_TWO
+    #
+    #Return: the fraction of playouts the player won (draws count as half)
+    ##
+    def winRate(self, playerId):
+        if self.games == 0:
+            return 0.0
+        return (self.wins[playerId] + 0.5 * self.draws) / self.games
+
+    ##
+    #averageTurns
+    #
+    #Return: mean length of the playouts in turns
+    ##
+    def averageTurns(self):
+        if self.games == 0:
+            return 0.0
+        return self.totalTurns / self.games
+
+    def __str__(self):
+        return "<RolloutStats: %d games, P1 %d, P2 %d, draws %d, %.1f turns avg>" % \
+            (self.games, self.wins[PLAYER_ONE], self.wins[PLAYER_TWO], self.draws, self.averageTurns())
+
+
+##
+# playRollouts
+#
+# Description: Plays a batch of playouts from one state
+#
+# Parameters:
+#   state - where to start (GameState, not changed)
+#   numRollouts - how many playouts (int)
+#   policy - function (state, moves, rng) -> Move choosing each move
+#   turnLimit - turns per playout before calling it a draw (int)
+#   seed - seed for the playouts' random numbers, None for a random seed
+#
+# Return: a RolloutStats
+def playRollouts(state, numRollouts, policy = randomPolicy, turnLimit = DEFAULT_TURN_LIMIT, seed = None):
+    rng = random.Random(seed)
+    stats = RolloutStats()
+    state = state.fastclone()
+    for i in range(numRollouts):
+        winner, turns = playOut(state, policy, turnLimit, rng)
+        stats.add(winner, turns)
+    return stats
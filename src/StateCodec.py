@@ -0,0 +1,490 @@
+import struct
+from Constants import *
+from Ant import Ant, noteAntId
+from Building import Building
+from Construction import Construction
+from Location import Location
+from Inventory import Inventory
+from GameState import GameState
+from Move import Move
+from BoardTables import NUM_CELLS, CELL_COORDS
+from AIPlayerUtils import legalCoord
+
+##
+# StateCodec.py
+#
+# A fixed layout binary encoding of GameState and Move, for handing states to
+# other processes (see AgentProcess.py) and for storing them.  A state from
+# clone() or fastclone() decodes to an identical state: the same inventories
+# in the same order, the same ant ids (Ant.UniqueID), the same board, even the
+# Location coords of a flipped board.  An encoded state is a few hundred bytes.
+#
+#       data = encodeState(state)
+#       copy = decodeState(data)
+#
+# Layout (little endian, coords stored as cells x * BOARD_LENGTH + y):
+#   header       - version, phase, whoseTurn, flags, Location layout, then
+#                  food, ant count and construction count of each of the three
+#                  inventories, then the number of extra ants, extra
+#                  constructions and board entries
+#   ants         - ANT_FORMAT per ant, the inventories' in order, then extras
+#   constrs      - CONSTR_FORMAT per construction, likewise
+#   board        - nothing if the board is the one clone() would build from the
+#                  inventories (BOARD_FROM_INVENTORIES), else CELL_FORMAT per
+#                  cell that holds anything
+#   coords       - one cell per Location if the layout is LAYOUT_EXPLICIT
+#
+# Extra ants and constructions are ones on the board but in no inventory.
+#
+# Only well formed moves can be encoded (see canEncodeMove).  Anything else is
+# for GameRules to turn down and has to be sent as it is.
+#
+
+STATE_VERSION = 1
+
+#flags
+HAS_BOARD = 1                   #fastclone states have none
+BOARD_FROM_INVENTORIES = 2      #no board entries, see boardFromInventories
+NEUTRAL_SHARED = 4              #with the above: grass and food on the board are
+                                #the inventory's objects, not copies of them
+NEUTRAL_MIRRORED = 8            #with the above: the board's copies of grass and
+                                #food still have the coords from before flipBoard
+
+#what the coords of the Locations are
+LAYOUT_STANDARD = 0             #board[x][y].coords == (y, x), see getBlankState
+LAYOUT_FLIPPED = 1              #the standard layout after flipBoard
+LAYOUT_EXPLICIT = 2             #anything else, stored one cell per Location
+
+#references from a board entry to the ant and construction tables
+NO_REF = 0xFF
+COPY_REF = 0x80                 #a new object equal to the one referred to
+MAX_OBJECTS = 0x7F
+
+#owner of a plain Construction (grass, food)
+NO_OWNER = 0xFF
+
+#buildType and coordList of a Move that has none
+NO_BUILD_TYPE = -128
+NO_COORD_LIST = 0xFF
+
+HEADER = struct.Struct("<5B9B3B")
+HEADER_VALUES = 17
+ANT_FORMAT = "IBBBbB"           #UniqueID, cell, type, player, health, flags
+CONSTR_FORMAT = "BbBb"          #cell, type, owner, captureHealth
+CELL_FORMAT = "BBB"             #cell, ant ref, constr ref
+MOVE_HEADER = struct.Struct("<bbB")     #moveType, buildType, number of cells
+
+#ant flags
+MOVED_FLAG = 1
+CARRYING_FLAG = 2
+
+#Location coords of each cell in the standard and the flipped layout
+STANDARD_COORDS = [(cell % BOARD_LENGTH, cell // BOARD_LENGTH) for cell in range(NUM_CELLS)]
+FLIPPED_COORDS = STANDARD_COORDS[::-1]
+
+#Structs for the part after the header, by (ants, constructions, board entries, explicit coords)
+bodyStructs = {}
+
+
+##
+# getBodyStruct
+#
+# Return: the Struct for the part of an encoded state after the header
+def getBodyStruct(numAnts, numConstrs, numCells, explicitCoords):
+    key = (numAnts, numConstrs, numCells, explicitCoords)
+    body = bodyStructs.get(key)
+    if body is None:
+        body = struct.Struct("<" + ANT_FORMAT * numAnts + CONSTR_FORMAT * numConstrs + CELL_FORMAT * numCells
+                             + ("%dB" % NUM_CELLS if explicitCoords else ""))
+        bodyStructs[key] = body
+    return body
+
+
+##
+# constrKey
+#
+# Return: a tuple that is the same for constructions that encode the same
+def constrKey(constr):
+    if type(constr) is Building:
+        return (tuple(constr.coords), constr.type, constr.player, constr.captureHealth)
+    return (tuple(constr.coords), constr.type)
+
+
+##
+# getLayout
+#
+# Return: LAYOUT_STANDARD, LAYOUT_FLIPPED or LAYOUT_EXPLICIT for a board
+def getLayout(board):
+    coords = [loc.coords for col in board for loc in col]
+    if coords == STANDARD_COORDS:
+        return LAYOUT_STANDARD
+    if coords == FLIPPED_COORDS:
+        return LAYOUT_FLIPPED
+    return LAYOUT_EXPLICIT
+
+
+##
+# boardFromInventories
+#
+# Description: Checks whether a board holds exactly the inventories' ants and
+#   buildings (the same objects) and their grass and food, one per cell and
+#   nothing else.  That's how clone() and the game lay out a board, so the
+#   board needn't be stored.  The grass and food must be either all the
+#   inventory's objects (the game's own state) or all copies (clone()).  The
+#   copies may also all still have the coords from before flipBoard, which
+#   only moves the inventory's ones (clone() of a flipped state).
+#
+# Return: None if not, else the flags that say how the grass and food are laid
+#   out: NEUTRAL_SHARED, NEUTRAL_MIRRORED or 0 for plain copies
+def boardFromInventories(state):
+    inventories = state.inventories
+    expectedAnts = [None] * NUM_CELLS
+    expectedConstrs = [None] * NUM_CELLS
+    for inv in inventories:
+        for ant in inv.ants:
+            cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+            if expectedAnts[cell] is not None:
+                return None
+            expectedAnts[cell] = ant
+    for inv in inventories[:NEUTRAL]:
+        for constr in inv.constrs:
+            cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+            if expectedConstrs[cell] is not None or type(constr) is not Building:
+                return None
+            expectedConstrs[cell] = constr
+    boardAnts = [loc.ant for col in state.board for loc in col]
+    if boardAnts != expectedAnts:
+        return None
+
+    #the grass and food have to be checked one by one
+    boardConstrs = [loc.constr for col in state.board for loc in col]
+    layouts = set()
+    for constr in inventories[NEUTRAL].constrs:
+        x, y = constr.coords
+        cell = x * BOARD_LENGTH + y
+        onBoard = boardConstrs[cell]
+        if expectedConstrs[cell] is not None or onBoard is None or type(onBoard) is Building or \
+                type(constr) is Building:
+            return None
+        if onBoard is constr:
+            layouts.add(NEUTRAL_SHARED)
+        elif onBoard.type != constr.type:
+            return None
+        elif onBoard.coords[0] == x and onBoard.coords[1] == y:
+            layouts.add(0)
+        elif onBoard.coords[0] == BOARD_LENGTH - 1 - x and onBoard.coords[1] == BOARD_LENGTH - 1 - y:
+            layouts.add(NEUTRAL_MIRRORED)
+        else:
+            return None
+        expectedConstrs[cell] = onBoard
+    if len(layouts) > 1 or boardConstrs != expectedConstrs:
+        return None
+    return layouts.pop() if layouts else 0
+
+
+##
+# encodeState
+#
+# Parameters:
+#   state - a GameState (with or without a board), coords all on the board
+#
+# Return: the encoded state (bytes)
+def encodeState(state):
+    inventories = state.inventories
+    ants = inventories[PLAYER_ONE].ants + inventories[PLAYER_TWO].ants + inventories[NEUTRAL].ants
+    constrs = inventories[PLAYER_ONE].constrs + inventories[PLAYER_TWO].constrs + inventories[NEUTRAL].constrs
+    numInventoryAnts = len(ants)
+    numInventoryConstrs = len(constrs)
+    flags = 0
+    layout = LAYOUT_STANDARD
+    cells = []
+    board = state.board
+    if board is not None:
+        flags |= HAS_BOARD
+        layout = getLayout(board)
+        neutralFlags = boardFromInventories(state)
+        if neutralFlags is not None:
+            flags |= BOARD_FROM_INVENTORIES | neutralFlags
+        else:
+            cells = listBoardEntries(board, ants, constrs)
+    if len(ants) > MAX_OBJECTS or len(constrs) > MAX_OBJECTS:
+        raise ValueError("too many ants or constructions to encode")
+
+    values = [STATE_VERSION, state.phase, state.whoseTurn, flags, layout]
+    for inv in inventories:
+        values += (inv.foodCount, len(inv.ants), len(inv.constrs))
+    values += (len(ants) - numInventoryAnts, len(constrs) - numInventoryConstrs, len(cells) // 3)
+    for ant in ants:
+        values += (ant.UniqueID, ant.coords[0] * BOARD_LENGTH + ant.coords[1], ant.type, ant.player, ant.health,
+                   (MOVED_FLAG if ant.hasMoved else 0) | (CARRYING_FLAG if ant.carrying else 0))
+    for constr in constrs:
+        if type(constr) is Building:
+            values += (constr.coords[0] * BOARD_LENGTH + constr.coords[1], constr.type, constr.player,
+                       constr.captureHealth)
+        else:
+            values += (constr.coords[0] * BOARD_LENGTH + constr.coords[1], constr.type, NO_OWNER, 0)
+    values += cells
+    if layout == LAYOUT_EXPLICIT:
+        values += [loc.coords[1] * BOARD_LENGTH + loc.coords[0] for col in board for loc in col]
+
+    body = getBodyStruct(len(ants), len(constrs), len(cells) // 3, layout == LAYOUT_EXPLICIT)
+    return HEADER.pack(*values[:HEADER_VALUES]) + body.pack(*values[HEADER_VALUES:])
+
+
+##
+# listBoardEntries
+#
+# Description: Lists (cell, ant ref, constr ref) of every cell with something on
+#   it, adding anything not in the inventories to ants and constrs
+#
+# Return: the entries as one flat list
+def listBoardEntries(board, ants, constrs):
+    antRefs = dict((id(ant), i) for i, ant in enumerate(ants))
+    constrRefs = dict((id(constr), i) for i, constr in enumerate(constrs))
+    copyRefs = {}
+    for i, constr in enumerate(constrs):
+        copyRefs.setdefault(constrKey(constr), i | COPY_REF)
+    cells = []
+    cell = 0
+    for col in board:
+        for loc in col:
+            if loc.ant is not None or loc.constr is not None:
+                antRef = NO_REF
+                if loc.ant is not None:
+                    antRef = antRefs.get(id(loc.ant))
+                    if antRef is None:
+                        antRef = antRefs[id(loc.ant)] = len(ants)
+                        ants.append(loc.ant)
+                constrRef = NO_REF
+                if loc.constr is not None:
+                    constrRef = constrRefs.get(id(loc.constr))
+                    if constrRef is None:
+                        constrRef = copyRefs.get(constrKey(loc.constr))
+                    if constrRef is None:
+                        constrRef = constrRefs[id(loc.constr)] = len(constrs)
+                        constrs.append(loc.constr)
+                cells += (cell, antRef, constrRef)
+            cell += 1
+    return cells
+
+
+##
+# decodeState
+#
+# Parameters:
+#   data - a state encoded by encodeState (bytes-like)
+#
+# Return: a new GameState
+def decodeState(data):
+    header = HEADER.unpack_from(data)
+    version, phase, whoseTurn, flags, layout = header[:5]
+    if version != STATE_VERSION:
+        raise ValueError("can't decode state version %d" % version)
+    antCounts = (header[6], header[9], header[12])
+    constrCounts = (header[7], header[10], header[13])
+    numAnts = sum(antCounts) + header[14]
+    numConstrs = sum(constrCounts) + header[15]
+    numCells = header[16]
+    values = getBodyStruct(numAnts, numConstrs, numCells, layout == LAYOUT_EXPLICIT).unpack_from(data, HEADER.size)
+
+    ants = []
+    i = 0
+    for n in range(numAnts):
+        uniqueId, cell, antType, player, health, antFlags = values[i:i + 6]
+        ant = Ant(CELL_COORDS[cell], antType, player, uniqueId)
+        ant.health = health
+        ant.hasMoved = bool(antFlags & MOVED_FLAG)
+        ant.carrying = bool(antFlags & CARRYING_FLAG)
+        ants.append(ant)
+        i += 6
+    if ants:
+        #ants made here from now on mustn't get the ids of the decoded ones
+        noteAntId(max([ant.UniqueID for ant in ants]))
+    constrs = []
+    for n in range(numConstrs):
+        cell, constrType, owner, captureHealth = values[i:i + 4]
+        if owner == NO_OWNER:
+            constrs.append(Construction(CELL_COORDS[cell], constrType))
+        else:
+            constrs.append(Building(CELL_COORDS[cell], constrType, owner, captureHealth))
+        i += 4
+
+    inventories = []
+    antStart = 0
+    constrStart = 0
+    for playerId in range(3):
+        inventories.append(Inventory(playerId, ants[antStart:antStart + antCounts[playerId]],
+                                     constrs[constrStart:constrStart + constrCounts[playerId]],
+                                     header[5 + 3 * playerId]))
+        antStart += antCounts[playerId]
+        constrStart += constrCounts[playerId]
+
+    board = None
+    if flags & HAS_BOARD:
+        if layout == LAYOUT_STANDARD:
+            coords = STANDARD_COORDS
+        elif layout == LAYOUT_FLIPPED:
+            coords = FLIPPED_COORDS
+        else:
+            coords = [CELL_COORDS[cell][::-1] for cell in values[i + 3 * numCells:]]
+        board = [[Location(coords[x * BOARD_LENGTH + y]) for y in range(BOARD_LENGTH)]
+                 for x in range(BOARD_LENGTH)]
+        if flags & BOARD_FROM_INVENTORIES:
+            for ant in ants:
+                board[ant.coords[0]][ant.coords[1]].ant = ant
+            firstNeutral = constrCounts[PLAYER_ONE] + constrCounts[PLAYER_TWO]
+            for n, constr in enumerate(constrs):
+                x, y = constr.coords
+                if n >= firstNeutral and not flags & NEUTRAL_SHARED:
+                    if flags & NEUTRAL_MIRRORED:
+                        constr = Construction((BOARD_LENGTH - 1 - x, BOARD_LENGTH - 1 - y), constr.type)
+                    else:
+                        constr = constr.clone()
+                board[x][y].constr = constr
+        else:
+            for n in range(numCells):
+                cell, antRef, constrRef = values[i:i + 3]
+                loc = board[cell // BOARD_LENGTH][cell % BOARD_LENGTH]
+                if antRef != NO_REF:
+                    loc.ant = ants[antRef]
+                if constrRef != NO_REF:
+                    constr = constrs[constrRef & MAX_OBJECTS]
+                    loc.constr = constr.clone() if constrRef & COPY_REF else constr
+                i += 3
+
+    return GameState(board, inventories, phase, whoseTurn)
+
+
+##
+# isMoveValue
+#
+# Return: True if value is an int that fits a Move's moveType or buildType
+def isMoveValue(value):
+    return type(value) is int and NO_BUILD_TYPE < value <= 127
+
+
+##
+# canEncodeMove
+#
+# Description: Checks that decodeMove would give back exactly the move: a Move
+#   with int moveType and buildType (or None) and a list of (x, y) tuples of
+#   ints on the board (or None)
+#
+# Return: True or False
+def canEncodeMove(move):
+    if type(move) is not Move or not isMoveValue(move.moveType):
+        return False
+    if move.buildType is not None and not isMoveValue(move.buildType):
+        return False
+    if move.coordList is None:
+        return True
+    if type(move.coordList) is not list or len(move.coordList) >= NO_COORD_LIST:
+        return False
+    for coord in move.coordList:
+        if type(coord) is not tuple or len(coord) != 2 or type(coord[0]) is not int \
+                or type(coord[1]) is not int or not legalCoord(coord):
+            return False
+    return True
+
+
+##
+# encodeMove
+#
+# Parameters:
+#   move - a Move that canEncodeMove accepts
+#
+# Return: a Move encoded as bytes
+def encodeMove(move):
+    if not canEncodeMove(move):
+        raise ValueError("can't encode %s" % str(move))
+    buildType = NO_BUILD_TYPE if move.buildType is None else move.buildType
+    if move.coordList is None:
+        return MOVE_HEADER.pack(move.moveType, buildType, NO_COORD_LIST)
+    return MOVE_HEADER.pack(move.moveType, buildType, len(move.coordList)) + \
+        bytes([coord[0] * BOARD_LENGTH + coord[1] for coord in move.coordList])
+
+
+##
+# decodeMove
+#
+# Return: the Move encoded in data by encodeMove
+def decodeMove(data):
+    moveType, buildType, length = MOVE_HEADER.unpack_from(data)
+    coordList = None
+    if length != NO_COORD_LIST:
+        start = MOVE_HEADER.size
+        coordList = [CELL_COORDS[cell] for cell in data[start:start + length]]
+    return Move(moveType, coordList, None if buildType == NO_BUILD_TYPE else buildType)
+
+
+##
+#CompactGameState
+#Description: A GameState kept encoded (see encodeState), for holding on to
+#   many states that are seldom looked at, such as undo history.  It is a few
+#   hundred bytes instead of a board of 100 Locations, and clone() is just
+#   another reference to the same bytes.
+#
+#   Agents can read it like a GameState (state.board[x][y].ant,
+#   state.inventories[i].ants, ...): the first read decodes the bytes into a
+#   GameState that later reads share.  It is a read only view; to change the
+#   state, decode your own copy with toGameState().
+#
+#Variables:
+#   data - the encoded state (bytes)
+#   view - the decoded GameState, None until something is read
+##
+class CompactGameState(object):
+
+    ##
+    #__init__
+    #Description: Wraps an encoded state.  Use fromGameState to encode one.
+    #
+    #Parameters:
+    #   data - a state encoded by encodeState (bytes)
+    ##
+    def __init__(self, data):
+        self.data = data
+        self.view = None
+
+    ##
+    #fromGameState
+    #
+    #Parameters:
+    #   state - the GameState to encode (it isn't kept)
+    #
+    #Return: a CompactGameState
+    ##
+    @staticmethod
+    def fromGameState(state):
+        return CompactGameState(encodeState(state))
+
+    ##
+    #clone
+    #Description: Returns a copy of the state, which shares the (immutable) bytes
+    ##
+    def clone(self):
+        return CompactGameState(self.data)
+
+    ##
+    #toGameState
+    #
+    #Return: a new GameState of its own, as clone() would have made it
+    ##
+    def toGameState(self):
+        return decodeState(self.data)
+
+    ##
+    #getView
+    #
+    #Return: the decoded GameState reads go to, decoding it the first time
+    ##
+    def getView(self):
+        if self.view is None:
+            self.view = decodeState(self.data)
+        return self.view
+
+    def __getattr__(self, name):
+        #only called for what isn't set above, i.e. the GameState's attributes
+        if name in ("data", "view"):
+            raise AttributeError(name)
+        return getattr(self.getView(), name)
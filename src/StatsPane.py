@@ -77,6 +77,12 @@ class StatsPane:
         self.totalsTextLabel.pack(side=tkinter.TOP, fill=tkinter.X)
         self.tFrame.columnconfigure(0, weight=1)
 
+        # per agent move timings, under the totals
+        self.latencyStrVar = tkinter.StringVar()
+        self.latencyTextLabel = tkinter.Label(self.tFrame.interior, textvar=self.latencyStrVar, fg="black", \
+                                              bg="white", font=("Courier", 11), justify=tkinter.LEFT, anchor=tkinter.NW)
+        self.latencyTextLabel.pack(side=tkinter.TOP, fill=tkinter.X)
+
         self.totalsLabel.pack(side=tkinter.TOP, fill=tkinter.X)
         
         self.tFrame.pack()
@@ -158,6 +164,9 @@ class StatsPane:
         #self.tFrame.canvas.config(height=2000)
         self.totalsStrVar.set ( s )
 
+    def setLatencyRecord ( self, s ) :
+        self.latencyStrVar.set ( s )
+
     def addGameToLog ( self ) :
         return
 
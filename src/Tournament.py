@@ -0,0 +1,377 @@
+import os, sys, time, multiprocessing
+import traceback
+from Constants import *
+from MatchEngine import MatchEngine, deriveSeed
+from Latency import LatencyStats
+from AgentRegistry import AgentRegistry
+
+##
+# Tournament.py
+#
+# Plays independent AI vs. AI games on a pool of worker processes.  Each
+# worker finds the agents in the AI folder once when it starts (importing each
+# one the first time it plays, see AgentRegistry) and then plays
+# the games it is handed with a MatchEngine, sending back only who won and
+# how long the calls into the agents took.
+#
+# A game is described by a job tuple:
+#   (author1, author2, flipped, seed)
+# where author2 may name a copy of an agent ("<author>@@", see Game.createAICopy),
+# flipped means author2 moves first and seed is the game's seed (None for a
+# fresh one).  A game played with the same seed is played the same way by
+# agents that take their random numbers from Player.random, whichever worker
+# plays it.  The result of a job is (winner, latency) where winner is 0 if
+# author1 won, 1 if author2 won or None if the game had no winner and latency
+# is the game's LatencyStats.
+#
+# A game that goes on for longer than the runner's gameTimeout (an agent stuck
+# where no time limit can reach it) is abandoned without a winner: the pool is
+# torn down, which is the only way to stop one of its workers, and the games
+# that were still being played are handed to a new one.
+#
+
+#seconds an isolated game may take before it is abandoned, when no gameTimeout is given
+ISOLATED_GAME_TIMEOUT = 600
+
+#the agents in the AI folder (an AgentRegistry), imported by this worker as it needs them
+workerAgents = None
+#the copies used for self play: author -> Player
+workerCopies = {}
+#the time and turn limits for games played by this worker
+workerLimits = (None, None)
+#where this worker saves game records (None to not save them)
+workerRecordDir = None
+
+#whether the time limit is on the agents' CPU time
+workerCpuTime = False
+
+
+##
+# initWorker
+#
+# pool initializer, finds the agents once per worker process
+#
+# Parameters:
+#   aiDir - the folder the agents live in
+#   timeoutLimit - max seconds per player call or None
+#   turnLimit - max turns per game or None
+#   recordDir - folder to save game records in or None
+#   cpuTime - True if timeoutLimit is in CPU seconds
+def initWorker(aiDir, timeoutLimit, turnLimit, recordDir=None, cpuTime=False):
+    global workerAgents, workerLimits, workerRecordDir, workerCpuTime
+    workerAgents = AgentRegistry(aiDir)
+    workerLimits = (timeoutLimit, turnLimit)
+    workerRecordDir = recordDir
+    workerCpuTime = cpuTime
+
+
+##
+# getWorkerAgent
+#
+# finds the Player for an author in this worker, making the copy used for
+# self play the first time it is asked for
+#
+# Parameters:
+#   author - the author of the agent, with "@@" appended for a copy
+#
+# Return: a Player
+def getWorkerAgent(author):
+    if author.endswith("@@"):
+        if author not in workerCopies:
+            workerCopies[author] = workerAgents.find(author[:-2]).makeCopy()
+        return workerCopies[author]
+    return workerAgents.find(author).getPlayer()
+
+
+##
+# playJob
+#
+# plays one game in a worker process
+#
+# Parameters:
+#   job - (author1, author2, flipped, seed)
+#
+# Return: (winner, latency) - winner is 0 if author1 won, 1 if author2 won,
+#   None if nobody did and latency is the game's LatencyStats
+def playJob(job):
+    author1, author2, flipped, seed = job
+    players = [getWorkerAgent(author1), getWorkerAgent(author2)]
+    if flipped:
+        players = players[::-1]
+
+    engine = MatchEngine(players[0], players[1], workerLimits[0], workerLimits[1], workerRecordDir, seed,
+                         workerCpuTime)
+    try:
+        winner = engine.play()
+    except Exception:
+        # a crashing agent loses the game, just like an invalid move
+        traceback.print_exc()
+        if engine.gameOver or engine.state is None:
+            winner = engine.winner
+        else:
+            winner = 1 - engine.state.whoseTurn
+            engine.setWinner(winner)
+
+    if winner is not None and flipped:
+        winner = 1 - winner
+    return winner, engine.latency
+
+
+##
+# TournamentRunner
+# Description: Spreads games over a pool of worker processes.  Results are
+#   always handed back in the order the games were submitted, so merging them
+#   into score tables gives the same answer however the pool schedules them.
+#
+# Variables:
+#   aiDir - the folder the workers load agents from
+#   numWorkers - the number of worker processes
+#   timeoutLimit - max seconds per player call or None
+#   cpuTime - whether timeoutLimit counts CPU seconds instead of wall-clock seconds
+#   turnLimit - max turns per game or None
+#   recordDir - folder the workers save a GameRecord of every game in, or None
+#   isolate - whether every game gets a fresh worker process
+#   gameTimeout - max seconds a game may take or None
+#   latency - the timings of every game run has played (LatencyStats)
+#   pending - the GameResults not yet collected, in the order they were submitted
+##
+class TournamentRunner(object):
+
+    ##
+    # __init__
+    # Description: Creates a new TournamentRunner.  The pool is started lazily.
+    #
+    # Parameters:
+    #   aiDir - the folder the agents live in (str)
+    #   numWorkers - the number of processes to use, None for one per core (int)
+    #   timeoutLimit - max seconds per player call, None for no limit (float)
+    #   turnLimit - max turns per game, None for no limit (int)
+    #   recordDir - folder to save game records in, None to not save them (str)
+    #   isolate - play every game in a fresh worker process, so an agent thread
+    #             left running after a timeout dies with its game (bool)
+    #   cpuTime - limit the agents' CPU time instead of wall-clock time, so a
+    #             busy machine doesn't make them lose on time (bool)
+    #   gameTimeout - abandon a game that takes longer than this many seconds,
+    #                 None for ISOLATED_GAME_TIMEOUT with isolate and no limit
+    #                 without (float)
+    ##
+    def __init__(self, aiDir, numWorkers=None, timeoutLimit=None, turnLimit=None, recordDir=None,
+                 isolate=False, cpuTime=False, gameTimeout=None):
+        self.aiDir = os.path.abspath(aiDir)
+        self.numWorkers = numWorkers or multiprocessing.cpu_count()
+        self.timeoutLimit = timeoutLimit
+        self.turnLimit = turnLimit
+        self.recordDir = os.path.abspath(recordDir) if recordDir is not None else None
+        self.isolate = isolate
+        self.cpuTime = cpuTime
+        if gameTimeout is None and isolate:
+            gameTimeout = ISOLATED_GAME_TIMEOUT
+        self.gameTimeout = gameTimeout
+        self.latency = LatencyStats()
+        self.pending = []
+        self.pool = None
+
+    ##
+    # start
+    # Description: Starts the worker processes if they aren't running
+    ##
+    def start(self):
+        if self.pool is None:
+            # spawn rather than fork so workers don't inherit the GUI threads
+            context = multiprocessing.get_context("spawn")
+            # pool workers can't start processes of their own for the agents
+            # (see AgentProcess), so isolation replaces the whole worker instead
+            self.pool = context.Pool(self.numWorkers, initWorker,
+                                     (self.aiDir, self.timeoutLimit, self.turnLimit, self.recordDir,
+                                      self.cpuTime),
+                                     maxtasksperchild=1 if self.isolate else None)
+
+    ##
+    # submit
+    # Description: Queues games to be played
+    #
+    # Parameters:
+    #   jobs - a list of (author1, author2, flipped, seed) tuples
+    #
+    # Return: a list of GameResult, one per job, in the same order.  Each gives
+    #   (winner, latency) like playJob.
+    ##
+    def submit(self, jobs):
+        self.start()
+        results = [GameResult(self, job) for job in jobs]
+        self.pending += results
+        return results
+
+    ##
+    # abandon
+    # Description: Gives up on a game that has run out of time.  The workers
+    #   are replaced and the games that hadn't finished are played again.
+    #
+    # Parameters:
+    #   stuck - the GameResult of the game to give up on
+    ##
+    def abandon(self, stuck):
+        if stuck not in self.pending:
+            # thrown away by cancel
+            return
+        print("%s vs. %s abandoned after %s seconds" % (stuck.job[0], stuck.job[1], self.gameTimeout),
+              file=sys.stderr)
+        stuck.setValue((None, LatencyStats()))
+        for result in self.pending[:]:
+            if result.asyncResult.ready() and result.asyncResult.successful():
+                result.collect()
+        unfinished = self.pending
+        self.cancel()
+        self.start()
+        for result in unfinished:
+            result.asyncResult = self.pool.apply_async(playJob, (result.job,))
+        self.pending = unfinished
+
+    ##
+    # run
+    # Description: Plays all the given games and waits for them to finish
+    #
+    # Parameters:
+    #   jobs - a list of (author1, author2, flipped, seed) tuples
+    #
+    # Return: the winner of each job (0, 1 or None) in job order.  The timings
+    #   of the games are added to self.latency.
+    ##
+    def run(self, jobs):
+        results = [result.get() for result in self.submit(jobs)]
+        for winner, latency in results:
+            self.latency.merge(latency)
+        return [winner for winner, latency in results]
+
+    ##
+    # cancel
+    # Description: Throws away any queued games and stops the workers.  The
+    #   results of the games thrown away are never ready.
+    ##
+    def cancel(self):
+        self.pending = []
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    ##
+    # close
+    # Description: Stops the workers once they finish what they are doing
+    ##
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+##
+# GameResult
+# Description: The result of a game submitted to a TournamentRunner, used like
+#   the AsyncResult of the pool it is played on.  The game's time starts when
+#   something first waits for its result: games are handed to the workers in
+#   the order they are submitted and are collected in that order, so by then
+#   the game is being played.
+#
+# Variables:
+#   runner - the TournamentRunner playing the game
+#   job - the game's job tuple
+#   asyncResult - the AsyncResult of the game on the current pool
+#   value - (winner, latency) once collected, None until then
+#   waitStart - when the first wait for the game began (perf_counter seconds)
+##
+class GameResult(object):
+
+    def __init__(self, runner, job):
+        self.runner = runner
+        self.job = job
+        self.asyncResult = runner.pool.apply_async(playJob, (job,))
+        self.value = None
+        self.waitStart = None
+
+    def ready(self):
+        return self.value is not None or self.asyncResult.ready()
+
+    ##
+    # wait
+    # Description: Waits for the game to finish, abandoning it if it runs out of time
+    #
+    # Parameters:
+    #   timeout - the most seconds to wait, None to wait until it finishes
+    ##
+    def wait(self, timeout=None):
+        if self.value is not None:
+            return
+        if self.waitStart is None:
+            self.waitStart = time.perf_counter()
+        if self.runner.gameTimeout is None:
+            self.asyncResult.wait(timeout)
+            return
+
+        left = self.waitStart + self.runner.gameTimeout - time.perf_counter()
+        self.asyncResult.wait(max(left, 0) if timeout is None else max(min(timeout, left), 0))
+        if not self.asyncResult.ready() and time.perf_counter() >= self.waitStart + self.runner.gameTimeout:
+            self.runner.abandon(self)
+
+    ##
+    # get
+    # Description: Waits for the game to finish
+    #
+    # Return: (winner, latency) like playJob
+    ##
+    def get(self):
+        while not self.ready():
+            self.wait()
+        if self.value is None:
+            self.collect()
+        return self.value
+
+    ##
+    # collect
+    # Description: Takes the result of a finished game from the pool
+    ##
+    def collect(self):
+        self.setValue(self.asyncResult.get())
+
+    def setValue(self, value):
+        self.value = value
+        if self in self.runner.pending:
+            self.runner.pending.remove(self)
+
+
+##
+# makeJobs
+#
+# builds the job list for a pairing, alternating who goes first if asked to
+#
+# Parameters:
+#   author1 - the first player's author
+#   author2 - the second player's author
+#   numGames - number of games to play
+#   swap - whether to let author2 move first in every other game
+#   masterSeed - seed the games' seeds are derived from, None for unseeded games
+#
+# Return: a list of job tuples
+def makeJobs(author1, author2, numGames, swap=False, masterSeed=None):
+    return [(author1, author2, swap and j % 2 == 1, getGameSeed(masterSeed, author1, author2, j))
+            for j in range(numGames)]
+
+
+##
+# getGameSeed
+#
+# the seed of one game of a pairing, the same whether the game is played in a
+# worker or by Game itself
+#
+# Parameters:
+#   masterSeed - the tournament's master seed or None
+#   author1 - the first player's author
+#   author2 - the second player's author
+#   gameNumber - which game of the pairing (int)
+#
+# Return: the seed, None if there is no master seed
+def getGameSeed(masterSeed, author1, author2, gameNumber):
+    if masterSeed is None:
+        return None
+    return deriveSeed(masterSeed, author1, author2, gameNumber)
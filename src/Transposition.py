@@ -0,0 +1,279 @@
+import random
+from Constants import *
+
+##
+# Transposition.py
+#
+# Zobrist hashing of GameStates and a fixed size transposition table, so a
+# search can notice it has reached the same position by a different ordering
+# of moves (e.g. moving the worker then the drone instead of the drone then
+# the worker) and reuse what it already knows about it.
+#
+# The hash of a state is the XOR of one random 64-bit key for every fact about
+# it: each ant (cell, type, owner, health, carrying, hasMoved), each
+# construction (cell, type, owner, capture health), each player's food count,
+# the phase and whose turn it is.  Changing one fact only needs the old key
+# XORed out and the new one XORed in, which is how AIPlayerUtils.applyMove
+# keeps the hash current.
+#
+
+#the keys are always generated from the same seed so hashes are comparable
+#between processes and runs
+ZOBRIST_SEED = 0x5EED
+
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+NUM_ANT_TYPES = 5
+NUM_CONSTR_TYPES = 4
+#health, capture health and food are reduced mod these sizes (well above
+#anything reached in a game)
+HEALTH_KEYS = 16
+FOOD_KEYS = 64
+
+zobristRandom = random.Random(ZOBRIST_SEED)
+
+
+##
+# makeKeys
+#
+# builds a (possibly nested) list of random 64-bit keys with the given shape
+def makeKeys(*shape):
+    if len(shape) == 1:
+        return [zobristRandom.getrandbits(64) for i in range(shape[0])]
+    return [makeKeys(*shape[1:]) for i in range(shape[0])]
+
+
+#[cell][ant type][owner]
+ANT_KEYS = makeKeys(NUM_CELLS, NUM_ANT_TYPES, 2)
+#[cell][health]
+ANT_HEALTH_KEYS = makeKeys(NUM_CELLS, HEALTH_KEYS)
+#[cell]
+CARRYING_KEYS = makeKeys(NUM_CELLS)
+MOVED_KEYS = makeKeys(NUM_CELLS)
+#[cell][constr type - ANTHILL][owner, NEUTRAL for grass and food]
+CONSTR_KEYS = makeKeys(NUM_CELLS, NUM_CONSTR_TYPES, 3)
+#[cell][capture health]
+CAPTURE_KEYS = makeKeys(NUM_CELLS, HEALTH_KEYS)
+#[player][food]
+FOOD_COUNT_KEYS = makeKeys(2, FOOD_KEYS)
+#[phase]
+PHASE_KEYS = makeKeys(PLAY_PHASE + 1)
+TURN_KEY = zobristRandom.getrandbits(64)
+
+
+##
+# antKey
+#
+# Return: the part of the hash contributed by an ant with the given properties
+def antKey(coords, antType, player, health, carrying, hasMoved):
+    cell = coords[0] * BOARD_LENGTH + coords[1]
+    key = ANT_KEYS[cell][antType][player] ^ ANT_HEALTH_KEYS[cell][health % HEALTH_KEYS]
+    if carrying:
+        key ^= CARRYING_KEYS[cell]
+    if hasMoved:
+        key ^= MOVED_KEYS[cell]
+    return key
+
+
+##
+# constrKey
+#
+# Return: the part of the hash contributed by a construction with the given
+#   properties (player and captureHealth are None for grass and food)
+def constrKey(coords, constrType, player, captureHealth):
+    cell = coords[0] * BOARD_LENGTH + coords[1]
+    key = CONSTR_KEYS[cell][constrType - ANTHILL][NEUTRAL if player is None else player]
+    if captureHealth is not None:
+        key ^= CAPTURE_KEYS[cell][captureHealth % HEALTH_KEYS]
+    return key
+
+
+##
+# foodKey
+#
+# Return: the part of the hash contributed by a player's food count
+def foodKey(player, foodCount):
+    return FOOD_COUNT_KEYS[player][foodCount % FOOD_KEYS]
+
+
+##
+# objectKey
+#
+# Parameters:
+#   obj - an Ant, Construction or Inventory
+#   values - optional dict of attribute name -> value to use instead of the
+#            object's current attributes (used to hash what it *was*)
+#
+# Return: the part of the hash contributed by the object
+def objectKey(obj, values = None):
+    def get(name):
+        if values is not None and name in values:
+            return values[name]
+        return getattr(obj, name)
+
+    if hasattr(obj, "foodCount"):
+        if obj.player == NEUTRAL:
+            return 0
+        return foodKey(obj.player, get("foodCount"))
+    if hasattr(obj, "carrying"):
+        return antKey(get("coords"), obj.type, obj.player, get("health"), get("carrying"), get("hasMoved"))
+    if hasattr(obj, "captureHealth"):
+        return constrKey(get("coords"), obj.type, obj.player, get("captureHealth"))
+    return constrKey(get("coords"), obj.type, None, None)
+
+
+##
+# computeHash
+#
+# Description: Hashes a state from scratch.  The board isn't needed, so this
+# works for states made by fastclone.
+#
+# Parameters:
+#   state - the GameState to hash
+#
+# Return: a 64-bit int
+def computeHash(state):
+    key = PHASE_KEYS[state.phase]
+    if state.whoseTurn == PLAYER_TWO:
+        key ^= TURN_KEY
+    for inv in state.inventories:
+        key ^= objectKey(inv)
+        for ant in inv.ants:
+            key ^= objectKey(ant)
+        for constr in inv.constrs:
+            key ^= objectKey(constr)
+    return key
+
+
+##
+# zobristHash
+#
+# Description: Returns the hash of a state, computing it only the first time.
+# The hash is stored on the state (GameState.hashKey) and kept current by
+# AIPlayerUtils.applyMove/undoMove.  Anything else that changes the state
+# should set hashKey back to None.
+#
+# Parameters:
+#   state - the GameState to hash
+#
+# Return: a 64-bit int
+def zobristHash(state):
+    key = getattr(state, "hashKey", None)
+    if key is None:
+        key = computeHash(state)
+        state.hashKey = key
+    return key
+
+
+#Kinds of value stored in the table
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+##
+#TableEntry
+#Description: What the table remembers about one position
+#
+#Variables:
+#   key - the full hash of the position
+#   depth - how deep the search below the position was (deeper is better)
+#   value - the value found for it
+#   flag - EXACT, LOWER_BOUND or UPPER_BOUND (alpha-beta cut offs only give bounds)
+#   bestMove - the best move found from the position (or None)
+#   age - the search (see TranspositionTable.newSearch) that stored it
+##
+class TableEntry(object):
+
+    def __init__(self, key, depth, value, flag, bestMove, age):
+        self.key = key
+        self.depth = depth
+        self.value = value
+        self.flag = flag
+        self.bestMove = bestMove
+        self.age = age
+
+
+##
+#TranspositionTable
+#Description: A fixed number of slots indexed by the low bits of the hash.
+#   When two positions want the same slot the new one wins if the old entry
+#   is from an earlier search or wasn't searched any deeper, so useful deep
+#   results survive while stale ones get recycled.  Memory use never grows
+#   past the number of slots.
+#
+#Variables:
+#   size - number of slots (a power of two)
+#   slots - the entries (TableEntry or None)
+#   age - the current search number
+#   hits, misses - lookup counters
+##
+class TranspositionTable(object):
+
+    ##
+    #__init__
+    #
+    #Parameters:
+    #   size - the number of slots, rounded up to a power of two (int)
+    ##
+    def __init__(self, size = 1 << 16):
+        self.size = 1
+        while self.size < size:
+            self.size <<= 1
+        self.mask = self.size - 1
+        self.slots = [None] * self.size
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+
+    ##
+    #newSearch
+    #Description: Call at the start of each move's search.  Entries from earlier
+    #   searches are still used but may be replaced by anything new.
+    ##
+    def newSearch(self):
+        self.age += 1
+
+    ##
+    #lookup
+    #
+    #Parameters:
+    #   key - the position's hash (see zobristHash)
+    #
+    #Return: the TableEntry for that position or None
+    ##
+    def lookup(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    ##
+    #store
+    #Description: Remembers a result, subject to the replacement policy
+    #
+    #Parameters:
+    #   key - the position's hash
+    #   depth - the depth searched below the position (an evaluation is depth 0)
+    #   value - the value found
+    #   flag - EXACT, LOWER_BOUND or UPPER_BOUND
+    #   bestMove - the best move found or None
+    ##
+    def store(self, key, depth, value, flag = EXACT, bestMove = None):
+        slot = key & self.mask
+        entry = self.slots[slot]
+        if entry is None or entry.age != self.age or depth >= entry.depth:
+            if entry is not None and entry.key == key and bestMove is None:
+                bestMove = entry.bestMove  #don't forget a known good move
+            self.slots[slot] = TableEntry(key, depth, value, flag, bestMove, self.age)
+
+    ##
+    #clear
+    #Description: Forgets everything
+    ##
+    def clear(self):
+        self.slots = [None] * self.size
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
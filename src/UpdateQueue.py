@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+##
+# UpdateQueue.py
+#
+# Hands UI updates from the game thread to the Tk thread.  The game thread
+# posts an update (a function and its arguments) under a key and carries on;
+# the Tk thread drains the queue a limited number of times a second (see
+# GUIHandler.drainUpdates).  An update replaces any update still waiting under
+# the same key, so when the game runs faster than the window is redrawn the
+# board skips the states in between instead of holding the game up.
+#
+#       updates.post("state", gameHandler.setToGameState, state)
+#       ...
+#       updates.drain()         #on the Tk thread: draws the last state posted
+#
+
+#how many times a second the window is brought up to date by default
+DEFAULT_MAX_FPS = 30
+
+
+##
+#UpdateQueue
+#Description: A queue of UI updates that keeps only the latest one for each key
+#
+#Variables:
+#   lock - guards pending
+#   pending - key -> (function, args) of the updates not drained yet, in the
+#       order they were last posted
+#   dropped - how many updates were replaced before they were drained
+##
+class UpdateQueue(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.dropped = 0
+
+    ##
+    #post
+    #Description: Queues an update, replacing the one waiting under the same key
+    #
+    #Parameters:
+    #   key - what the update updates (hashable)
+    #   function - the function to call on the Tk thread
+    #   args - the arguments to call it with
+    ##
+    def post(self, key, function, *args):
+        with self.lock:
+            if self.pending.pop(key, None) is not None:
+                self.dropped += 1
+            self.pending[key] = (function, args)
+
+    ##
+    #drain
+    #Description: Applies the waiting updates, oldest first.  Called on the Tk
+    #   thread.
+    #
+    #Return: the number of updates applied
+    ##
+    def drain(self):
+        with self.lock:
+            updates = list(self.pending.values())
+            self.pending.clear()
+        for function, args in updates:
+            function(*args)
+        return len(updates)
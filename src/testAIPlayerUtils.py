@@ -0,0 +1,165 @@
+import random
+import unittest
+from Constants import *
+from Ant import Ant
+from Construction import Construction
+from GameState import GameState, OccupancyIndex
+from AIPlayerUtils import *
+from Transposition import computeHash, zobristHash
+
+##
+# testAIPlayerUtils.py
+#
+# Tests for the move making in AIPlayerUtils: applyMove and undoMove are
+# played against getNextStateAdversarial, with the Zobrist hash and the
+# occupancy index checked after every move.
+#
+#       python -m unittest testAIPlayerUtils
+#
+
+
+##
+# playState
+#
+# Return: a board in the play phase with food, grass and some ants for each
+#   side to play out from (a fastclone, so it has no board)
+def playState():
+    state = GameState.getBasicState()
+    state.inventories[PLAYER_ONE].ants.append(Ant((1, 1), WORKER, PLAYER_ONE))
+    state.inventories[PLAYER_TWO].ants.append(Ant((8, 8), WORKER, PLAYER_TWO))
+    # fighters in the middle and next to the enemy anthill so ants die and hills get captured
+    state.inventories[PLAYER_ONE].ants += [Ant((4, 4), SOLDIER, PLAYER_ONE), Ant((9, 7), DRONE, PLAYER_ONE)]
+    state.inventories[PLAYER_TWO].ants += [Ant((5, 5), SOLDIER, PLAYER_TWO), Ant((0, 2), DRONE, PLAYER_TWO)]
+    # the queens start off their anthills so the drones can get on them
+    state.inventories[PLAYER_ONE].getQueen().coords = (1, 0)
+    state.inventories[PLAYER_TWO].getQueen().coords = (8, 9)
+    for coords in ((2, 1), (7, 2), (2, 8), (7, 7)):
+        state.inventories[NEUTRAL].constrs.append(Construction(coords, FOOD))
+    for coords in ((4, 2), (5, 7)):
+        state.inventories[NEUTRAL].constrs.append(Construction(coords, GRASS))
+    state.inventories[PLAYER_ONE].foodCount = 4
+    state.inventories[PLAYER_TWO].foodCount = 4
+    state.phase = PLAY_PHASE
+    return state.fastclone()
+
+
+##
+# snapshot
+#
+# Return: everything about a state the moves can change, to compare states
+#   with (new ants get new ids, so those are left out)
+def snapshot(state):
+    return (state.phase, state.whoseTurn,
+            [(inv.foodCount,
+              [(tuple(ant.coords), ant.type, ant.player, ant.health, ant.carrying, ant.hasMoved)
+               for ant in inv.ants],
+              [(tuple(constr.coords), constr.type, getattr(constr, "captureHealth", None))
+               for constr in inv.constrs])
+             for inv in state.inventories])
+
+
+##
+#testApplyMove
+#Description: Plays random games on one state with applyMove and checks every
+#move against getNextStateAdversarial, then that undoMove takes it back.
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testApplyMove(unittest.TestCase):
+
+    ## the occupancy index was kept up to date instead of thrown away
+    def assertIndexCurrent(self, state):
+        index = state.index
+        self.assertTrue(index is not None and index.valid, "occupancy index was invalidated")
+        self.assertTrue(index.isCurrent(state), "occupancy index is stale")
+        ants = {}
+        constrs = {}
+        for inv in state.inventories:
+            for ant in inv.ants:
+                ants.setdefault(tuple(ant.coords), ant)
+            for constr in inv.constrs:
+                constrs.setdefault(tuple(constr.coords), constr)
+        self.assertEqual(set(index.ants), set(ants), "occupancy index lists the wrong ants")
+        for coords, ant in ants.items():
+            self.assertIs(index.ants[coords], ant)
+        self.assertEqual(set(index.constrs), set(constrs), "occupancy index lists the wrong constructions")
+
+    ## test applyMove() and undoMove() against getNextStateAdversarial()
+    def testRandomPlayouts(self):
+        rng = random.Random(6)
+        numMoves = 0
+        for game in range(20):
+            state = playState()
+            zobristHash(state)
+            state.getOccupancyIndex()
+            for ply in range(120):
+                if getWinner(state) is not None:
+                    break
+                move = rng.choice(listAllLegalMoves(state))
+                expected = getNextStateAdversarial(state, move)
+                before = snapshot(state)
+                hashBefore = state.hashKey
+
+                token = applyMove(state, move)
+                self.assertEqual(snapshot(state), snapshot(expected),
+                                 "applyMove and getNextStateAdversarial disagree on %s" % str(move))
+                self.assertEqual(state.hashKey, computeHash(state), "hash not updated by %s" % str(move))
+                self.assertIndexCurrent(state)
+
+                undoMove(state, token)
+                self.assertEqual(snapshot(state), before, "undoMove did not restore %s" % str(move))
+                self.assertEqual(state.hashKey, hashBefore, "undoMove did not restore the hash")
+                self.assertIndexCurrent(state)
+
+                applyMove(state, move)
+                numMoves += 1
+        self.assertGreater(numMoves, 1000)
+
+
+
+##
+#testOccupancyIndex
+#Description: Checks getAntAt and getConstrAt answer like a search of the
+#inventories would, however the state was changed.
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testOccupancyIndex(unittest.TestCase):
+
+    ## test an ant moved by setting its coords is found where it went
+    def testCoordsSetDirectly(self):
+        state = playState()
+        worker = getAntList(state, PLAYER_ONE, (WORKER,))[0]
+        self.assertIs(getAntAt(state, worker.coords), worker)
+        oldCoords = worker.coords
+        worker.coords = (1, 2)
+        self.assertIs(getAntAt(state, (1, 2)), worker)
+        self.assertIsNone(getAntAt(state, oldCoords))
+
+        #and moving it properly afterwards still keeps the index right
+        state.setAntCoords(worker, (2, 2))
+        self.assertIs(getAntAt(state, (2, 2)), worker)
+        self.assertIsNone(getAntAt(state, (1, 2)))
+
+    ## test ants added, removed or swapped in an inventory are noticed
+    def testInventoryChanged(self):
+        state = playState()
+        getAntAt(state, (0, 0))
+        ants = state.inventories[PLAYER_ONE].ants
+        worker = getAntList(state, PLAYER_ONE, (WORKER,))[0]
+        ants.remove(worker)
+        self.assertIsNone(getAntAt(state, worker.coords))
+        newWorker = Ant((3, 3), WORKER, PLAYER_ONE)
+        ants.append(newWorker)
+        self.assertIs(getAntAt(state, (3, 3)), newWorker)
+        drone = Ant((3, 3), DRONE, PLAYER_ONE)
+        ants[-1] = drone
+        self.assertIs(getAntAt(state, (3, 3)), drone)
+        state.inventories[NEUTRAL].constrs.append(Construction((3, 3), FOOD))
+        self.assertEqual(getConstrAt(state, (3, 3)).type, FOOD)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os, sys, shutil, tempfile, unittest
+from Constants import *
+from AgentRegistry import AgentRegistry
+
+##
+# testAgentRegistry.py
+#
+# Tests that AgentRegistry only imports the agents that are new or have
+# changed since the last scan, and leaves the import path as it found it.
+#
+#       python -m unittest testAgentRegistry
+#
+
+#an agent module, filled in with its author
+AGENT = """from Player import *
+
+class AIPlayer(Player):
+
+    def __init__(self, inputPlayerId):
+        super(AIPlayer, self).__init__(inputPlayerId, %r)
+"""
+
+
+##
+#testAgentRegistry
+#Description: Scans a temporary AI folder holding one agent, registryAgent.py
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testAgentRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.aiDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.aiDir, "registryAgent.py")
+        self.writeAgent("First")
+
+    def tearDown(self):
+        sys.modules.pop("registryAgent", None)
+        shutil.rmtree(self.aiDir)
+
+    ##
+    #writeAgent
+    #Description: Writes the agent with the given author, moving its mtime on
+    #   so the change can't go unnoticed however coarse the file system clock is
+    ##
+    def writeAgent(self, author):
+        mtime = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+        with open(self.path, "w") as f:
+            f.write(AGENT % author)
+        if mtime is not None:
+            os.utime(self.path, ns = (mtime + 10 ** 9, mtime + 10 ** 9))
+        #what a new process would do
+        sys.modules.pop("registryAgent", None)
+
+    ## test an unchanged agent is found from the cache and a changed one is imported again
+    def testRescanOnChange(self):
+        registry = AgentRegistry(self.aiDir)
+        self.assertEqual((registry.imported, registry.find("First").moduleName), (1, "registryAgent"))
+
+        sys.modules.pop("registryAgent", None)
+        registry = AgentRegistry(self.aiDir)
+        self.assertEqual(registry.imported, 0)
+        self.assertNotIn("registryAgent", sys.modules)
+        self.assertEqual(registry.find("First").getPlayer().author, "First")
+
+        self.writeAgent("Second")
+        registry = AgentRegistry(self.aiDir)
+        self.assertEqual(registry.imported, 1)
+        self.assertIsNone(registry.find("First"))
+        self.assertEqual(registry.find("Second").getPlayer().author, "Second")
+
+        registry = AgentRegistry(self.aiDir, useCache = False)
+        self.assertEqual(registry.imported, 1)
+
+    ## test the AI folder is only on the import path while an agent is imported
+    def testImportPath(self):
+        path = list(sys.path)
+        registry = AgentRegistry(self.aiDir)
+        self.assertEqual(sys.path, path)
+        sys.modules.pop("registryAgent", None)
+        registry.entries[0].makeCopy()
+        self.assertEqual(sys.path, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os, tempfile, unittest
+from Constants import *
+from MatchEngine import MatchEngine
+from GameRecord import *
+from GameReplayer import GameReplayer
+from testAIPlayerUtils import snapshot
+from testMatchEngine import makePlayers
+
+##
+# testGameRecord.py
+#
+# Tests that a recorded game replays to the position and winner it ended
+# with.  The games are played by agents in the AI folder, so run it from src:
+#
+#       python -m unittest testGameRecord
+#
+
+
+##
+#testGameRecord
+#Description: Records seeded headless games and replays them
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testGameRecord(unittest.TestCase):
+
+    ## test replaying a saved record reproduces the final state and the winner
+    def testReplay(self):
+        with tempfile.TemporaryDirectory() as recordDir:
+            for seed in (1, 4):
+                engine = MatchEngine(*makePlayers(), recordDir = recordDir, seed = seed)
+                winner = engine.play()
+                self.assertIsNotNone(winner)
+
+                path = [os.path.join(recordDir, name) for name in os.listdir(recordDir)
+                        if GameRecord.load(os.path.join(recordDir, name)).seed == seed]
+                self.assertEqual(len(path), 1)
+                record = GameRecord.load(path[0])
+                self.assertEqual((record.seed, record.winner, record.turns), (seed, winner, engine.turns))
+                self.assertEqual(record.playerNames, [player.author for player in engine.currentPlayers])
+
+                replayer = GameReplayer(record)
+                state = replayer.replay()
+                self.assertEqual(snapshot(state), snapshot(engine.state))
+                self.assertEqual(replayer.getWinner(), winner)
+                self.assertEqual(replayer.turns, engine.turns)
+
+                #going back a few turns and forward again ends in the same place
+                replayer.seekTurn(engine.turns // 2)
+                self.assertEqual(snapshot(replayer.replay()), snapshot(engine.state))
+
+    ## test an undone move replays to the state from before it
+    def testUndo(self):
+        engine = MatchEngine(*makePlayers(), seed = 3)
+        engine.play()
+        events = engine.record.listEvents()
+
+        #take back and make again every move that didn't attack
+        record = GameRecord(engine.record.playerNames, engine.record.seed)
+        undos = 0
+        for i, event in enumerate(events):
+            if event[0] == EVENT_PLACE:
+                record.addPlacement(event[1])
+            elif event[0] == EVENT_MOVE:
+                record.addMove(event[1])
+                if i + 1 < len(events) and events[i + 1][0] != EVENT_ATTACK:
+                    record.addUndo()
+                    record.addMove(event[1])
+                    undos += 1
+            elif event[0] == EVENT_BUILD:
+                record.addBuild(event[1], event[2])
+            elif event[0] == EVENT_ATTACK:
+                record.addAttack(event[1])
+            elif event[0] == EVENT_END:
+                record.addEnd()
+        self.assertGreater(undos, 10)
+
+        replayer = GameReplayer(record)
+        self.assertEqual(snapshot(replayer.replay()), snapshot(engine.state))
+        self.assertEqual(replayer.getWinner(), engine.record.winner)
+
+    ## test a record survives being written out and read back
+    def testBytes(self):
+        engine = MatchEngine(*makePlayers(), seed = 2)
+        engine.play()
+        record = GameRecord.fromBytes(engine.record.toBytes())
+        self.assertEqual(record.listEvents(), engine.record.listEvents())
+        self.assertEqual((record.seed, record.winner, record.turns, record.playerNames),
+                         (engine.record.seed, engine.record.winner, engine.record.turns, engine.record.playerNames))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from Constants import *
+from MatchEngine import MatchEngine, deriveSeed
+from AgentRegistry import AgentRegistry
+from Move import Move
+from AIPlayerUtils import listAllLegalMoves, listAllMovementPaths
+
+##
+# testMatchEngine.py
+#
+# Tests that MatchEngine games are reproducible from their seed.  The agents
+# are the ones in the AI folder, so run it from src:
+#
+#       python -m unittest testMatchEngine
+#
+
+#agents that draw their random numbers from Player.random and finish a game quickly
+AUTHORS = ("Random", "Simple Food Gatherer")
+
+
+##
+# makePlayers
+#
+# Return: a new player of each of the authors, in seat order
+def makePlayers(authors = AUTHORS):
+    registry = AgentRegistry("AI")
+    return [registry.find(authors[seat]).getModule().AIPlayer(seat) for seat in (PLAYER_ONE, PLAYER_TWO)]
+
+
+##
+# playGame
+#
+# Return: (winner, turns, recorded events) of a game played with the seed
+def playGame(seed, engine = None):
+    if engine is None:
+        engine = MatchEngine(*makePlayers(), seed = seed)
+    engine.seed = seed
+    winner = engine.play()
+    return winner, engine.turns, bytes(engine.record.events)
+
+
+##
+#testMatchEngine
+#Description: Plays seeded games between AUTHORS
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testMatchEngine(unittest.TestCase):
+
+    ## test the same seed plays the same game with new players or the same engine
+    def testSameSeed(self):
+        engine = MatchEngine(*makePlayers())
+        for seed in (1, 2, deriveSeed(5, "a", "b", 0)):
+            first = playGame(seed)
+            self.assertIsNotNone(first[0])
+            self.assertEqual(playGame(seed), first)
+            self.assertEqual(playGame(seed, engine), first)
+            self.assertEqual(engine.gameSeed, seed)
+            self.assertEqual(engine.record.seed, seed)
+
+    ## test the seed is what decides the game
+    def testSeedUsed(self):
+        games = set(playGame(seed)[2] for seed in range(4))
+        self.assertGreater(len(games), 1)
+
+    ## test deriveSeed gives the same seed for the same parts and a new one otherwise
+    def testDeriveSeed(self):
+        seed = deriveSeed(11, "Random", "Booger", 3)
+        self.assertEqual(deriveSeed(11, "Random", "Booger", 3), seed)
+        self.assertNotEqual(deriveSeed(11, "Booger", "Random", 3), seed)
+        self.assertNotEqual(deriveSeed(11, "Random", "Booger", 4), seed)
+        self.assertNotEqual(deriveSeed(12, "Random", "Booger", 3), seed)
+        self.assertTrue(0 <= seed < 1 << 63)
+
+    ## test the rules accept every move listAllLegalMoves lists and no move of an enemy ant
+    def testLegalMovesValid(self):
+        test = self
+        checked = []
+
+        class CheckedEngine(MatchEngine):
+            def errorReport(self, msg):
+                pass
+
+            def isValidMove(self, move):
+                if self.state.phase == PLAY_PHASE:
+                    for legal in listAllLegalMoves(self.state):
+                        coordList = list(legal.coordList) if legal.coordList is not None else None
+                        test.assertTrue(MatchEngine.isValidMove(self, Move(legal.moveType, coordList, legal.buildType)))
+                        checked.append(legal)
+                    for ant in self.state.inventories[1 - self.state.whoseTurn].ants:
+                        for path in listAllMovementPaths(self.state, ant.coords, 1):
+                            test.assertFalse(MatchEngine.isValidMove(self, Move(MOVE_ANT, path, None)))
+                return MatchEngine.isValidMove(self, move)
+
+        for seed in range(3):
+            CheckedEngine(*makePlayers(), turnLimit = 30, seed = seed).play()
+        self.assertGreater(len(checked), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import random
+import unittest
+from Constants import *
+from AIPlayerUtils import *
+from Transposition import zobristHash
+from Rollout import *
+from testAIPlayerUtils import playState, snapshot
+
+##
+# testRollout.py
+#
+# Tests for Rollout: the moves it hands the policy, that playouts leave the
+# state as they found it and that seeded batches come out the same.
+#
+#       python -m unittest testRollout
+#
+
+
+##
+#testRollout
+#Description: Plays seeded playouts from playState
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testRollout(unittest.TestCase):
+
+    ## test LegalMoves lists the moves listAllLegalMoves does, in the same order
+    def testLegalMoves(self):
+        rng = random.Random(9)
+        state = playState()
+        for ply in range(300):
+            if getWinner(state) is not None:
+                state = playState()
+            expected = [(move.moveType, move.coordList, move.buildType) for move in listAllLegalMoves(state)]
+            moves = LegalMoves(state)
+            self.assertEqual(len(moves), len(expected))
+            self.assertEqual([(move.moveType, move.coordList, move.buildType) for move in moves], expected)
+            self.assertEqual(moves[-1].moveType, END)
+            self.assertRaises(IndexError, moves.__getitem__, len(moves))
+            applyMove(state, moves[rng.randint(0, len(moves) - 1)])
+
+    ## test playOut takes back every move it made
+    def testPlayOutRestoresState(self):
+        state = playState()
+        zobristHash(state)
+        before = snapshot(state)
+        ants = [ant for inv in state.inventories for ant in inv.ants]
+        hashKey = state.hashKey
+        rng = random.Random(4)
+        for i in range(10):
+            playOut(state, randomPolicy, 30, rng)
+            self.assertEqual(snapshot(state), before)
+            self.assertEqual([ant for inv in state.inventories for ant in inv.ants], ants)
+            self.assertEqual(state.hashKey, hashKey)
+            self.assertTrue(state.getOccupancyIndex().isCurrent(state))
+
+    ## test playRollouts and rollout don't change the state they are given
+    def testStateUnchanged(self):
+        state = playState()
+        before = snapshot(state)
+        playRollouts(state, 5, turnLimit = 20, seed = 1)
+        rollout(state, turnLimit = 20, rng = random.Random(1))
+        self.assertEqual(snapshot(state), before)
+
+    ## test the same seed gives the same playouts
+    def testSeeded(self):
+        first = playRollouts(playState(), 20, turnLimit = 40, seed = 7)
+        second = playRollouts(playState(), 20, turnLimit = 40, seed = 7)
+        self.assertEqual((first.wins, first.draws, first.totalTurns),
+                         (second.wins, second.draws, second.totalTurns))
+
+    ## test the stats account for every playout
+    def testStats(self):
+        stats = playRollouts(playState(), 30, turnLimit = 40, seed = 3)
+        self.assertEqual(stats.games, 30)
+        self.assertEqual(stats.wins[PLAYER_ONE] + stats.wins[PLAYER_TWO] + stats.draws, 30)
+        self.assertGreater(stats.wins[PLAYER_ONE] + stats.wins[PLAYER_TWO], 0)
+        self.assertGreater(stats.draws, 0)
+        self.assertAlmostEqual(stats.winRate(PLAYER_ONE) + stats.winRate(PLAYER_TWO), 1.0)
+        self.assertLessEqual(stats.averageTurns(), 40)
+
+        empty = RolloutStats()
+        self.assertEqual(empty.winRate(PLAYER_ONE), 0.0)
+        self.assertEqual(empty.averageTurns(), 0.0)
+        empty.add(None, 5)
+        empty.add(PLAYER_TWO, 3)
+        self.assertEqual((empty.games, empty.draws, empty.wins, empty.totalTurns), (2, 1, [0, 1], 8))
+        self.assertEqual(empty.winRate(PLAYER_TWO), 0.75)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from Constants import *
+from Ant import Ant
+from Move import Move
+from StateCodec import encodeState, decodeState, canEncodeMove, encodeMove, decodeMove, CompactGameState
+from AIPlayerUtils import getAntAt
+from MatchEngine import MatchEngine
+from testAIPlayerUtils import playState, snapshot
+from testMatchEngine import makePlayers
+
+##
+# testStateCodec.py
+#
+# Tests that what StateCodec hands between processes comes back the same.
+# Some states come from games of the agents in the AI folder, so run it from
+# src:
+#
+#       python -m unittest testStateCodec
+#
+
+
+##
+#testStateCodec
+#Description: Checks what StateCodec hands between processes comes back the
+#same, and that what it can't encode is turned down.
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testStateCodec(unittest.TestCase):
+
+    ## test encodeMove() and decodeMove() give back the move, and malformed moves aren't encoded
+    def testMoveRoundTrip(self):
+        moves = [Move(END, None, None), Move(BUILD, [(0, 0)], WORKER), Move(MOVE_ANT, [(9, 9)], None),
+                 Move(MOVE_ANT, [(3, 3), (3, 4), (4, 4)], None)]
+        for move in moves:
+            self.assertTrue(canEncodeMove(move), "can't encode %s" % str(move))
+            decoded = decodeMove(encodeMove(move))
+            self.assertEqual((decoded.moveType, decoded.coordList, decoded.buildType),
+                             (move.moveType, move.coordList, move.buildType))
+            if decoded.coordList is not None:
+                self.assertTrue(all(type(coord) is tuple for coord in decoded.coordList))
+
+        malformed = [Move(MOVE_ANT, [(3, 9), (3, 10)], None), Move(MOVE_ANT, [(0, 0), (-1, 0)], None),
+                     Move(MOVE_ANT, [[4, 4], [4, 5]], None), Move(MOVE_ANT, ((1, 1), (1, 2)), None),
+                     Move(MOVE_ANT, [(1.0, 2.0)], None), Move(MOVE_ANT, [(True, False)], None),
+                     Move(MOVE_ANT, [(1, 1, 1)], None), Move("end", None, None), Move(200, None, None),
+                     Move(BUILD, [(0, 0)], 1.0), None]
+        for move in malformed:
+            self.assertFalse(canEncodeMove(move), "%s would not come back the same" % str(move))
+            self.assertRaises(ValueError, encodeMove, move)
+
+    ## test decodeState() keeps the ants' ids and new ants don't reuse them
+    def testAntIds(self):
+        state = playState()
+        for ant in state.inventories[PLAYER_ONE].ants + state.inventories[PLAYER_TWO].ants:
+            ant.UniqueID += 1000000  #as if made by a process that has made many more ants
+        ids = [ant.UniqueID for inv in state.inventories for ant in inv.ants]
+
+        decoded = decodeState(encodeState(state))
+        self.assertEqual([ant.UniqueID for inv in decoded.inventories for ant in inv.ants], ids)
+        self.assertGreater(Ant((0, 0), WORKER, PLAYER_ONE).UniqueID, max(ids))
+
+    ## test a CompactGameState reads like the state it was made from and isn't changed with it
+    def testCompactGameState(self):
+        engine = MatchEngine(*makePlayers(), turnLimit = 10, seed = 1)
+        engine.play()
+        state = engine.state
+        compact = CompactGameState.fromGameState(state)
+        self.assertEqual(snapshot(compact), snapshot(state))
+        self.assertEqual(snapshot(compact.toGameState()), snapshot(state))
+        ant = state.inventories[PLAYER_ONE].ants[0]
+        x, y = ant.coords
+        self.assertEqual((compact.board[x][y].ant.type, compact.board[x][y].ant.UniqueID), (ant.type, ant.UniqueID))
+        self.assertIs(getAntAt(compact, (x, y)), compact.board[x][y].ant)
+
+        copy = compact.clone()
+        self.assertIs(copy.data, compact.data)
+        food = state.inventories[PLAYER_ONE].foodCount
+        state.inventories[PLAYER_ONE].foodCount += 1
+        state.board[x][y].ant = None
+        self.assertEqual(copy.inventories[PLAYER_ONE].foodCount, food)
+        self.assertIsNotNone(copy.toGameState().board[x][y].ant)
+        self.assertIsNot(compact.toGameState(), compact.toGameState())
+
+if __name__ == '__main__':
+    unittest.main()
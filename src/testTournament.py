@@ -0,0 +1,129 @@
+import io, os, sys, time, shutil, tempfile, itertools, unittest
+from unittest import mock
+from Constants import *
+from MatchEngine import MatchEngine
+from Tournament import TournamentRunner, makeJobs, getGameSeed
+from Game import Game
+from testMatchEngine import AUTHORS, makePlayers
+
+##
+# testTournament.py
+#
+# Tests the jobs a tournament is split into and that a worker plays a seeded
+# game the same way this process does.  Run it from src:
+#
+#       python -m unittest testTournament
+#
+
+
+#an agent that never answers, with no time limit to stop it
+STUCK_AGENT = """from Player import *
+
+class AIPlayer(Player):
+
+    def __init__(self, inputPlayerId):
+        super(AIPlayer, self).__init__(inputPlayerId, "Stuck")
+
+    def getPlacement(self, currentState):
+        while True:
+            pass
+"""
+
+
+##
+#testTournament
+#Description: Builds the jobs of command line tournaments and plays a few
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testTournament(unittest.TestCase):
+
+    ## test the jobs of --RRall play every pair of agents the number of games asked for
+    def testRRallJobs(self):
+        with mock.patch.object(sys, "argv", ["Game.py", "--RRall", "-n", "3", "--seed", "11"]):
+            game = Game(testing = True)
+        game.queueCommandLineGames()
+
+        jobs = []
+        for pairing in game.gamesToPlay:
+            pairingJobs = makeJobs(pairing.p1.author, pairing.p2.author, pairing.n, True, game.masterSeed)
+            self.assertEqual([job[2] for job in pairingJobs], [False, True, False])
+            self.assertEqual([job[3] for job in pairingJobs],
+                             [getGameSeed(11, pairing.p1.author, pairing.p2.author, j) for j in range(3)])
+            jobs += pairingJobs
+
+        authors = [entry.author for entry in game.registry.entries]
+        self.assertGreaterEqual(len(authors), 3)
+        pairs = [frozenset(job[:2]) for job in jobs]
+        for pair in itertools.combinations(authors, 2):
+            self.assertEqual(pairs.count(frozenset(pair)), 3)
+        self.assertEqual(len(jobs), 3 * len(authors) * (len(authors) - 1) // 2)
+        self.assertEqual(len(set(job[3] for job in jobs)), len(jobs))
+
+    ## test --timeout turns the time limit on for command line games
+    def testTimeoutOption(self):
+        with mock.patch.object(sys, "argv", ["Game.py", "--headless", "--RRall", "--timeout", "2.5", "--cpu-time"]):
+            game = Game(testing = True)
+        self.assertTrue(game.timeoutOn)
+        self.assertEqual(game.timeout_limit, 2.5)
+        self.assertTrue(game.cpuTime)
+
+        with mock.patch.object(sys, "argv", ["Game.py", "--headless", "--RRall"]):
+            game = Game(testing = True)
+        self.assertFalse(game.timeoutOn)
+
+    ## test unseeded jobs ask for a fresh seed and don't swap unless asked to
+    def testUnseededJobs(self):
+        self.assertEqual(makeJobs("a", "b", 2), [("a", "b", False, None), ("a", "b", False, None)])
+
+    ## test a worker plays a seeded game with the result this process gets
+    def testWorkerResult(self):
+        jobs = makeJobs(AUTHORS[0], AUTHORS[1], 4, True, 7)
+        runner = TournamentRunner("AI", 2)
+        try:
+            winners = runner.run(jobs)
+        finally:
+            runner.close()
+
+        for (author1, author2, flipped, seed), winner in zip(jobs, winners):
+            players = makePlayers((author2, author1) if flipped else (author1, author2))
+            expected = MatchEngine(players[0], players[1], seed = seed).play()
+            if flipped and expected is not None:
+                expected = 1 - expected
+            self.assertEqual(winner, expected)
+
+    ## test a game that never ends is abandoned and the games around it are still played
+    def testGameTimeout(self):
+        aiDir = tempfile.mkdtemp()
+        try:
+            for name in ("Random.py", "FoodGatherer.py"):
+                shutil.copy(os.path.join("AI", name), aiDir)
+            with open(os.path.join(aiDir, "Stuck.py"), "w") as f:
+                f.write(STUCK_AGENT)
+
+            jobs = [(AUTHORS[0], AUTHORS[1], False, 1), ("Stuck", AUTHORS[0], False, 2),
+                    (AUTHORS[0], AUTHORS[1], True, 3), (AUTHORS[1], "Stuck", False, 4)]
+            runner = TournamentRunner(aiDir, 2, gameTimeout = 1)
+            started = time.perf_counter()
+            try:
+                with mock.patch.object(sys, "stderr", io.StringIO()) as stderr:
+                    winners = runner.run(jobs)
+            finally:
+                runner.cancel()
+            self.assertLess(time.perf_counter() - started, 20)
+            self.assertEqual(stderr.getvalue().count("abandoned"), 2)
+        finally:
+            shutil.rmtree(aiDir)
+
+        self.assertEqual(winners[1], None)
+        self.assertEqual(winners[3], None)
+        for i in (0, 2):
+            author1, author2, flipped, seed = jobs[i]
+            players = makePlayers((author2, author1) if flipped else (author1, author2))
+            expected = MatchEngine(players[0], players[1], seed = seed).play()
+            self.assertEqual(winners[i], 1 - expected if flipped else expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
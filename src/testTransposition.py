@@ -0,0 +1,68 @@
+import unittest
+from Constants import *
+from Transposition import *
+
+##
+# testTransposition.py
+#
+# Tests for the TranspositionTable replacement policy.
+#
+#       python -m unittest testTransposition
+#
+
+
+##
+#testTranspositionTable
+#Description: Stores keys that share a slot and checks which entry is kept
+#
+#Variables:
+#   TestCase - base class used to create tests.
+##
+class testTranspositionTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = TranspositionTable(16)
+        #two positions that want the same slot
+        self.first = 0x1234
+        self.second = self.first + self.table.size * 7
+
+    ## test a shallower result doesn't push out a deeper one from the same search
+    def testDeeperKept(self):
+        self.table.store(self.first, 4, 10, EXACT, "deep")
+        self.table.store(self.second, 2, 20)
+        self.assertIsNone(self.table.lookup(self.second))
+        entry = self.table.lookup(self.first)
+        self.assertEqual((entry.depth, entry.value, entry.bestMove), (4, 10, "deep"))
+
+        #as deep or deeper does replace it
+        self.table.store(self.second, 4, 30)
+        self.assertIsNone(self.table.lookup(self.first))
+        self.assertEqual(self.table.lookup(self.second).value, 30)
+
+    ## test an entry from an earlier search is replaced whatever its depth
+    def testOlderReplaced(self):
+        self.table.store(self.first, 8, 10)
+        self.table.newSearch()
+        self.table.store(self.second, 1, 20)
+        self.assertIsNone(self.table.lookup(self.first))
+        entry = self.table.lookup(self.second)
+        self.assertEqual((entry.depth, entry.value, entry.age), (1, 20, self.table.age))
+
+    ## test a re-store of the same position keeps its best move
+    def testBestMoveKept(self):
+        self.table.store(self.first, 1, 10, LOWER_BOUND, "move")
+        self.table.store(self.first, 2, 15)
+        entry = self.table.lookup(self.first)
+        self.assertEqual((entry.depth, entry.value, entry.flag, entry.bestMove), (2, 15, EXACT, "move"))
+
+    ## test nothing is found after clear
+    def testClear(self):
+        self.table.store(self.first, 3, 10)
+        self.assertIsNotNone(self.table.lookup(self.first))
+        self.table.clear()
+        self.assertIsNone(self.table.lookup(self.first))
+        self.assertEqual((self.table.hits, self.table.misses, self.table.age), (0, 1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()